@@ -1,63 +1,85 @@
-from flask import Flask, request, jsonify
-from strategy_manager import StrategyManager
-from main import scheduler
-from config.config import STRATEGY_PARAMETERS
-
-app = Flask(__name__)
-strategy_manager = StrategyManager()
-strategy_manager.load_strategies()
-
-@app.route('/strategies', methods=['GET'])
-def list_strategies():
-    strategies = [strategy.get_name() for strategy in strategy_manager.get_strategies()]
-    return jsonify(strategies)
-
-@app.route('/strategies/<strategy_name>/schedule', methods=['POST'])
-def update_strategy_schedule(strategy_name):
-    data = request.get_json()
-    new_schedule = data.get('schedule')
-    if new_schedule:
-        # Update schedule in scheduler
-        scheduler.reschedule_job(strategy_name, trigger='cron', **new_schedule)
-        # Update schedule in configuration
-        STRATEGY_PARAMETERS[strategy_name]['schedule'] = new_schedule
-        return jsonify({'message': f'Schedule updated for {strategy_name}'})
-    else:
-        return jsonify({'error': 'No schedule provided'}), 400
-
-@app.route('/strategies/<strategy_name>/enable', methods=['POST'])
-def enable_strategy(strategy_name):
-    # Enable the strategy
-    success = strategy_manager.enable_strategy(strategy_name)
-    if success:
-        return jsonify({'message': f'Strategy {strategy_name} enabled'})
-    else:
-        return jsonify({'error': f'Unable to enable strategy {strategy_name}'}), 400
-
-@app.route('/strategies/<strategy_name>/disable', methods=['POST'])
-def disable_strategy(strategy_name):
-    # Disable the strategy
-    success = strategy_manager.disable_strategy(strategy_name)
-    if success:
-        return jsonify({'message': f'Strategy {strategy_name} disabled'})
-    else:
-        return jsonify({'error': f'Unable to disable strategy {strategy_name}'}), 400
-
-
-@app.route('/strategies/<strategy_name>/params', methods=['POST'])
-def update_strategy_params(strategy_name):
-    data = request.get_json()
-    new_params = data.get('params')
-    if new_params:
-        # Update strategy parameters
-        success = strategy_manager.update_strategy_params(strategy_name, new_params)
+from flask import Flask, Response, request, jsonify
+from utils.metrics import metrics
+
+# Control plane for the running bot. main.py creates the app with its own
+# StrategyManager (whose scheduler is attached) and serves it from a thread
+# in the bot process, so every change applies to the live strategies.
+
+def create_app(strategy_manager):
+    app = Flask(__name__)
+
+    @app.route('/strategies', methods=['GET'])
+    def list_strategies():
+        strategies = [strategy.get_name() for strategy in strategy_manager.get_strategies()]
+        return jsonify(strategies)
+
+    @app.route('/strategies/<strategy_name>', methods=['GET'])
+    def get_strategy(strategy_name):
+        strategy = strategy_manager.get_strategy(strategy_name)
+        if strategy is None:
+            return jsonify({'error': f'Strategy {strategy_name} not found'}), 404
+        return jsonify({
+            'name': strategy_name,
+            'enabled': strategy.enabled,
+            'timeframe': strategy.get_timeframe(),
+            'params': strategy.params,
+        })
+
+    @app.route('/strategies/<strategy_name>/schedule', methods=['POST'])
+    def update_strategy_schedule(strategy_name):
+        data = request.get_json()
+        new_schedule = data.get('schedule')
+        if new_schedule:
+            # Update schedule in scheduler
+            try:
+                success = strategy_manager.update_strategy_schedule(strategy_name, new_schedule)
+            except (TypeError, ValueError) as e:
+                return jsonify({'error': f'Invalid schedule for {strategy_name}: {e}'}), 400
+            if success:
+                return jsonify({'message': f'Schedule updated for {strategy_name}'})
+            else:
+                return jsonify({'error': f'No scheduled job for {strategy_name}'}), 404
+        else:
+            return jsonify({'error': 'No schedule provided'}), 400
+
+    @app.route('/strategies/<strategy_name>/enable', methods=['POST'])
+    def enable_strategy(strategy_name):
+        # Enable the strategy
+        success = strategy_manager.enable_strategy(strategy_name)
         if success:
-            return jsonify({'message': f'Parameters updated for {strategy_name}'})
+            return jsonify({'message': f'Strategy {strategy_name} enabled'})
         else:
-            return jsonify({'error': f'Strategy {strategy_name} not found'}), 404
-    else:
-        return jsonify({'error': 'No parameters provided'}), 400
+            return jsonify({'error': f'Unable to enable strategy {strategy_name}'}), 400
+
+    @app.route('/strategies/<strategy_name>/disable', methods=['POST'])
+    def disable_strategy(strategy_name):
+        # Disable the strategy
+        success = strategy_manager.disable_strategy(strategy_name)
+        if success:
+            return jsonify({'message': f'Strategy {strategy_name} disabled'})
+        else:
+            return jsonify({'error': f'Unable to disable strategy {strategy_name}'}), 400
+
+    @app.route('/strategies/<strategy_name>/params', methods=['POST'])
+    def update_strategy_params(strategy_name):
+        data = request.get_json()
+        new_params = data.get('params')
+        if isinstance(new_params, dict) and new_params:
+            # Update strategy parameters
+            try:
+                success = strategy_manager.update_strategy_params(strategy_name, new_params)
+            except Exception as e:
+                return jsonify({'error': f'Invalid parameters for {strategy_name}: {e}'}), 400
+            if success:
+                return jsonify({'message': f'Parameters updated for {strategy_name}'})
+            else:
+                return jsonify({'error': f'Strategy {strategy_name} not found'}), 404
+        else:
+            return jsonify({'error': 'No parameters provided'}), 400
 
+    @app.route('/metrics', methods=['GET'])
+    def get_metrics():
+        # Prometheus text exposition of the stage timings recorded in this process
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
-if __name__ == '__main__':
-    app.run(port=5000)
\ No newline at end of file
+    return app
@@ -1,41 +1,83 @@
 # backtesting/backtest.py
 
+from functools import lru_cache
+import io
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
 import sys
 
 # Add the parent directory to sys.path to import from strategies
 sys.path.append(os.path.abspath('..'))
 
-from strategies.strategy import apply_indicators, generate_signal
+from config.config import STRATEGY_PARAMETERS
+from strategies.combined_strategy import CombinedStrategy
 
-def backtest(symbol):
-    # Load historical data
-    data = pd.read_csv(f'historical_data/{symbol}_daily.csv', index_col='timestamp', parse_dates=True)
-    data = apply_indicators(data)
-    data['signal'] = data.apply(lambda row: generate_signal(data.loc[:row.name]), axis=1)
-    data['position'] = data['signal'].replace({'buy': 1, 'sell': -1, 'hold': 0}).shift()
-    data['position'].fillna(0, inplace=True)
+@lru_cache(maxsize=None)
+def _read_historical_data(symbol):
+    return pd.read_csv(f'historical_data/{symbol}_daily.csv', index_col='timestamp', parse_dates=True)
+
+def load_historical_data(symbol):
+    # Each process reads a symbol's CSV once; callers get their own copy
+    return _read_historical_data(symbol).copy()
+
+def run_backtest(symbol, strategy, data=None):
+    # data defaults to the symbol's CSV history
+    if data is None:
+        data = load_historical_data(symbol)
+    data = strategy.apply_indicators(data)
+    # Whole-history signals in one pass instead of re-evaluating every expanding slice
+    data['signal'] = strategy.generate_signals(data)
+    data['position'] = data['signal'].map({'buy': 1, 'sell': -1, 'hold': 0}).shift().fillna(0)
     data['returns'] = data['close'].pct_change()
     data['strategy_returns'] = data['position'] * data['returns']
     data['cumulative_returns'] = (1 + data['strategy_returns']).cumprod()
+    return data
+
+def compute_metrics(data):
+    # Equity starts at 1 (the first bar has no return)
+    cumulative_returns = data['cumulative_returns'].fillna(1)
+    drawdown = cumulative_returns / cumulative_returns.cummax() - 1
+    return {
+        'total_return': cumulative_returns.iloc[-1] - 1,
+        'max_drawdown': drawdown.min(),
+        'num_trades': int((data['position'].diff().fillna(0) != 0).sum()),
+    }
+
+def backtest_figure(symbol, cumulative_returns):
+    # Object-oriented matplotlib API: no pyplot state, so it is safe to call
+    # from worker threads and processes
+    from matplotlib.figure import Figure
 
-    # Plot performance
-    plt.figure(figsize=(12, 6))
-    plt.plot(data['cumulative_returns'], label='Strategy Returns')
-    plt.title(f'Backtesting Strategy Performance for {symbol}')
-    plt.xlabel('Date')
-    plt.ylabel('Cumulative Returns')
-    plt.legend()
+    figure = Figure(figsize=(12, 6))
+    ax = figure.subplots()
+    ax.plot(cumulative_returns, label='Strategy Returns')
+    ax.set_title(f'Backtesting Strategy Performance for {symbol}')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Cumulative Returns')
+    ax.legend()
+    return figure
 
+def plot_backtest(symbol, cumulative_returns):
     # Save plot to file
     plot_filename = f'backtest_{symbol}.png'
-    plt.savefig(plot_filename)
-    plt.close()
+    backtest_figure(symbol, cumulative_returns).savefig(plot_filename)
+    return plot_filename
+
+def render_backtest_png(symbol, cumulative_returns):
+    # Same plot as plot_backtest, as PNG bytes in memory
+    buffer = io.BytesIO()
+    backtest_figure(symbol, cumulative_returns).savefig(buffer, format='png')
+    return buffer.getvalue()
+
+def backtest(symbol, strategy=None):
+    if strategy is None:
+        strategy = CombinedStrategy(STRATEGY_PARAMETERS['Combined Strategy'])
+
+    data = run_backtest(symbol, strategy)
+    plot_filename = plot_backtest(symbol, data['cumulative_returns'])
 
     # Print performance metrics
-    total_return = data['cumulative_returns'].iloc[-1] - 1
+    total_return = compute_metrics(data)['total_return']
     print(f"Total Return: {total_return * 100:.2f}%")
     return total_return, plot_filename
 
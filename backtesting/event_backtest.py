@@ -0,0 +1,167 @@
+# backtesting/event_backtest.py
+
+# Event-driven portfolio backtest that replays candles for all symbols through
+# the same decisions run_strategy makes live: limit buys at the close that
+# expire unfilled, position sizing from calculate_position_size, OCO
+# stop-loss/take-profit exits resolved intrabar from high/low, market sells at
+# the close on sell signals, the MAX_CONCURRENT_TRADES limit and the drawdown
+# check. Position state is kept in one NumPy array per field, indexed by
+# symbol, so each bar is a handful of vectorized operations regardless of the
+# number of symbols.
+
+import numpy as np
+import pandas as pd
+
+from config.config import STOP_LOSS_PERCENTAGE, TAKE_PROFIT_PERCENTAGE, MAX_CONCURRENT_TRADES
+from utils.risk_management import calculate_position_size, is_within_drawdown_limit
+from backtesting.backtest import load_historical_data
+
+SIGNAL_CODES = {'buy': 1, 'sell': -1, 'hold': 0}
+
+def prepare_arrays(data, strategy):
+    # Align every symbol on the union of timestamps; missing bars are NaN/hold
+    symbols = list(data)
+    index = data[symbols[0]].index
+    for symbol in symbols[1:]:
+        if not data[symbol].index.equals(index):
+            index = index.union(data[symbol].index)
+    shape = (len(index), len(symbols))
+    opens, highs, lows, closes = (np.full(shape, np.nan) for _ in range(4))
+    signals = np.zeros(shape, dtype=np.int8)
+
+    for s, symbol in enumerate(symbols):
+        frame = strategy.apply_indicators(data[symbol].copy())
+        frame['signal_code'] = strategy.generate_signals(frame).map(SIGNAL_CODES)
+        if not frame.index.equals(index):
+            frame = frame.reindex(index)
+        opens[:, s] = frame['open'].to_numpy()
+        highs[:, s] = frame['high'].to_numpy()
+        lows[:, s] = frame['low'].to_numpy()
+        closes[:, s] = frame['close'].to_numpy()
+        signals[:, s] = frame['signal_code'].fillna(0).to_numpy()
+
+    return index, symbols, opens, highs, lows, closes, signals
+
+def event_backtest(symbols, strategy, starting_balance=10000.0, fill_timeout_bars=1, data=None):
+    # fill_timeout_bars: how many bars after placement a limit buy may fill
+    # before it is canceled (the live 5 minute timeout is under one daily bar)
+    if data is None:
+        data = {symbol: load_historical_data(symbol) for symbol in symbols}
+    index, symbols, opens, highs, lows, closes, signals = prepare_arrays(data, strategy)
+    n_bars, n_symbols = closes.shape
+    marks = pd.DataFrame(closes).ffill().fillna(0).to_numpy()
+
+    # Array-backed state, one slot per symbol (at most one trade per symbol)
+    quantity = np.zeros(n_symbols)
+    entry_price = np.full(n_symbols, np.nan)
+    stop_loss = np.full(n_symbols, np.nan)
+    take_profit = np.full(n_symbols, np.nan)
+    opened_at = np.full(n_symbols, -1)
+    pending_price = np.full(n_symbols, np.nan)
+    pending_quantity = np.zeros(n_symbols)
+    pending_expiry = np.full(n_symbols, -1)
+
+    cash = float(starting_balance)
+    reserved = 0.0
+    equity = np.empty(n_bars)
+    trades = []
+
+    for t in range(n_bars):
+        low, high, open_ = lows[t], highs[t], opens[t]
+
+        # 1. Pending limit buys fill when the bar trades at or below the limit
+        pending = ~np.isnan(pending_price)
+        if pending.any():
+            filled = pending & (low <= pending_price)
+            expired = pending & ~filled & (t >= pending_expiry)
+            if filled.any():
+                cost = (pending_quantity[filled] * pending_price[filled]).sum()
+                reserved -= cost
+                quantity[filled] = pending_quantity[filled]
+                entry_price[filled] = pending_price[filled]
+                stop_loss[filled] = pending_price[filled] * (1 - STOP_LOSS_PERCENTAGE)
+                take_profit[filled] = pending_price[filled] * (1 + TAKE_PROFIT_PERCENTAGE)
+                opened_at[filled] = t
+            if expired.any():
+                refund = (pending_quantity[expired] * pending_price[expired]).sum()
+                reserved -= refund
+                cash += refund
+            done = filled | expired
+            pending_price[done] = np.nan
+            pending_quantity[done] = 0
+
+        # 2. OCO exits on bars after the fill; if both legs are inside the bar
+        # the stop is assumed to trigger first
+        holding = (quantity > 0) & (opened_at < t)
+        if holding.any():
+            stop_hit = holding & (low <= stop_loss)
+            take_hit = holding & ~stop_hit & (high >= take_profit)
+            for hit, reason in ((stop_hit, 'stop_loss'), (take_hit, 'take_profit')):
+                if not hit.any():
+                    continue
+                level = stop_loss if reason == 'stop_loss' else take_profit
+                # Gaps through the level fill at the open
+                gap = np.minimum(open_, level) if reason == 'stop_loss' else np.maximum(open_, level)
+                exit_price = np.where(np.isnan(open_), level, gap)
+                for s in np.flatnonzero(hit):
+                    profit = (exit_price[s] - entry_price[s]) * quantity[s]
+                    cash += exit_price[s] * quantity[s]
+                    trades.append((symbols[s], index[opened_at[s]], index[t], entry_price[s],
+                                   exit_price[s], quantity[s], profit, reason))
+                quantity[hit] = 0
+                entry_price[hit] = np.nan
+                stop_loss[hit] = np.nan
+                take_profit[hit] = np.nan
+                opened_at[hit] = -1
+
+        equity[t] = cash + reserved + (quantity * marks[t]).sum()
+
+        # 3. Decisions at the close, as in run_strategy: sell signals close
+        # open positions at the close, buys skip symbols with an open trade
+        # and respect MAX_CONCURRENT_TRADES and available cash
+        if not is_within_drawdown_limit(equity[t], starting_balance):
+            continue
+        sells = np.flatnonzero((quantity > 0) & (signals[t] == -1) & ~np.isnan(closes[t]))
+        for s in sells:
+            exit_price = closes[t, s]
+            profit = (exit_price - entry_price[s]) * quantity[s]
+            cash += exit_price * quantity[s]
+            trades.append((symbols[s], index[opened_at[s]], index[t], entry_price[s],
+                           exit_price, quantity[s], profit, 'signal'))
+        if len(sells):
+            quantity[sells] = 0
+            entry_price[sells] = np.nan
+            stop_loss[sells] = np.nan
+            take_profit[sells] = np.nan
+            opened_at[sells] = -1
+        in_use = (quantity > 0) | ~np.isnan(pending_price)
+        slots = MAX_CONCURRENT_TRADES - int(in_use.sum())
+        if slots <= 0:
+            continue
+        candidates = np.flatnonzero((signals[t] == 1) & ~in_use & ~np.isnan(closes[t]))
+        balance = cash
+        for s in candidates[:slots]:
+            price = closes[t, s]
+            stop_loss_price = price * (1 - STOP_LOSS_PERCENTAGE)
+            order_quantity = round(calculate_position_size(balance, price, stop_loss_price), 6)
+            cost = order_quantity * price
+            if order_quantity <= 0 or cost > cash:
+                continue  # The exchange would reject it for insufficient balance
+            cash -= cost
+            reserved += cost
+            pending_price[s] = price
+            pending_quantity[s] = order_quantity
+            pending_expiry[s] = t + fill_timeout_bars
+
+    equity = pd.Series(equity, index=index, name='equity')
+    trades = pd.DataFrame(trades, columns=[
+        'symbol', 'entry_time', 'exit_time', 'entry_price', 'exit_price', 'quantity', 'profit', 'reason'
+    ])
+    drawdown = equity / equity.cummax() - 1
+    metrics = {
+        'total_return': equity.iloc[-1] / starting_balance - 1,
+        'max_drawdown': drawdown.min(),
+        'num_trades': len(trades),
+        'open_positions': int((quantity > 0).sum()),
+    }
+    return {'equity': equity, 'trades': trades, 'metrics': metrics}
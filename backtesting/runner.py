@@ -0,0 +1,62 @@
+# backtesting/runner.py
+
+from concurrent.futures import ProcessPoolExecutor
+import importlib
+import multiprocessing
+import os
+import pandas as pd
+
+from backtesting.backtest import run_backtest, compute_metrics, plot_backtest
+
+def resolve_strategy_class(strategy_class):
+    # Accept a class or a dotted path as used in ACTIVE_STRATEGIES
+    if isinstance(strategy_class, str):
+        module_name, class_name = strategy_class.rsplit('.', 1)
+        strategy_class = getattr(importlib.import_module(module_name), class_name)
+    return strategy_class
+
+def run_job(job, keep_curves=False):
+    symbol, strategy_class, params = job
+    # A bad class path or params is an error row like any other failure,
+    # rather than an exception that aborts the whole pool map
+    result = {'symbol': symbol, 'strategy': getattr(strategy_class, 'name', None) or str(strategy_class),
+              'params': params}
+    try:
+        strategy = resolve_strategy_class(strategy_class)(params)
+        result['strategy'] = strategy.get_name()
+        data = run_backtest(symbol, strategy)
+        result.update(compute_metrics(data))
+        if keep_curves:
+            result['cumulative_returns'] = data['cumulative_returns']
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+def run_backtests(jobs, max_workers=None, keep_curves=False):
+    # jobs is a list of (symbol, strategy_class, params). Each worker process
+    # loads a symbol's history once and reuses it for every job on that symbol.
+    # Returns one row of metrics per job, in job order.
+    max_workers = max_workers or os.cpu_count()
+    if max_workers == 1 or len(jobs) <= 1:
+        results = [run_job(job, keep_curves) for job in jobs]
+    else:
+        # Group jobs by symbol so each symbol's data tends to stay on one worker
+        order = sorted(range(len(jobs)), key=lambda i: jobs[i][0])
+        chunksize = max(1, len(jobs) // (max_workers * 4))
+        # Spawned, not forked: the bot process runs threads (order manager,
+        # API server, writers) whose locks a forked child could inherit held
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            sorted_results = list(executor.map(
+                run_job, [jobs[i] for i in order], [keep_curves] * len(jobs), chunksize=chunksize
+            ))
+        results = [None] * len(jobs)
+        for i, result in zip(order, sorted_results):
+            results[i] = result
+    return pd.DataFrame(results)
+
+def plot_results(results):
+    # Separate plotting stage, run in the calling process after the backtests
+    return [
+        plot_backtest(row['symbol'], row['cumulative_returns'])
+        for _, row in results.iterrows()
+    ]
@@ -0,0 +1,144 @@
+# backtesting/sweep.py
+
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import itertools
+import math
+import multiprocessing
+import os
+import random
+import numpy as np
+import pandas as pd
+
+from backtesting.backtest import load_historical_data
+from backtesting.runner import resolve_strategy_class
+from strategies.market_snapshot import MarketSnapshot
+
+POSITIONS = {'buy': 1, 'sell': -1, 'hold': 0}
+METRICS = ('total_return', 'max_drawdown', 'num_trades')
+
+def grid_search(param_space):
+    # param_space maps a parameter name to the list of values to try
+    names = list(param_space)
+    return [dict(zip(names, values)) for values in itertools.product(*param_space.values())]
+
+def random_search(param_space, n_samples, seed=None):
+    # Distinct combinations drawn by their index in grid_search order, so the
+    # grid itself is never built
+    rng = random.Random(seed)
+    names = list(param_space)
+    values = [list(param_space[name]) for name in names]
+    total = math.prod(len(options) for options in values)
+    n_samples = total if n_samples is None else min(n_samples, total)
+    combinations = []
+    for index in rng.sample(range(total), n_samples):
+        combination = {}
+        for name, options in reversed(list(zip(names, values))):
+            index, position = divmod(index, len(options))
+            combination[name] = options[position]
+        combinations.append({name: combination[name] for name in names})
+    return combinations
+
+def apply_combination(base_params, combination):
+    # Keys may be dotted paths into nested params, e.g. 'RSI Strategy.rsi_period'
+    # for the Combined Strategy
+    params = copy.deepcopy(base_params)
+    for key, value in combination.items():
+        target = params
+        *path, name = key.split('.')
+        for part in path:
+            target = target.setdefault(part, {})
+        target[name] = value
+    return params
+
+def compute_metrics_batch(positions, returns):
+    # positions is (time, combinations); returns is (time,)
+    strategy_returns = positions * returns[:, None]
+    cumulative_returns = np.cumprod(1 + strategy_returns, axis=0)
+    drawdown = cumulative_returns / np.maximum.accumulate(cumulative_returns, axis=0) - 1
+    return {
+        'total_return': cumulative_returns[-1] - 1,
+        'max_drawdown': drawdown.min(axis=0),
+        'num_trades': (np.diff(positions, axis=0) != 0).sum(axis=0),
+    }
+
+def evaluate_combinations(symbol, strategy_class, base_params, combinations):
+    # All combinations share one snapshot, so each (indicator, params) key is
+    # computed once and reused by every threshold variant that needs it
+    strategy_class = resolve_strategy_class(strategy_class)
+    data = load_historical_data(symbol)
+    snapshot = MarketSnapshot(symbol, data)
+    returns = data['close'].pct_change().fillna(0).to_numpy()
+    positions = np.empty((len(data), len(combinations)))
+    frames = {}
+
+    for k, combination in enumerate(combinations):
+        strategy = strategy_class(apply_combination(base_params, combination))
+        key = tuple(indicator.key for indicator in strategy.required_indicators())
+        if key not in frames:
+            frames[key] = snapshot.frame_for(strategy)
+        signals = strategy.generate_signals(frames[key])
+        positions[:, k] = signals.map(POSITIONS).shift().fillna(0).to_numpy()
+
+    metrics = compute_metrics_batch(positions, returns)
+    return [
+        dict(combination, **{name: values[k] for name, values in metrics.items()})
+        for k, combination in enumerate(combinations)
+    ]
+
+def evaluate_task(symbol, strategy_class, base_params, combinations):
+    # A failed task becomes error rows for its combinations instead of an
+    # exception that aborts the whole sweep (as in backtesting.runner)
+    try:
+        return evaluate_combinations(symbol, strategy_class, base_params, combinations)
+    except Exception as e:
+        return [dict(combination, error=str(e)) for combination in combinations]
+
+def group_by_indicators(strategy_class, base_params, combinations):
+    strategy_class = resolve_strategy_class(strategy_class)
+    groups = {}
+    for combination in combinations:
+        strategy = strategy_class(apply_combination(base_params, combination))
+        key = tuple(indicator.key for indicator in strategy.required_indicators())
+        groups.setdefault(key, []).append(combination)
+    return list(groups.values())
+
+def sweep(strategy_class, symbol, param_space, base_params=None, search='grid', n_samples=None,
+          seed=None, max_workers=None):
+    # Run a grid or random search over param_space for one symbol and return
+    # one row of metrics per combination, best total return first
+    base_params = base_params or {}
+    if search == 'random':
+        combinations = random_search(param_space, n_samples, seed)
+    else:
+        combinations = grid_search(param_space)
+
+    # Combinations that need the same indicators are evaluated together;
+    # large groups are split so every worker has something to do
+    max_workers = max_workers or os.cpu_count()
+    groups = group_by_indicators(strategy_class, base_params, combinations)
+    splits = max(1, math.ceil(max_workers / len(groups))) if groups else 1
+    tasks = []
+    for group in groups:
+        size = math.ceil(len(group) / splits)
+        tasks.extend(group[i:i + size] for i in range(0, len(group), size))
+
+    if max_workers == 1 or len(tasks) <= 1:
+        results = [evaluate_task(symbol, strategy_class, base_params, task) for task in tasks]
+    else:
+        # Spawned, not forked: the bot process runs threads whose locks a
+        # forked child could inherit held (see backtesting.runner)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = list(executor.map(
+                evaluate_task,
+                [symbol] * len(tasks),
+                [strategy_class] * len(tasks),
+                [base_params] * len(tasks),
+                tasks
+            ))
+
+    rows = [row for result in results for row in result]
+    # The parameter and metric columns are there even with no (successful) rows
+    results = pd.DataFrame(rows)
+    results = results.reindex(columns=list(dict.fromkeys([*param_space, *METRICS, *results.columns])))
+    return results.sort_values('total_return', ascending=False, ignore_index=True)
@@ -0,0 +1,235 @@
+# benchmarks/run.py
+#
+# Reproducible benchmarks for the indicators, the strategies, CombinedStrategy
+# aggregation and the backtester on synthetic OHLCV data. The panel.* cases
+# evaluate each strategy over all symbols at once (strategies.panel); their
+# bars/s counts every symbol's bars, so they compare directly with
+# strategy.*.apply_indicators plus strategy.*.generate_signals.
+#
+#   python -m benchmarks.run --bars 1000 100000 --symbols 1 10
+#   python -m benchmarks.run --bars 1000 --compare benchmarks/results/baseline.json
+#
+# Every dataset size is kept in memory for the whole run, so 10M bars x 500
+# symbols needs a machine to match.
+
+import argparse
+from datetime import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+from backtesting.backtest import run_backtest, compute_metrics
+from benchmarks.synthetic import generate_universe
+from config.config import STRATEGY_PARAMETERS
+from strategies import kernels
+from strategies.breakout_strategy import BreakoutStrategy
+from strategies.combined_strategy import CombinedStrategy
+from strategies.indicator_registry import unique_indicators
+from strategies.market_snapshot import MarketSnapshot
+from strategies.mean_reversion_strategy import MeanReversionStrategy
+from strategies.moving_average_strategy import MovingAverageStrategy
+from strategies.panel import Panel
+from strategies.rsi_strategy import RSIStrategy
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+def build_strategies():
+    return [
+        RSIStrategy(STRATEGY_PARAMETERS['RSI Strategy']),
+        MovingAverageStrategy(STRATEGY_PARAMETERS['Moving Average Strategy']),
+        MeanReversionStrategy(STRATEGY_PARAMETERS['Mean Reversion Strategy']),
+        BreakoutStrategy(STRATEGY_PARAMETERS['Breakout Strategy']),
+        CombinedStrategy(STRATEGY_PARAMETERS['Combined Strategy']),
+    ]
+
+def benchmark_cases(strategies):
+    # (component, prepare, func): prepare builds the untimed input from a raw
+    # OHLCV frame, func is the timed call on that input
+    combined = strategies[-1]
+
+    def identity(data):
+        return data
+
+    def sub_signals(data):
+        data = combined.apply_indicators(data)
+        return [strategy.generate_signals(data) for strategy in combined.strategies]
+
+    cases = []
+    for indicator in unique_indicators(strategies):
+        cases.append((f"indicator.{indicator!r}", identity, indicator.compute))
+    for strategy in strategies:
+        name = strategy.get_name()
+        cases.append((f"strategy.{name}.apply_indicators", identity, strategy.apply_indicators))
+        cases.append((f"strategy.{name}.generate_signal", strategy.apply_indicators, strategy.generate_signal))
+        cases.append((f"strategy.{name}.generate_signals", strategy.apply_indicators, strategy.generate_signals))
+    cases.append(("combined.aggregate_signal_series", sub_signals, combined.aggregate_signal_series))
+    cases.append(("snapshot.compute_all", identity,
+                  lambda data: MarketSnapshot('BENCH', data).compute_all(strategies)))
+    cases.append(("backtest", identity,
+                  lambda data: compute_metrics(run_backtest('BENCH', combined, data))))
+    return cases
+
+def panel_cases(strategies):
+    # (component, func): func is timed on the Panel of the whole universe.
+    # Each call gets a new Panel over the same arrays so the indicator memo
+    # starts empty, as it does for a live run.
+    def fresh(panel):
+        return Panel(panel.timestamp, panel.symbols, panel.open, panel.high, panel.low, panel.close, panel.volume)
+
+    def evaluate(strategy):
+        return lambda panel: strategy.generate_panel_signals(fresh(panel))
+
+    return [(f"panel.{strategy.get_name()}.generate_panel_signals", evaluate(strategy)) for strategy in strategies]
+
+def peak_memory(func, arg):
+    # Peak bytes allocated by one call (NumPy and pandas buffers included)
+    tracemalloc.start()
+    try:
+        func(arg)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def measure(component, prepare, func, universe, n_bars, repeat, symbols_per_call=1):
+    # symbols_per_call > 1 when each input covers several symbols (a panel)
+    inputs = [prepare(data) for data in universe.values()]
+    # The traced call doubles as a warm-up so lazy imports are not timed
+    peak = peak_memory(func, inputs[0])
+
+    samples = []
+    for _ in range(repeat):
+        for arg in inputs:
+            start = time.perf_counter()
+            func(arg)
+            samples.append(time.perf_counter() - start)
+
+    samples = np.array(samples)
+    total = samples.sum()
+    return {
+        'component': component,
+        'bars': n_bars,
+        'symbols': len(universe) * symbols_per_call,
+        'repeat': repeat,
+        'calls': len(samples),
+        'mean_seconds': samples.mean(),
+        'p50_seconds': np.percentile(samples, 50),
+        'p90_seconds': np.percentile(samples, 90),
+        'p99_seconds': np.percentile(samples, 99),
+        'max_seconds': samples.max(),
+        'calls_per_second': len(samples) / total if total else float('inf'),
+        'bars_per_second': n_bars * symbols_per_call * len(samples) / total if total else float('inf'),
+        'peak_memory_bytes': peak,
+    }
+
+def run_benchmarks(bars=(1000,), symbols=(1,), repeat=5, seed=0, components=None):
+    strategies = build_strategies()
+    cases = benchmark_cases(strategies)
+    panels = panel_cases(strategies)
+    if components:
+        cases = [case for case in cases if any(pattern in case[0] for pattern in components)]
+        panels = [case for case in panels if any(pattern in case[0] for pattern in components)]
+
+    results = []
+    for n_bars in bars:
+        for n_symbols in symbols:
+            universe = generate_universe(n_bars, n_symbols, seed=seed)
+            runs = [(component, prepare, func, universe, 1) for component, prepare, func in cases]
+            runs += [(component, Panel.from_frames, func, {'panel': universe}, n_symbols) for component, func in panels]
+            for component, prepare, func, inputs, symbols_per_call in runs:
+                result = measure(component, prepare, func, inputs, n_bars, repeat, symbols_per_call)
+                print(f"{component:<60} bars={n_bars:<9} symbols={n_symbols:<4} "
+                      f"p50={result['p50_seconds'] * 1000:10.3f}ms "
+                      f"bars/s={result['bars_per_second']:14.0f} "
+                      f"peak={result['peak_memory_bytes'] / 2**20:9.1f}MiB")
+                results.append(result)
+            del universe
+    return results
+
+def run_metadata(args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'created': datetime.utcnow().isoformat(),
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'indicator_backend': kernels.backend_name(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+    }
+
+def save_results(path, meta, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2, default=float)
+
+def compare(baseline, results, tolerance=0.1):
+    # Rows whose median latency or peak memory grew by more than tolerance
+    # relative to the matching (component, bars, symbols) row in baseline
+    previous = {(row['component'], row['bars'], row['symbols']): row for row in baseline['results']}
+    regressions = []
+    for row in results:
+        old = previous.get((row['component'], row['bars'], row['symbols']))
+        if old is None:
+            continue
+        for metric in ('p50_seconds', 'peak_memory_bytes'):
+            if old[metric] and row[metric] > old[metric] * (1 + tolerance):
+                regressions.append({
+                    'component': row['component'],
+                    'bars': row['bars'],
+                    'symbols': row['symbols'],
+                    'metric': metric,
+                    'baseline': old[metric],
+                    'current': row[metric],
+                    'change': row[metric] / old[metric] - 1,
+                })
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark indicators, strategies and the backtester.")
+    parser.add_argument('--bars', type=int, nargs='+', default=[1000, 100000],
+                        help="Dataset sizes in bars (1k to 10M)")
+    parser.add_argument('--symbols', type=int, nargs='+', default=[1],
+                        help="Number of symbols per dataset (1 to 500)")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed calls per symbol")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--backend', choices=['auto', 'numba', 'numpy', 'pandas'],
+                        help="Indicator kernel backend (default: INDICATOR_BACKEND)")
+    parser.add_argument('--components', nargs='+', help="Only run components containing one of these strings")
+    parser.add_argument('--output', help="Results JSON (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--compare', help="Baseline results JSON to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="Relative slowdown or memory growth reported as a regression")
+    args = parser.parse_args(argv)
+    if args.backend:
+        kernels.set_backend(args.backend)
+
+    results = run_benchmarks(args.bars, args.symbols, args.repeat, args.seed, args.components)
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    save_results(output, run_metadata(args), results)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['component']} bars={r['bars']} symbols={r['symbols']} "
+                  f"{r['metric']}: {r['baseline']:.6g} -> {r['current']:.6g} ({r['change']:+.1%})")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
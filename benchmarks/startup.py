@@ -0,0 +1,109 @@
+# benchmarks/startup.py
+#
+# Cold-start time and peak RSS of the bot's entry points, each measured in a
+# fresh interpreter so nothing is already imported.
+#
+#   python -m benchmarks.startup
+#   python -m benchmarks.startup --targets main strategies --repeat 10
+
+import argparse
+from datetime import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+
+from benchmarks.run import RESULTS_DIR, save_results
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> code run in the fresh interpreter
+TARGETS = {
+    'main': "import main",
+    'api_server': "import api_server",
+    'strategies': "from strategy_manager import StrategyManager; StrategyManager().load_strategies()",
+    'process_worker': "import process_engine",
+    'backtest_worker': "import backtesting.runner",
+    'email_report': "import utils.email_reporter",
+}
+
+# Dependencies that should only be loaded by the code paths that use them
+HEAVY_MODULES = ['binance', 'apscheduler', 'psycopg2', 'matplotlib', 'flask', 'numba', 'pandas']
+
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    'import_seconds': elapsed,
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    'peak_rss_bytes': rss if sys.platform == 'darwin' else rss * 1024,
+    'loaded': [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+def measure_once(code):
+    script = CHILD.format(code=code, heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else
+                           f"exit code {completed.returncode}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['wall_seconds'] = wall
+    return result
+
+def measure(name, code, repeat):
+    try:
+        runs = [measure_once(code) for _ in range(repeat)]
+    except RuntimeError as e:
+        return {'target': name, 'error': str(e)}
+    wall = np.array([run['wall_seconds'] for run in runs])
+    imports = np.array([run['import_seconds'] for run in runs])
+    return {
+        'target': name,
+        'repeat': repeat,
+        'wall_p50_seconds': float(np.percentile(wall, 50)),
+        'wall_max_seconds': float(wall.max()),
+        'import_p50_seconds': float(np.percentile(imports, 50)),
+        'peak_rss_bytes': max(run['peak_rss_bytes'] for run in runs),
+        'loaded': runs[-1]['loaded'],
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start time and peak RSS of the entry points.")
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument('--output', help="Results JSON (default: benchmarks/results/startup-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.targets:
+        result = measure(name, TARGETS[name], args.repeat)
+        if 'error' in result:
+            print(f"{name:<16} failed: {result['error']}")
+        else:
+            print(f"{name:<16} wall p50={result['wall_p50_seconds'] * 1000:8.1f}ms "
+                  f"import p50={result['import_p50_seconds'] * 1000:8.1f}ms "
+                  f"rss={result['peak_rss_bytes'] / 2**20:7.1f}MiB "
+                  f"loaded={','.join(result['loaded']) or '-'}")
+        results.append(result)
+
+    meta = {
+        'created': datetime.utcnow().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    save_results(output, meta, results)
+    print(f"Results written to {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
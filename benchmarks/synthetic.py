@@ -0,0 +1,27 @@
+# benchmarks/synthetic.py
+
+import numpy as np
+import pandas as pd
+
+def generate_ohlcv(n_bars, seed=0, start='2000-01-01', freq='1min', start_price=100.0, volatility=0.01):
+    # Geometric random walk with a plausible high/low envelope. Minute bars
+    # keep 10M-bar datasets inside pandas' timestamp range.
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, volatility, n_bars)))
+    open = np.empty(n_bars)
+    open[0] = start_price
+    open[1:] = close[:-1]
+    spread = np.abs(rng.normal(0, volatility / 2, n_bars)) * close
+    high = np.maximum(open, close) + spread
+    low = np.minimum(open, close) - spread
+    volume = rng.lognormal(mean=10, sigma=1, size=n_bars)
+
+    index = pd.date_range(start, periods=n_bars, freq=freq, name='timestamp')
+    return pd.DataFrame({'open': open, 'high': high, 'low': low, 'close': close, 'volume': volume}, index=index)
+
+def generate_universe(n_bars, n_symbols, seed=0, **kwargs):
+    # One independent dataset per symbol, reproducible from the seed
+    return {
+        f"SYM{i:03d}USDT": generate_ohlcv(n_bars, seed=seed + i, **kwargs)
+        for i in range(n_symbols)
+    }
@@ -9,7 +9,53 @@ API_SECRET = os.getenv('BINANCE_API_SECRET')
 
 # Trading Settings
 TRADING_PAIRS = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT']
-TIMEFRAME = '1d'  # Daily candles
+TIMEFRAME = '1d'  # Daily candles, for strategies that do not set a "timeframe"
+# Resolution of the one candle series kept per symbol; every strategy
+# timeframe is aggregated from it and must be a multiple of it. Stream mode
+# uses STREAM_INTERVAL instead.
+BASE_TIMEFRAME = '1d'
+# Bars kept per symbol and timeframe
+CANDLE_STORE_BARS = 500
+
+# Scheduler mode: 'per_strategy' runs each strategy as its own cron job,
+# 'shared' fetches market data once per tick and runs every enabled strategy on it,
+# 'stream' evaluates every enabled strategy on each closed kline from the websocket,
+# 'process' is 'shared' with the strategy evaluation spread over worker processes,
+# 'panel' is 'shared' with each strategy evaluated over all symbols at once
+SCHEDULER_MODE = 'per_strategy'
+SHARED_SCHEDULE = {"hour": 6, "minute": 0}
+STREAM_INTERVAL = '1m'
+STREAM_BUFFER_BARS = 500
+
+# Worker processes for 'process' mode (None = one per core). Tasks are shards of
+# TRADING_PAIRS ('symbols') or one strategy each ('strategies').
+PROCESS_WORKERS = None
+PROCESS_SHARDING = 'symbols'
+PROCESS_MAX_TASKS_PER_CHILD = 100
+
+# Concurrent per-symbol evaluation
+MAX_SYMBOL_WORKERS = 8
+SYMBOL_DEADLINE_SECONDS = 60
+# Whole fetch/evaluate phase of a run; keep it below the interval between runs
+RUN_DEADLINE_SECONDS = 300
+# HTTP timeout of each exchange request
+EXCHANGE_REQUEST_TIMEOUT_SECONDS = 10
+
+# Client-side request weight budget shared by every job; the last
+# EXCHANGE_ORDER_WEIGHT_RESERVE is kept for order placement
+EXCHANGE_WEIGHT_PER_MINUTE = 1200
+EXCHANGE_ORDER_WEIGHT_RESERVE = 100
+
+# Order lifecycle
+ORDER_POLL_INTERVAL_SECONDS = 30
+ORDER_FILL_TIMEOUT_SECONDS = 300
+POSITION_RECONCILE_MINUTES = 60
+
+# Max memoized indicator outputs per market snapshot
+INDICATOR_CACHE_SIZE = 128
+# Array kernels for the rolling indicators: 'auto' (numba if installed, else
+# numpy), 'numba', 'numpy' or 'pandas'
+INDICATOR_BACKEND = os.getenv('INDICATOR_BACKEND', 'auto')
 
 # Risk Management Settings
 RISK_PER_TRADE = 0.02  # 2% of account balance
@@ -19,7 +65,20 @@ TAKE_PROFIT_PERCENTAGE = 0.10  # 10% take profit
 STOP_LOSS_PERCENTAGE = 0.05  # 5% stop loss
 
 # Logging Settings
-LOG_FILE = 'logs/trading_bot.log'
+LOG_FILE = os.getenv('LOG_FILE', 'logs/trading_bot.log')
+
+# Stage timings and exchange weight, served on the API's /metrics route
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+
+# Control API (strategy params, enable/disable, schedules, /metrics), served
+# from a thread in the bot process
+API_ENABLED = os.getenv('API_ENABLED', 'True') == 'True'
+API_HOST = os.getenv('API_HOST', '127.0.0.1')
+API_PORT = int(os.getenv('API_PORT', '5000'))
+
+# Local kline cache
+KLINE_CACHE_DIR = 'data/klines'
+KLINE_CACHE_RETENTION_DAYS = 730
 
 # Database Settings
 DB_HOST = os.getenv('DB_HOST', 'localhost')
@@ -27,6 +86,14 @@ DB_PORT = os.getenv('DB_PORT', '5432')
 DB_NAME = os.getenv('DB_NAME', 'trading_bot')
 DB_USER = os.getenv('DB_USER', 'postgres')
 DB_PASSWORD = os.getenv('DB_PASSWORD', 'password')
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+# 'postgres' or 'sqlite' (SQLITE_PATH=':memory:' for an in-process database)
+DB_BACKEND = os.getenv('DB_BACKEND', 'postgres')
+SQLITE_PATH = os.getenv('SQLITE_PATH', ':memory:')
+
+# Buffered trade writes
+TRADE_WRITER_FLUSH_SIZE = 100
+TRADE_WRITER_FLUSH_SECONDS = 5
 
 
 # Email Settings
@@ -36,6 +103,16 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_RECEIVER = os.getenv('EMAIL_RECEIVER')
+# Failed sends are retried after EMAIL_RETRY_SECONDS, doubling each attempt
+EMAIL_MAX_RETRIES = 5
+EMAIL_RETRY_SECONDS = 30
+# How long shutdown waits for queued email reports to be sent
+EMAIL_SHUTDOWN_SECONDS = 120
+
+# Weekly report: cached backtest sections and plot rendering processes
+# (None uses one per CPU)
+REPORT_CACHE_DIR = os.path.join('data', 'report_cache')
+REPORT_RENDER_WORKERS = None
 
 ACTIVE_STRATEGIES = [
     'strategies.combined_strategy.CombinedStrategy',
@@ -65,28 +142,33 @@ STRATEGY_PARAMETERS = {
             "atr_window": 14,
             "lookback_window": 20,
         },
+        "timeframe": "1d",
         "schedule": {"hour": 6, "minute": 0},
     },
     "RSI Strategy": {
         "rsi_period": 14,
         "buy_threshold": 30,
         "sell_threshold": 70,
+        "timeframe": "1d",
         "schedule": {"hour": 6, "minute": 0},
     },
     "Moving Average Strategy": {
         "short_window": 50,
         "long_window": 200,
+        "timeframe": "1d",
         "schedule": {"hour": 7, "minute": 0},
     },
     "Mean Reversion Strategy": {
         "z_score_window": 20,
         "buy_threshold": -2,
         "sell_threshold": 2,
+        "timeframe": "1d",
         "schedule": {"hour": 8, "minute": 0},
     },
     "Breakout Strategy": {
         "atr_window": 14,
         "lookback_window": 20,
+        "timeframe": "1d",
         "schedule": {"hour": 9, "minute": 0},
     },
 }
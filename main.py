@@ -1,186 +1,531 @@
-import pandas as pd
+import asyncio
+import sys
 import time
-from binance.client import Client
-from binance.exceptions import BinanceAPIException
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
 from config.config import *
 from utils.risk_management import (
     calculate_position_size,
     is_within_drawdown_limit,
-    can_enter_new_trade,
 )
 from utils.logger import log_trade, log_error, log_info
-from utils.database import Database
-from apscheduler.schedulers.blocking import BlockingScheduler
-from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED
+from utils.database import get_pool, trade_writer
+from utils.kline_cache import KlineCache
+from utils.candles import Candles
+from utils.kline_cache import DAY_MS
+from utils.timeframes import CandleStore, interval_to_ms
+from utils.order_manager import OrderManager
+from utils.rate_limiter import RateLimitedClient, DeadlineExceeded, request_deadline
+from utils.position_book import PositionBook, EXISTS, LIMIT_REACHED
+from utils.metrics import metrics, record_request_weight
 from datetime import datetime
 from strategy_manager import StrategyManager
-from utils.email_reporter import send_email_report
+from strategies.market_snapshot import MarketSnapshot
+from strategies.panel import Panel
+from strategies.base_strategy import group_by_timeframe
 
-def get_historical_data(client, symbol, lookback_days=500):
-    klines = client.get_historical_klines(
-        symbol,
-        Client.KLINE_INTERVAL_1DAY,
-        f"{lookback_days} days ago UTC"
-    )
-    data = pd.DataFrame(klines, columns=[
-        'timestamp', 'open', 'high', 'low', 'close', 'volume',
-        'close_time', 'quote_asset_volume', 'number_of_trades',
-        'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-    ])
-    data['timestamp'] = pd.to_datetime(data['timestamp'], unit='ms')
-    data[['open', 'high', 'low', 'close']] = data[['open', 'high', 'low', 'close']].astype(float)
-    data.set_index('timestamp', inplace=True)
-    return data
-
-def run_strategy(strategy):
-    log_info(f"Starting {strategy.get_name()}...")
-    client = Client(API_KEY, API_SECRET)
-    db = Database()
-    open_trades = []  # Fetch open trades from database if necessary
+# binance, APScheduler, psycopg2, the email reporter (backtester, matplotlib)
+# and the process/stream engines are imported where they are first used.
+# Process-mode workers are spawned and re-import this module, so they only
+# pay for what strategy evaluation needs.
+
+kline_cache = None
+kline_cache_lock = threading.Lock()
+# Base candles per symbol; every strategy timeframe is derived from them
+candle_store = CandleStore(BASE_TIMEFRAME, CANDLE_STORE_BARS)
+client = None
+client_lock = threading.Lock()
+
+def get_client():
+    # One rate-limited client, and so one HTTP session, shared by every job
+    global client
+    with client_lock:
+        if client is None:
+            from binance.client import Client
+
+            client = RateLimitedClient(Client(API_KEY, API_SECRET,
+                                              requests_params={'timeout': EXCHANGE_REQUEST_TIMEOUT_SECONDS}))
+    return client
+
+def get_kline_cache():
+    # The on-disk kline cache, created on first use
+    global kline_cache
+    with kline_cache_lock:
+        if kline_cache is None:
+            kline_cache = KlineCache(KLINE_CACHE_DIR)
+    return kline_cache
+
+order_manager = None
+order_manager_lock = threading.Lock()
+
+# Open positions shared by every strategy job; loaded and reconciled at startup
+position_book = PositionBook()
+
+def get_order_manager():
+    # Process-wide order manager, created and started on first use
+    global order_manager
+    with order_manager_lock:
+        if order_manager is None:
+            order_manager = OrderManager(
+                get_client(),
+                poll_interval=ORDER_POLL_INTERVAL_SECONDS,
+                timeout=ORDER_FILL_TIMEOUT_SECONDS
+            )
+            order_manager.start()
+    return order_manager
+
+def get_historical_candles(client, symbol, lookback_days=500, interval=TIMEFRAME):
+    # Serve cached candles from disk and only download bars newer than the cache
+    klines = get_kline_cache().get_klines(client, symbol, interval, lookback_days)
+    return Candles.from_klines(klines)
+
+def get_historical_data(client, symbol, lookback_days=500, interval=TIMEFRAME):
+    # Only OHLCV is kept, as typed float columns on a timestamp index
+    return get_historical_candles(client, symbol, lookback_days, interval).to_frame()
+
+def get_timeframe_candles(client, symbol, timeframes, store=None):
+    # {timeframe: Candles} for symbol, all derived from the store's base
+    # series. The first request for a timeframe seeds its closed history from
+    # the exchange; after that only base bars newer than the last closed one
+    # are downloaded, and only the open bar of each timeframe is rebuilt.
+    store = store or candle_store
+    now_ms = int(time.time() * 1000)
+    base_ms = interval_to_ms(store.base_interval)
+    for timeframe in timeframes:
+        if not store.has_timeframe(symbol, timeframe) and timeframe != store.base_interval:
+            lookback_days = store.max_bars * interval_to_ms(timeframe) / DAY_MS
+            store.seed(symbol, timeframe, get_historical_candles(client, symbol, lookback_days, timeframe), now_ms)
+
+    since = store.closed_until(symbol)
+    if not since:
+        # Base bars back to the earliest open bar of any seeded timeframe
+        open_bars = [store.next_open(symbol, timeframe) for timeframe in timeframes]
+        since = min([now_ms - store.max_bars * base_ms] + [t for t in open_bars if t is not None])
+    # One extra bar of lookback so the bar opening at `since` is included
+    lookback_days = (now_ms - since + base_ms) / DAY_MS
+    store.update(symbol, get_historical_candles(client, symbol, lookback_days, store.base_interval), now_ms)
+    return {timeframe: store.get(symbol, timeframe) for timeframe in timeframes}
+
+def execute_signal(client, book, strategy_name, symbol, signal, price, current_balance):
+    # book is the process-wide PositionBook; buys reserve a slot in it before
+    # the order goes out and sells close the strategy's open position
+    from binance.exceptions import BinanceAPIException
+
+    if signal == 'buy':
+        status, position = book.reserve(strategy_name, symbol)
+        if status == LIMIT_REACHED:
+            log_info("Maximum concurrent trades limit reached.")
+            return
+        if status == EXISTS:
+            log_info(f"Trade already open for {symbol}.")
+            return
+
+        order_placed = False
+        stop_loss_price = price * (1 - STOP_LOSS_PERCENTAGE)
+        take_profit_price = price * (1 + TAKE_PROFIT_PERCENTAGE)
+        quantity = calculate_position_size(current_balance, price, stop_loss_price)
+        quantity = round(quantity, 6)  # Adjust precision as needed
+
+        def on_fill(order_status):
+            # Insert trade into database. Runs on the order manager thread,
+            # after the run that placed the order may have finished.
+            trade_data = (
+                datetime.utcnow(), 'buy', symbol, quantity, price,
+                price, stop_loss_price, take_profit_price, None  # Profit is None for buy orders
+            )
+            trade_writer.write(trade_data)
+            trade_writer.flush()
+            book.fill(position, quantity, price, stop_loss_price, take_profit_price)
+
+            # Place OCO order for stop-loss and take-profit
+            try:
+                oco_order = client.create_oco_order(
+                    symbol=symbol,
+                    side='SELL',
+                    quantity=quantity,
+                    price=str(round(take_profit_price, 2)),
+                    stopPrice=str(round(stop_loss_price, 2)),
+                    stopLimitPrice=str(round(stop_loss_price * 0.99, 2)),
+                    stopLimitTimeInForce='GTC'
+                )
+                book.set_exit(position, oco_order['orderListId'])
+                log_info(f"OCO order placed for {symbol}.")
+            except BinanceAPIException as e:
+                log_error(f"Failed to place OCO order for {symbol}: {e}")
+
+        def release_slot(order_status):
+            # Canceled, rejected or timed out: free the reserved slot
+            book.release(position)
+
+        try:
+            # Place a limit buy order to ensure price
+            with metrics.span('order_place', symbol=symbol):
+                order = client.order_limit_buy(
+                    symbol=symbol,
+                    quantity=quantity,
+                    price=str(price)
+                )
+            record_request_weight(client)
+            order_id = order['orderId']
+            log_trade('buy', symbol, quantity, price)
+            log_info(f"Limit buy order placed for {symbol} at price {price}, order ID: {order_id}")
+
+            # The order manager polls for the fill and fires the callbacks
+            get_order_manager().track(
+                symbol, order_id,
+                on_fill=on_fill,
+                on_cancel=release_slot,
+                on_timeout=release_slot
+            )
+            order_placed = True
+        except BinanceAPIException as e:
+            log_error(f"Binance API Exception occurred: {e}")
+        except Exception as e:
+            log_error(f"An error occurred while placing buy order: {e}")
+
+        if not order_placed:
+            release_slot(None)
+
+    elif signal == 'sell':
+        # Sell the position this strategy holds in the symbol, if any
+        position = book.get(strategy_name, symbol)
+        if position is not None and position.is_open:
+            quantity = position.quantity
+            entry_price = position.entry_price
+            try:
+                # The OCO exit locks the coins, so it is canceled first. If it
+                # is no longer open a leg may already have sold them.
+                if not book.cancel_exit(client, position):
+                    book.reconcile(client)
+                    if book.get(strategy_name, symbol) is not position:
+                        log_info(f"{strategy_name} position in {symbol} was already closed by its OCO order.")
+                        return
+                    # Canceled on the exchange; the coins are still held
+                    book.set_exit(position, None)
+
+                # Place market sell order
+                with metrics.span('order_place', symbol=symbol):
+                    order = client.order_market_sell(
+                        symbol=symbol,
+                        quantity=quantity
+                    )
+                record_request_weight(client)
+                if order['status'] != 'FILLED':
+                    log_error(f"Market sell order for {symbol} ended {order['status']}, position kept open.")
+                    return
+                # Average price over the order's fills
+                sell_price = float(order['cummulativeQuoteQty']) / float(order['executedQty'])
+                log_trade('sell', symbol, quantity, sell_price)
+                log_info(f"Market sell order placed for {symbol}, order ID: {order['orderId']}")
+
+                # Compute profit
+                profit = (sell_price - entry_price) * quantity
+
+                # Insert trade into database
+                trade_data = (
+                    datetime.utcnow(), 'sell', symbol, quantity, sell_price,
+                    None, None, None, profit
+                )
+                trade_writer.write(trade_data)
+                book.close(position)
+            except BinanceAPIException as e:
+                log_error(f"Binance API Exception occurred while selling {symbol}: {e}")
+            except Exception as e:
+                log_error(f"An error occurred while placing sell order for {symbol}: {e}")
+        else:
+            log_info(f"No open trade for {symbol} to sell.")
+
+def run_per_symbol(process_symbol, run_name, run_deadline=None):
+    # Evaluate TRADING_PAIRS concurrently with bounded parallelism.
+    # process_symbol(symbol, deadline) gets a time.monotonic() deadline
+    # SYMBOL_DEADLINE_SECONDS after it starts, capped by the run deadline;
+    # exchange reads it makes past the deadline raise DeadlineExceeded. Symbols
+    # not done by the run deadline are logged and abandoned, so a hung request
+    # cannot hold the run past its next cron slot.
+    if run_deadline is None:
+        run_deadline = time.monotonic() + RUN_DEADLINE_SECONDS
+
+    def run_symbol(symbol):
+        deadline = min(run_deadline, time.monotonic() + SYMBOL_DEADLINE_SECONDS)
+        with request_deadline(deadline):
+            process_symbol(symbol, deadline)
 
+    max_workers = max(1, min(MAX_SYMBOL_WORKERS, len(TRADING_PAIRS)))
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {executor.submit(run_symbol, symbol): symbol for symbol in TRADING_PAIRS}
     try:
-        current_balance = float(client.get_asset_balance(asset='USDT')['free'])
+        for future in as_completed(futures, timeout=max(0.0, run_deadline - time.monotonic())):
+            try:
+                future.result()
+            except DeadlineExceeded as e:
+                log_error(f"{run_name} for {futures[future]} exceeded its deadline, skipped: {e}")
+            except Exception as e:
+                log_error(f"An error occurred in {run_name} for {futures[future]}: {e}")
+    except FutureTimeoutError:
+        late = [symbol for future, symbol in futures.items() if not future.done()]
+        log_error(f"{run_name} passed its deadline, abandoning {', '.join(late)}.")
+    finally:
+        # Queued symbols are dropped; running ones finish in the background
+        # and skip their orders once past their deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def run_strategy(strategy_manager, name):
+    # The run uses a snapshot of the live strategy, so param updates made
+    # while it is in progress apply from the next run
+    strategy = strategy_manager.snapshot(name)
+    if strategy is None:
+        log_info(f"{name} is disabled, skipping run.")
+        return
+    log_info(f"Starting {name}...")
+    client = get_client()
+    timeframe = strategy.get_timeframe()
+
+    try:
+        with metrics.span('balance', strategy=name):
+            current_balance = float(client.get_asset_balance(asset='USDT')['free'])
+        record_request_weight(client)
         starting_balance = current_balance  # Update as needed
 
         if not is_within_drawdown_limit(current_balance, starting_balance):
             log_info("Maximum drawdown limit reached. Stopping the bot.")
             return
 
-        for symbol in TRADING_PAIRS:
-            data = get_historical_data(client, symbol)
-            data = strategy.apply_indicators(data)
-            signal = strategy.generate_signal(data)
+        def process_symbol(symbol, deadline):
+            with metrics.span('klines', strategy=name, symbol=symbol):
+                data = get_timeframe_candles(client, symbol, [timeframe])[timeframe].to_frame()
+            record_request_weight(client)
+            with metrics.span('indicators', strategy=name, symbol=symbol):
+                data = strategy.apply_indicators(data)
+            with metrics.span('signal', strategy=name, symbol=symbol):
+                signal = strategy.generate_signal(data)
             price = data['close'].iloc[-1]
 
-            # Check if we can enter a new trade
-            if not can_enter_new_trade(open_trades):
-                log_info("Maximum concurrent trades limit reached.")
-                break
+            if time.monotonic() > deadline:
+                log_error(f"Evaluating {symbol} exceeded {SYMBOL_DEADLINE_SECONDS}s, skipping stale signal.")
+                return
+            with metrics.span('execute', strategy=name, symbol=symbol):
+                execute_signal(client, position_book, name, symbol, signal, price, current_balance)
+
+        with metrics.span('run', strategy=name):
+            run_per_symbol(process_symbol, name)
+
+        log_info(f"{strategy.get_name()} run completed.")
+    except Exception as e:
+        log_error(f"An error occurred in {strategy.get_name()}: {e}")
+    finally:
+        trade_writer.flush()
+
+def run_all_strategies(strategy_manager):
+    # Shared mode: fetch each symbol once per tick, compute the union of the
+    # required indicators once per timeframe and run every enabled strategy on
+    # the snapshot of its timeframe
+    strategies = strategy_manager.get_enabled_strategies()
+    groups = group_by_timeframe(strategies)
+    log_info(f"Starting shared run for {len(strategies)} strategies...")
+    client = get_client()
 
-            # Check if we already have an open trade for this symbol
-            if any(trade['symbol'] == symbol for trade in open_trades):
-                log_info(f"Trade already open for {symbol}.")
+    try:
+        with metrics.span('balance', strategy='shared'):
+            current_balance = float(client.get_asset_balance(asset='USDT')['free'])
+        record_request_weight(client)
+        starting_balance = current_balance  # Update as needed
+
+        if not is_within_drawdown_limit(current_balance, starting_balance):
+            log_info("Maximum drawdown limit reached. Stopping the bot.")
+            return
+
+        def process_symbol(symbol, deadline):
+            with metrics.span('klines', strategy='shared', symbol=symbol):
+                candles = get_timeframe_candles(client, symbol, list(groups))
+            record_request_weight(client)
+
+            for timeframe, group in groups.items():
+                snapshot = MarketSnapshot(symbol, candles[timeframe].to_frame())
+                with metrics.span('indicators', strategy='shared', symbol=symbol):
+                    snapshot.compute_all(group)
+                price = snapshot.candles['close'].iloc[-1]
+
+                for strategy in group:
+                    name = strategy.get_name()
+                    try:
+                        with metrics.span('signal', strategy=name, symbol=symbol):
+                            signal = strategy.generate_signal(snapshot.frame_for(strategy))
+                        if time.monotonic() > deadline:
+                            log_error(f"Evaluating {symbol} exceeded {SYMBOL_DEADLINE_SECONDS}s, skipping stale signals.")
+                            return
+                        with metrics.span('execute', strategy=name, symbol=symbol):
+                            execute_signal(client, position_book, name, symbol, signal, price, current_balance)
+                    except Exception as e:
+                        log_error(f"An error occurred in {name} for {symbol}: {e}")
+
+        with metrics.span('run', strategy='shared'):
+            run_per_symbol(process_symbol, "shared run")
+
+        log_info("Shared run completed.")
+    except Exception as e:
+        log_error(f"An error occurred in the shared run: {e}")
+    finally:
+        trade_writer.flush()
+
+def run_in_processes(strategy_manager, runner):
+    # Process mode: download candles here, evaluate the strategies in worker
+    # processes and place orders from this process against the position book
+    strategies = strategy_manager.get_enabled_strategies()
+    groups = group_by_timeframe(strategies)
+    log_info(f"Starting process run for {len(strategies)} strategies...")
+    client = get_client()
+    run_deadline = time.monotonic() + RUN_DEADLINE_SECONDS
+
+    try:
+        with metrics.span('balance', strategy='process'):
+            current_balance = float(client.get_asset_balance(asset='USDT')['free'])
+        record_request_weight(client)
+        starting_balance = current_balance  # Update as needed
+
+        if not is_within_drawdown_limit(current_balance, starting_balance):
+            log_info("Maximum drawdown limit reached. Stopping the bot.")
+            return
+
+        universe = {}
+
+        def fetch_symbol(symbol, deadline):
+            with metrics.span('klines', strategy='process', symbol=symbol):
+                universe[symbol] = get_timeframe_candles(client, symbol, list(groups))
+            record_request_weight(client)
+
+        run_per_symbol(fetch_symbol, "process run", run_deadline)
+        signals = []
+        for timeframe, group in groups.items():
+            with metrics.span('evaluate', strategy='process'):
+                signals.extend(runner.evaluate(group, {symbol: universe[symbol][timeframe] for symbol in TRADING_PAIRS
+                                                       if symbol in universe}))
+
+        for name, symbol, signal, price in signals:
+            if signal != 'hold' and time.monotonic() > run_deadline:
+                log_error(f"{name} signal for {symbol} is past the run deadline, skipping stale signal.")
                 continue
+            with metrics.span('execute', strategy=name, symbol=symbol):
+                execute_signal(client, position_book, name, symbol, signal, price, current_balance)
 
-            if signal == 'buy':
-                stop_loss_price = price * (1 - STOP_LOSS_PERCENTAGE)
-                take_profit_price = price * (1 + TAKE_PROFIT_PERCENTAGE)
-                quantity = calculate_position_size(current_balance, price, stop_loss_price)
-                quantity = round(quantity, 6)  # Adjust precision as needed
+        log_info("Process run completed.")
+    except Exception as e:
+        log_error(f"An error occurred in the process run: {e}")
+    finally:
+        trade_writer.flush()
+
+def run_panel(strategy_manager):
+    # Panel mode: fetch every symbol, then evaluate each strategy once per
+    # timeframe over a (time, symbols) panel of the whole universe instead of
+    # once per symbol
+    strategies = strategy_manager.get_enabled_strategies()
+    groups = group_by_timeframe(strategies)
+    log_info(f"Starting panel run for {len(strategies)} strategies...")
+    client = get_client()
+    run_deadline = time.monotonic() + RUN_DEADLINE_SECONDS
+
+    try:
+        with metrics.span('balance', strategy='panel'):
+            current_balance = float(client.get_asset_balance(asset='USDT')['free'])
+        record_request_weight(client)
+        starting_balance = current_balance  # Update as needed
 
+        if not is_within_drawdown_limit(current_balance, starting_balance):
+            log_info("Maximum drawdown limit reached. Stopping the bot.")
+            return
+
+        universe = {}
+
+        def fetch_symbol(symbol, deadline):
+            with metrics.span('klines', strategy='panel', symbol=symbol):
+                universe[symbol] = get_timeframe_candles(client, symbol, list(groups))
+            record_request_weight(client)
+
+        run_per_symbol(fetch_symbol, "panel run", run_deadline)
+        symbols = [symbol for symbol in TRADING_PAIRS if symbol in universe]
+        signals = []
+        for timeframe, group in groups.items():
+            panel = Panel.from_candles({symbol: universe[symbol][timeframe] for symbol in symbols})
+            # Each symbol acts on its own latest bar, which is not on the last
+            # row when another symbol has a newer one
+            rows = panel.latest_rows()
+            prices = panel.latest_close()
+            for strategy in group:
+                name = strategy.get_name()
                 try:
-                    # Place a limit buy order to ensure price
-                    order = client.order_limit_buy(
-                        symbol=symbol,
-                        quantity=quantity,
-                        price=str(price)
-                    )
-                    order_id = order['orderId']
-                    log_trade('buy', symbol, quantity, price)
-                    log_info(f"Limit buy order placed for {symbol} at price {price}, order ID: {order_id}")
-
-                    # Wait for order to be filled
-                    order_filled = False
-                    attempts = 0
-                    while not order_filled and attempts < 10:
-                        order_status = client.get_order(symbol=symbol, orderId=order_id)
-                        status = order_status['status']
-                        if status == 'FILLED':
-                            log_info(f"Order {order_id} for {symbol} filled.")
-                            order_filled = True
-                        elif status in ['CANCELED', 'REJECTED', 'EXPIRED']:
-                            log_error(f"Order {order_id} for {symbol} not filled. Status: {status}")
-                            break
-                        else:
-                            log_info(f"Waiting for order {order_id} to be filled. Current status: {status}")
-                            time.sleep(30)  # Wait for 30 seconds before checking again
-                            attempts += 1
-
-                    if order_filled:
-                        # Insert trade into database
-                        trade_data = (
-                            datetime.utcnow(), 'buy', symbol, quantity, price,
-                            price, stop_loss_price, take_profit_price, None  # Profit is None for buy orders
-                        )
-                        db.insert_trade(trade_data)
-                        open_trades.append({
-                            'symbol': symbol,
-                            'quantity': quantity,
-                            'entry_price': price,
-                            'stop_loss': stop_loss_price,
-                            'take_profit': take_profit_price
-                        })
-
-                        # Place OCO order for stop-loss and take-profit
-                        try:
-                            oco_order = client.create_oco_order(
-                                symbol=symbol,
-                                side='SELL',
-                                quantity=quantity,
-                                price=str(round(take_profit_price, 2)),
-                                stopPrice=str(round(stop_loss_price, 2)),
-                                stopLimitPrice=str(round(stop_loss_price * 0.99, 2)),
-                                stopLimitTimeInForce='GTC'
-                            )
-                            log_info(f"OCO order placed for {symbol}.")
-                        except BinanceAPIException as e:
-                            log_error(f"Failed to place OCO order for {symbol}: {e}")
-                    else:
-                        # Cancel the order if it was not filled after attempts
-                        client.cancel_order(symbol=symbol, orderId=order_id)
-                        log_info(f"Order {order_id} for {symbol} canceled after timeout.")
-                except BinanceAPIException as e:
-                    log_error(f"Binance API Exception occurred: {e}")
+                    with metrics.span('signal', strategy=name):
+                        latest = panel.latest(strategy.generate_panel_signals(panel))
                 except Exception as e:
-                    log_error(f"An error occurred while placing buy order: {e}")
-
-            elif signal == 'sell':
-                # Implement sell logic if holding positions
-                # Check if we have an open trade for this symbol
-                trade = next((trade for trade in open_trades if trade['symbol'] == symbol), None)
-                if trade:
-                    quantity = trade['quantity']
-                    entry_price = trade['entry_price']
-                    try:
-                        # Place market sell order
-                        order = client.order_market_sell(
-                            symbol=symbol,
-                            quantity=quantity
-                        )
-                        # Assume we get the average price from the order fills
-                        sell_price = float(order['fills'][0]['price'])
-                        log_trade('sell', symbol, quantity, sell_price)
-                        log_info(f"Market sell order placed for {symbol}, order ID: {order['orderId']}")
-
-                        # Compute profit
-                        profit = (sell_price - entry_price) * quantity
-
-                        # Insert trade into database
-                        trade_data = (
-                            datetime.utcnow(), 'sell', symbol, quantity, sell_price,
-                            None, None, None, profit
-                        )
-                        db.insert_trade(trade_data)
-
-                        open_trades = [t for t in open_trades if t['symbol'] != symbol]
-                    except BinanceAPIException as e:
-                        log_error(f"Binance API Exception occurred while selling {symbol}: {e}")
-                    except Exception as e:
-                        log_error(f"An error occurred while placing sell order for {symbol}: {e}")
-                else:
-                    log_info(f"No open trade for {symbol} to sell.")
+                    log_error(f"An error occurred in {name}: {e}")
+                    continue
+                signals.extend((name, symbol, str(latest[column]), prices[column])
+                               for column, symbol in enumerate(panel.symbols) if rows[column] >= 0)
 
-        log_info(f"{strategy.get_name()} run completed.")
+        for name, symbol, signal, price in signals:
+            if signal != 'hold' and time.monotonic() > run_deadline:
+                log_error(f"{name} signal for {symbol} is past the run deadline, skipping stale signal.")
+                continue
+            with metrics.span('execute', strategy=name, symbol=symbol):
+                execute_signal(client, position_book, name, symbol, signal, price, current_balance)
+
+        log_info("Panel run completed.")
     except Exception as e:
-        log_error(f"An error occurred in {strategy.get_name()}: {e}")
+        log_error(f"An error occurred in the panel run: {e}")
     finally:
-        db.close()
+        trade_writer.flush()
+
+async def run_stream(strategy_manager):
+    # Streaming mode: evaluate the enabled strategies on every closed kline
+    from utils.kline_stream import BinanceKlineSource
+    from stream_engine import StreamingEngine
+
+    client = get_client()
+
+    def on_signal(strategy, symbol, signal, price):
+        try:
+            current_balance = float(client.get_asset_balance(asset='USDT')['free'])
+            execute_signal(client, position_book, strategy.get_name(), symbol, signal, price, current_balance)
+        except Exception as e:
+            log_error(f"An error occurred in {strategy.get_name()} for {symbol}: {e}")
+        finally:
+            trade_writer.flush()
+
+    source = BinanceKlineSource(TRADING_PAIRS, STREAM_INTERVAL, API_KEY, API_SECRET)
+    engine = StreamingEngine(strategy_manager, source, on_signal, buffer_bars=STREAM_BUFFER_BARS)
+    timeframes = list(group_by_timeframe(strategy_manager.get_enabled_strategies()))
+    for symbol in TRADING_PAIRS:
+        get_timeframe_candles(client, symbol, timeframes, engine.store)
+    await engine.run()
+
+def send_weekly_report():
+    # The report pulls in the backtester and matplotlib, so it is imported on first run
+    from utils.email_reporter import send_email_report
+
+    send_email_report()
+
+def stop_report_mailer():
+    # Send the reports still queued before exiting; the reporter is only
+    # loaded once a report was built
+    email_reporter = sys.modules.get('utils.email_reporter')
+    if email_reporter is not None and not email_reporter.report_mailer.stop(EMAIL_SHUTDOWN_SECONDS):
+        log_error("Email reports were still unsent at shutdown.")
 
 
 if __name__ == "__main__":
-    scheduler = BlockingScheduler()
+    from apscheduler.schedulers.blocking import BlockingScheduler
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED
+
+    # In streaming mode the scheduler only runs the housekeeping jobs, in the background
+    scheduler = BackgroundScheduler() if SCHEDULER_MODE == 'stream' else BlockingScheduler()
     strategy_manager = StrategyManager()
     strategy_manager.load_strategies()
+    strategy_manager.attach_scheduler(scheduler)
+    get_pool(DB_BACKEND)  # Create the connection pool and schema once at startup
+    position_book.load()
+    try:
+        position_book.reconcile(get_client())
+    except Exception as e:
+        log_error(f"Failed to reconcile positions with the exchange: {e}")
 
     def scheduler_error_listener(event):
         if event.exception:
@@ -190,22 +535,55 @@ if __name__ == "__main__":
 
     scheduler.add_listener(scheduler_error_listener, EVENT_JOB_ERROR | EVENT_JOB_EXECUTED)
 
-    # Schedule each strategy with its own schedule
-    for strategy in strategy_manager.get_strategies():
-        params = STRATEGY_PARAMETERS[strategy.get_name()]
-        schedule = params["schedule"]
+    if SCHEDULER_MODE == 'stream':
+        log_info(f"Streaming {STREAM_INTERVAL} klines for {len(TRADING_PAIRS)} symbols")
+    elif SCHEDULER_MODE == 'process':
+        from process_engine import ProcessStrategyRunner
+
+        runner = ProcessStrategyRunner(PROCESS_WORKERS, PROCESS_MAX_TASKS_PER_CHILD, PROCESS_SHARDING)
         scheduler.add_job(
-            run_strategy,
+            run_in_processes,
             'cron',
-            args=[strategy],
-            id=strategy.get_name(),
-            **schedule
+            args=[strategy_manager, runner],
+            id='process_run',
+            **SHARED_SCHEDULE
         )
-        log_info(f"Scheduled {strategy.get_name()} to run at {schedule}")
+        log_info(f"Scheduled process run of all strategies at {SHARED_SCHEDULE}")
+    elif SCHEDULER_MODE == 'panel':
+        scheduler.add_job(
+            run_panel,
+            'cron',
+            args=[strategy_manager],
+            id='panel_run',
+            **SHARED_SCHEDULE
+        )
+        log_info(f"Scheduled panel run of all strategies at {SHARED_SCHEDULE}")
+    elif SCHEDULER_MODE == 'shared':
+        # One job fetches data once per tick and fans it out to all strategies
+        scheduler.add_job(
+            run_all_strategies,
+            'cron',
+            args=[strategy_manager],
+            id='shared_run',
+            **SHARED_SCHEDULE
+        )
+        log_info(f"Scheduled shared run of all strategies at {SHARED_SCHEDULE}")
+    else:
+        # Schedule each strategy with its own schedule
+        for strategy in strategy_manager.get_strategies():
+            schedule = strategy.params["schedule"]
+            scheduler.add_job(
+                run_strategy,
+                'cron',
+                args=[strategy_manager, strategy.get_name()],
+                id=strategy.get_name(),
+                **schedule
+            )
+            log_info(f"Scheduled {strategy.get_name()} to run at {schedule}")
 
     # Schedule the email report job (e.g., every Sunday at 12:00 UTC)
     scheduler.add_job(
-        send_email_report,
+        send_weekly_report,
         'cron',
         day_of_week='sun',
         hour=12,
@@ -214,11 +592,69 @@ if __name__ == "__main__":
     )
     log_info("Scheduled email report to run every Sunday at 12:00 UTC")
 
+    def compact_kline_cache():
+        kline_cache = get_kline_cache()
+        kline_cache.evict(TRADING_PAIRS)
+        base_interval = STREAM_INTERVAL if SCHEDULER_MODE == 'stream' else BASE_TIMEFRAME
+        intervals = {base_interval, *group_by_timeframe(strategy_manager.get_strategies())}
+        for symbol in TRADING_PAIRS:
+            for interval in intervals:
+                kline_cache.compact(symbol, interval, KLINE_CACHE_RETENTION_DAYS)
+
+    scheduler.add_job(
+        compact_kline_cache,
+        'cron',
+        day_of_week='sun',
+        hour=0,
+        minute=0,
+        id='kline_cache_compaction'
+    )
+    log_info("Scheduled kline cache compaction to run every Sunday at 00:00 UTC")
+
+    # Write buffered trades that no later write would flush
+    scheduler.add_job(
+        trade_writer.flush,
+        'interval',
+        seconds=TRADE_WRITER_FLUSH_SECONDS,
+        id='trade_writer_flush'
+    )
+
+    # Catch positions closed on the exchange by their OCO orders
+    scheduler.add_job(
+        position_book.reconcile,
+        'interval',
+        args=[get_client()],
+        minutes=POSITION_RECONCILE_MINUTES,
+        id='position_reconciliation'
+    )
+    log_info(f"Scheduled position reconciliation every {POSITION_RECONCILE_MINUTES} minutes")
+
+    if API_ENABLED:
+        # The control API runs in this process so it acts on the live strategies
+        from api_server import create_app
+
+        api = create_app(strategy_manager)
+        threading.Thread(
+            target=api.run, kwargs={'host': API_HOST, 'port': API_PORT, 'use_reloader': False},
+            name='control-api', daemon=True
+        ).start()
+        log_info(f"Control API listening on {API_HOST}:{API_PORT}")
+
     try:
         log_info("Scheduler started. Bot will run at scheduled times.")
         scheduler.start()
+        if SCHEDULER_MODE == 'stream':
+            asyncio.run(run_stream(strategy_manager))
     except (KeyboardInterrupt, SystemExit):
+        if order_manager is not None:
+            order_manager.stop()
+        if SCHEDULER_MODE == 'process':
+            runner.shutdown()
         log_info("Scheduler stopped.")
     except Exception as e:
         log_error(f"An unexpected error occurred in the scheduler: {e}")
         scheduler.shutdown()
+    finally:
+        if not trade_writer.flush():
+            log_error(f"{trade_writer.pending()} trades could not be written before shutdown.")
+        stop_report_mailer()
@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from strategies.market_snapshot import MarketSnapshot
+from utils.shared_candles import SharedCandles
+from utils.logger import log_info, log_error
+
+
+def shard(items, n_shards):
+    # Round-robin split into at most n_shards non-empty lists
+    n_shards = max(1, min(n_shards, len(items)))
+    return [items[i::n_shards] for i in range(n_shards)]
+
+
+def make_tasks(strategies, symbols, n_workers, by='symbols'):
+    if by == 'strategies':
+        # One task per strategy over every symbol
+        return [([strategy], symbols) for strategy in strategies]
+    # Every strategy on a shard of the symbols, sharing indicator computation
+    return [(strategies, symbol_shard) for symbol_shard in shard(symbols, n_workers)]
+
+
+def evaluate_shard(spec, strategies, symbols):
+    # Worker entry point: read candles from shared memory and return
+    # (signals, errors). No orders are placed here.
+    signals = []
+    errors = []
+    shared = SharedCandles.attach(spec)
+    try:
+        for symbol in symbols:
+            try:
+                snapshot = MarketSnapshot(symbol, shared.candles(symbol).to_frame())
+                snapshot.compute_all(strategies)
+                price = float(snapshot.candles['close'].iloc[-1])
+            except Exception as e:
+                errors.append((None, symbol, str(e)))
+                continue
+            for strategy in strategies:
+                try:
+                    signal = strategy.generate_signal(snapshot.frame_for(strategy))
+                    signals.append((strategy.get_name(), symbol, signal, price))
+                except Exception as e:
+                    errors.append((strategy.get_name(), symbol, str(e)))
+    finally:
+        snapshot = None
+        shared.close()
+    return signals, errors
+
+
+class ProcessStrategyRunner:
+    # Evaluates strategies in a pool of worker processes so the pandas work
+    # runs on every core, and a crash in one worker only fails its own task.
+    # Market data goes to the workers through one shared memory block per run;
+    # the strategies themselves are pickled, so workers always see the live
+    # params. Workers are spawned (the bot process runs threads) and recycled
+    # after max_tasks_per_child tasks to contain leaks.
+    def __init__(self, max_workers=None, max_tasks_per_child=None, by='symbols'):
+        self.max_workers = max_workers or os.cpu_count()
+        self.max_tasks_per_child = max_tasks_per_child
+        self.by = by
+        self.executor = None
+
+    def get_executor(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                max_tasks_per_child=self.max_tasks_per_child
+            )
+        return self.executor
+
+    def evaluate(self, strategies, universe):
+        # universe maps symbol -> Candles. Returns a list of
+        # (strategy_name, symbol, signal, price) in task order.
+        if not strategies or not universe:
+            return []
+        signals = []
+        broken = False
+        with SharedCandles.create(universe) as shared:
+            executor = self.get_executor()
+            tasks = make_tasks(strategies, list(universe), self.max_workers, self.by)
+            futures = [executor.submit(evaluate_shard, shared.spec(), task_strategies, symbols)
+                       for task_strategies, symbols in tasks]
+            # The shared block must outlive every task, so wait for all of them
+            for future in futures:
+                try:
+                    task_signals, errors = future.result()
+                except BrokenProcessPool as e:
+                    log_error(f"A strategy worker process died: {e}")
+                    broken = True
+                    continue
+                except Exception as e:
+                    log_error(f"A strategy worker task failed: {e}")
+                    continue
+                signals.extend(task_signals)
+                for name, symbol, error in errors:
+                    log_error(f"An error occurred in {name or 'indicator computation'} for {symbol}: {error}")
+
+        if broken:
+            # Replace the broken pool on the next run
+            self.shutdown()
+        log_info(f"Evaluated {len(strategies)} strategies on {len(universe)} symbols in {len(futures)} tasks.")
+        return signals
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
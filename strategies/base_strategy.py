@@ -1,14 +1,195 @@
 from abc import ABC, abstractmethod
+import copy
+import math
+import numpy as np
+import pandas as pd
+from config.config import TIMEFRAME
+from utils.timeframes import interval_to_ms
+from .indicator_registry import unique_indicators
+
+# Bars in the synthetic frame a param update is tried on before it goes live
+DRY_RUN_BARS = 300
 
 class BaseStrategy(ABC):
+    # Name the strategy is registered under (STRATEGY_PARAMETERS key, job id),
+    # readable from the class without instantiating it
+    name = None
+    enabled = True
+
     @abstractmethod
-    def apply_indicators(self, data):
+    def required_indicators(self):
+        # List of Indicator specs the strategy reads
         pass
 
+    def apply_indicators(self, data):
+        # Returns a new frame with the namespaced indicator columns added;
+        # data itself is left untouched
+        outputs = {}
+        cache = {}
+        for indicator in unique_indicators([self]):
+            outputs.update(indicator.compute(data, cache))
+        return data.assign(**outputs)
+
     @abstractmethod
     def generate_signal(self, data):
         pass
 
-    @abstractmethod
+    def signal_bars(self):
+        # Number of latest rows generate_signal reads, so callers can pass a
+        # short tail instead of the whole history; None for all of them
+        return None
+
+    def generate_signals(self, data):
+        # Fallback: evaluate the per-bar signal on every expanding slice.
+        # Strategies should override this with a vectorized version.
+        signals = []
+        for i in range(len(data)):
+            try:
+                signals.append(self.generate_signal(data.iloc[:i + 1]))
+            except IndexError:
+                signals.append('hold')
+        return pd.Series(signals, index=data.index, dtype=object)
+
+    def generate_panel_signals(self, panel):
+        # Signals for every bar and symbol of a strategies.panel.Panel, as a
+        # (time, symbols) array; 'hold' where a symbol has no bar. Fallback:
+        # the vectorized per-symbol signals, one symbol at a time. Strategies
+        # should override this with a version over the whole panel.
+        signals = np.full(panel.shape, 'hold', dtype=object)
+        for column, symbol in enumerate(panel.symbols):
+            data, rows = panel.frame(symbol)
+            if len(rows):
+                signals[rows, column] = self.generate_signals(self.apply_indicators(data)).to_numpy()
+        return signals
+
     def get_name(self):
-        pass
+        return self.name
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def with_params(self, params):
+        # Shallow copy configured with params; self is left untouched
+        strategy = copy.copy(self)
+        strategy.params = params
+        return strategy
+
+    def update_params(self, new_params):
+        # Validates new_params (see try_params) and swaps them in, so a
+        # rejected update raises ValueError and leaves the strategy as it was
+        return self.swap_params(self.try_params(new_params))
+
+    def try_params(self, new_params):
+        # Copy with new_params coerced to the types of the values they replace
+        # (see coerce_params) and merged into the current params (nested dicts
+        # key by key), tried on a small synthetic frame: indicators and a
+        # signal. self is left untouched; raises ValueError.
+        # The schedule is rejected: only StrategyManager.update_strategy_schedule
+        # also reschedules the strategy's job.
+        if 'schedule' in new_params:
+            raise ValueError("schedule is not a param; update it with update_strategy_schedule")
+        updated = self.with_params(merge_params(self.params, coerce_params(self.params, new_params)))
+        try:
+            interval_to_ms(updated.get_timeframe())
+            updated.generate_signal(updated.apply_indicators(dry_run_frame()))
+        except Exception as e:
+            raise ValueError(f"{self.get_name()} rejected the params: {e}") from e
+        return updated
+
+    def swap_params(self, updated):
+        # Take over the params of updated, a copy from try_params. Returns the
+        # indicators the strategy no longer reads, for logging. Indicator
+        # caches are per snapshot (a MarketSnapshot per run, and a
+        # StreamingSnapshot per symbol that drops state no strategy reads on
+        # its next bar), so there is nothing to evict here.
+        old_indicators = unique_indicators([self])
+        new_indicators = unique_indicators([updated])
+        vars(self).update(vars(updated))
+        return [indicator for indicator in old_indicators if indicator not in new_indicators]
+
+    def snapshot(self):
+        # Copy for one evaluation: later updates replace the live strategy's
+        # attributes instead of mutating them, so the copy keeps its params
+        return copy.copy(self)
+
+    def get_timeframe(self):
+        # Candle interval the strategy is evaluated on ("timeframe" in its params)
+        return (getattr(self, 'params', None) or {}).get('timeframe', TIMEFRAME)
+
+
+def coerce_params(params, new_params, path=''):
+    # new_params with every value converted to the type of the value it
+    # replaces: numbers stay finite numbers, strings strings, booleans
+    # booleans, and objects are coerced key by key. Windows and periods must
+    # be positive integers. Keys without a current value are left to the dry
+    # run. Raises ValueError.
+    coerced = {}
+    for key, value in new_params.items():
+        name = f"{path}{key}"
+        current = (params or {}).get(key)
+        if isinstance(current, dict):
+            if not isinstance(value, dict):
+                raise ValueError(f"{name} must be an object, got {value!r}")
+            coerced[key] = coerce_params(current, value, f"{name}.")
+        elif current is None:
+            coerced[key] = value
+        else:
+            coerced[key] = coerce_value(name, current, value)
+        if key.endswith(('window', 'period')) and not (
+                isinstance(coerced[key], int) and not isinstance(coerced[key], bool) and coerced[key] > 0):
+            raise ValueError(f"{name} must be a positive integer, got {value!r}")
+    return coerced
+
+
+def coerce_value(name, current, value):
+    if isinstance(current, bool):
+        if not isinstance(value, bool):
+            raise ValueError(f"{name} must be true or false, got {value!r}")
+        return value
+    if isinstance(current, (int, float)):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be a number, got {value!r}") from None
+        if isinstance(value, bool) or not math.isfinite(number):
+            raise ValueError(f"{name} must be a number, got {value!r}")
+        return int(number) if number.is_integer() else number
+    if isinstance(current, str) and not isinstance(value, str):
+        raise ValueError(f"{name} must be a string, got {value!r}")
+    return value
+
+
+def dry_run_frame():
+    # Deterministic OHLCV random walk to try params on
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, DRY_RUN_BARS)))
+    spread = rng.random(DRY_RUN_BARS) * 0.02
+    index = pd.date_range('2020-01-01', periods=DRY_RUN_BARS, freq='D', name='timestamp')
+    return pd.DataFrame({
+        'open': close,
+        'high': close * (1 + spread),
+        'low': close * (1 - spread),
+        'close': close,
+        'volume': rng.random(DRY_RUN_BARS),
+    }, index=index)
+
+
+def merge_params(params, new_params):
+    merged = dict(params or {})
+    for key, value in new_params.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = merge_params(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+def group_by_timeframe(strategies):
+    # {timeframe: [strategies]} in first-seen order, so each timeframe's
+    # candles and indicators are prepared once per symbol
+    groups = {}
+    for strategy in strategies:
+        groups.setdefault(strategy.get_timeframe(), []).append(strategy)
+    return groups
@@ -1,25 +1,64 @@
+import numpy as np
+import pandas as pd
 from .base_strategy import BaseStrategy
-from .indicators import calculate_atr
+from .indicator_registry import Indicator
+from .indicators import rolling_extreme
 
 class BreakoutStrategy(BaseStrategy):
+    name = "Breakout Strategy"
+
     def __init__(self, params):
         self.params = params
 
-    def apply_indicators(self, data):
-        data = calculate_atr(data, window=self.params.get('atr_window', 14))
-        return data
+    def atr_indicator(self):
+        return Indicator('atr', window=self.params.get('atr_window', 14))
+
+    def required_indicators(self):
+        return [self.atr_indicator()]
 
     def generate_signal(self, data):
         latest = data.iloc[-1]
-        resistance = data['high'].rolling(window=self.params.get('lookback_window', 20)).max().iloc[-2]
-        support = data['low'].rolling(window=self.params.get('lookback_window', 20)).min().iloc[-2]
+        atr = latest[self.atr_indicator().column('atr')]
+        lookback_window = self.params.get('lookback_window', 20)
+        # The completed window before the latest bar; NaN, like the rolling
+        # version, until there are enough bars
+        if len(data) > lookback_window:
+            resistance = data['high'].iloc[-lookback_window - 1:-1].max(skipna=False)
+            support = data['low'].iloc[-lookback_window - 1:-1].min(skipna=False)
+        else:
+            resistance = support = np.nan
 
-        if latest['close'] > resistance + latest['atr']:
+        if latest['close'] > resistance + atr:
             return 'buy'
-        elif latest['close'] < support - latest['atr']:
+        elif latest['close'] < support - atr:
             return 'sell'
         else:
             return 'hold'
 
-    def get_name(self):
-        return "Breakout Strategy"
+    def signal_bars(self):
+        # The lookback window before the latest bar, and the latest bar
+        return self.params.get('lookback_window', 20) + 1
+
+    def generate_signals(self, data):
+        lookback_window = self.params.get('lookback_window', 20)
+        # Shift by one bar to match the .iloc[-2] lookup in generate_signal
+        resistance = rolling_extreme(data['high'], lookback_window, 'max').shift()
+        support = rolling_extreme(data['low'], lookback_window, 'min').shift()
+        atr = data[self.atr_indicator().column('atr')]
+        signals = np.select(
+            [data['close'] > resistance + atr, data['close'] < support - atr],
+            ['buy', 'sell'],
+            default='hold'
+        )
+        return pd.Series(signals, index=data.index, dtype=object)
+
+    def generate_panel_signals(self, panel):
+        lookback_window = self.params.get('lookback_window', 20)
+        resistance = panel.shift(panel.rolling_extreme(panel.high, lookback_window, 'max'))
+        support = panel.shift(panel.rolling_extreme(panel.low, lookback_window, 'min'))
+        atr = panel.compute(self.atr_indicator())['atr']
+        return np.select(
+            [panel.close > resistance + atr, panel.close < support - atr],
+            ['buy', 'sell'],
+            default='hold'
+        )
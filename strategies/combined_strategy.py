@@ -1,14 +1,22 @@
+import numpy as np
+import pandas as pd
 from .base_strategy import BaseStrategy
+from .indicator_registry import unique_indicators
 from .rsi_strategy import RSIStrategy
 from .moving_average_strategy import MovingAverageStrategy
 from .mean_reversion_strategy import MeanReversionStrategy
 from .breakout_strategy import BreakoutStrategy
 
 class CombinedStrategy(BaseStrategy):
+    name = "Combined Strategy"
+
     def __init__(self, params):
         self.params = params
+        self.strategies = self.build_strategies(params)
+
+    def build_strategies(self, params):
         # Initialize individual strategies
-        self.strategies = [
+        return [
             RSIStrategy(params.get('RSI Strategy', {})),
             MovingAverageStrategy(params.get('Moving Average Strategy', {})),
             MeanReversionStrategy(params.get('Mean Reversion Strategy', {})),
@@ -16,11 +24,15 @@ class CombinedStrategy(BaseStrategy):
             # Add more strategies if needed
         ]
 
-    def apply_indicators(self, data):
-        # Apply indicators from all strategies
-        for strategy in self.strategies:
-            data = strategy.apply_indicators(data)
-        return data
+    def with_params(self, params):
+        # The sub-strategies are rebuilt from their nested params
+        strategy = super().with_params(params)
+        strategy.strategies = self.build_strategies(params)
+        return strategy
+
+    def required_indicators(self):
+        # Union of the indicators of all strategies, deduplicated by (name, params)
+        return unique_indicators(self.strategies)
 
     def generate_signal(self, data):
         signals = []
@@ -31,6 +43,10 @@ class CombinedStrategy(BaseStrategy):
         final_signal = self.aggregate_signals(signals)
         return final_signal
 
+    def signal_bars(self):
+        bars = [strategy.signal_bars() for strategy in self.strategies]
+        return None if None in bars else max(bars, default=1)
+
     def aggregate_signals(self, signals):
         # Example: Majority voting
         buy_count = signals.count('buy')
@@ -42,5 +58,28 @@ class CombinedStrategy(BaseStrategy):
         else:
             return 'hold'
 
-    def get_name(self):
-        return "Combined Strategy"
+    def generate_signals(self, data):
+        signals = [strategy.generate_signals(data) for strategy in self.strategies]
+        return self.aggregate_signal_series(signals)
+
+    def aggregate_signal_series(self, signals):
+        # Same majority vote as aggregate_signals, over whole Series at once
+        buy_count = sum((signal == 'buy').to_numpy(dtype=int) for signal in signals)
+        sell_count = sum((signal == 'sell').to_numpy(dtype=int) for signal in signals)
+        final_signals = np.select(
+            [buy_count > sell_count, sell_count > buy_count],
+            ['buy', 'sell'],
+            default='hold'
+        )
+        return pd.Series(final_signals, index=signals[0].index, dtype=object)
+
+    def generate_panel_signals(self, panel):
+        # The sub-strategies share the panel's indicator memo
+        signals = [strategy.generate_panel_signals(panel) for strategy in self.strategies]
+        buy_count = sum((signal == 'buy').astype(int) for signal in signals)
+        sell_count = sum((signal == 'sell').astype(int) for signal in signals)
+        return np.select(
+            [buy_count > sell_count, sell_count > buy_count],
+            ['buy', 'sell'],
+            default='hold'
+        )
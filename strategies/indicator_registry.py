@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from . import indicators
+
+# Indicator name -> function(data, cache=None, **params) returning a dict of
+# output Series
+INDICATORS = {
+    'rsi': indicators.rsi,
+    'macd': indicators.macd,
+    'bollinger_bands': indicators.bollinger_bands,
+    'moving_averages': indicators.moving_averages,
+    'z_score': indicators.z_score,
+    'atr': indicators.atr,
+}
+
+
+class Indicator:
+    # An indicator with concrete parameters. Its outputs are written to
+    # namespaced columns such as 'z_score(window=20).std', so indicators that
+    # share output names (Bollinger Bands and z-score both produce 'std')
+    # never overwrite each other.
+    def __init__(self, name, **params):
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {name}")
+        self.name = name
+        self.params = params
+        self.key = (name, tuple(sorted(params.items())))
+
+    def __eq__(self, other):
+        return isinstance(other, Indicator) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        args = ', '.join(f"{name}={value}" for name, value in self.key[1])
+        return f"{self.name}({args})"
+
+    def column(self, output):
+        return f"{self!r}.{output}"
+
+    def compute(self, data, cache=None):
+        outputs = INDICATORS[self.name](data, cache=cache, **self.params)
+        return {self.column(output): series for output, series in outputs.items()}
+
+
+class LRUCache:
+    # Dict-like memo that evicts the least recently used entry past max_entries
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __getitem__(self, key):
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def __setitem__(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+
+
+def unique_indicators(strategies):
+    # Union of the indicators required by the strategies, in first-seen order
+    seen = {}
+    for strategy in strategies:
+        for indicator in strategy.required_indicators():
+            seen.setdefault(indicator.key, indicator)
+    return list(seen.values())
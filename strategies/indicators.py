@@ -1,46 +1,139 @@
 import pandas as pd
 import numpy as np
+from . import kernels
 
-def calculate_rsi(data, period=14):
-    delta = data['close'].diff()
+# Each indicator reads from data without modifying it and returns a dict of
+# output Series. `cache` is an optional per-snapshot memo (see
+# strategies.indicator_registry) for intermediate series shared between
+# indicators, e.g. the rolling mean/std of close used by Bollinger Bands,
+# z-score and moving averages.
+#
+# The rolling computations go through the active backend in
+# strategies.kernels when there is one and the inputs have no NaN; otherwise
+# they use the pandas implementations below.
+
+def memoize(cache, key, compute):
+    if cache is None:
+        return compute()
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+def kernel_for(name, *series):
+    # The active backend's kernel, or None when pandas should be used
+    backend = kernels.active_kernels()
+    if backend is None or any(s.isna().any() for s in series):
+        return None
+    return backend[name]
+
+def values(series):
+    return series.to_numpy(dtype=np.float64)
+
+def rolling_stat(data, column, window, stat, cache=None):
+    key = ('rolling', column, stat, window)
+    if cache is not None and key in cache:
+        return cache[key]
+    series = data[column]
+    kernel = kernel_for('rolling_mean_std' if stat == 'std' else 'rolling_mean', series)
+    if kernel is None:
+        rolling = series.rolling(window=window)
+        result = rolling.mean() if stat == 'mean' else rolling.std()
+    elif stat == 'std':
+        # Mean and std come out of the same pass; keep both
+        mean, std = kernel(values(series), window)
+        result = pd.Series(std, index=series.index, name=column)
+        if cache is not None:
+            cache[('rolling', column, 'mean', window)] = pd.Series(mean, index=series.index, name=column)
+    else:
+        result = pd.Series(kernel(values(series), window), index=series.index, name=column)
+    if cache is not None:
+        cache[key] = result
+    return result
+
+def rolling_extreme(series, window, stat):
+    # Rolling max or min of one series
+    kernel = kernel_for('rolling_max' if stat == 'max' else 'rolling_min', series)
+    if kernel is None:
+        rolling = series.rolling(window=window)
+        return rolling.max() if stat == 'max' else rolling.min()
+    return pd.Series(kernel(values(series), window), index=series.index, name=series.name)
+
+def ewm_mean(series, span, key, cache=None):
+    return memoize(cache, ('ewm', key, span), lambda: series.ewm(span=span, adjust=False).mean())
+
+def true_range(data, cache=None):
+    def compute():
+        kernel = kernel_for('true_range', data['high'], data['low'], data['close'])
+        if kernel is not None:
+            return pd.Series(kernel(values(data['high']), values(data['low']), values(data['close'])),
+                             index=data.index)
+        high_low = data['high'] - data['low']
+        high_close = np.abs(data['high'] - data['close'].shift())
+        low_close = np.abs(data['low'] - data['close'].shift())
+        ranges = pd.concat([high_low, high_close, low_close], axis=1)
+        return ranges.max(axis=1)
+    return memoize(cache, ('true_range',), compute)
+
+def rsi(data, period=14, cache=None):
+    kernel = kernel_for('rsi', data['close'])
+    if kernel is not None:
+        return {'rsi': pd.Series(kernel(values(data['close']), period), index=data.index)}
+    delta = memoize(cache, ('diff', 'close'), lambda: data['close'].diff())
     gain = delta.clip(lower=0)
     loss = -1 * delta.clip(upper=0)
     avg_gain = gain.rolling(window=period).mean()
     avg_loss = loss.rolling(window=period).mean()
     rs = avg_gain / avg_loss
-    data['rsi'] = 100 - (100 / (1 + rs))
-    return data
+    return {'rsi': 100 - (100 / (1 + rs))}
+
+def macd(data, cache=None):
+    exp1 = ewm_mean(data['close'], 12, 'close', cache)
+    exp2 = ewm_mean(data['close'], 26, 'close', cache)
+    macd_line = exp1 - exp2
+    return {'macd': macd_line, 'macd_signal': macd_line.ewm(span=9, adjust=False).mean()}
+
+def bollinger_bands(data, window=20, cache=None):
+    sma = rolling_stat(data, 'close', window, 'mean', cache)
+    std = rolling_stat(data, 'close', window, 'std', cache)
+    return {'sma': sma, 'std': std, 'upper_band': sma + (std * 2), 'lower_band': sma - (std * 2)}
+
+def moving_averages(data, short_window=50, long_window=200, cache=None):
+    return {
+        'ma_short': rolling_stat(data, 'close', short_window, 'mean', cache),
+        'ma_long': rolling_stat(data, 'close', long_window, 'mean', cache),
+    }
+
+def z_score(data, window=20, cache=None):
+    mean = rolling_stat(data, 'close', window, 'mean', cache)
+    std = rolling_stat(data, 'close', window, 'std', cache)
+    # A constant window has std 0 and the close at its mean: z-score 0
+    return {'mean': mean, 'std': std, 'z_score': ((data['close'] - mean) / std).mask(std == 0, 0.0)}
+
+def atr(data, window=14, cache=None):
+    kernel = kernel_for('atr', data['high'], data['low'], data['close'])
+    if kernel is not None:
+        # True range and its mean in one pass
+        atr_values = kernel(values(data['high']), values(data['low']), values(data['close']), window)
+        return {'atr': pd.Series(atr_values, index=data.index)}
+    return {'atr': true_range(data, cache).rolling(window=window).mean()}
+
+# The calculate_* functions return a new frame with the plain (un-namespaced)
+# output columns added; the caller's frame is left untouched.
+
+def calculate_rsi(data, period=14):
+    return data.assign(**rsi(data, period))
 
 def calculate_macd(data):
-    exp1 = data['close'].ewm(span=12, adjust=False).mean()
-    exp2 = data['close'].ewm(span=26, adjust=False).mean()
-    data['macd'] = exp1 - exp2
-    data['macd_signal'] = data['macd'].ewm(span=9, adjust=False).mean()
-    return data
+    return data.assign(**macd(data))
 
 def calculate_bollinger_bands(data, window=20):
-    data['sma'] = data['close'].rolling(window=window).mean()
-    data['std'] = data['close'].rolling(window=window).std()
-    data['upper_band'] = data['sma'] + (data['std'] * 2)
-    data['lower_band'] = data['sma'] - (data['std'] * 2)
-    return data
+    return data.assign(**bollinger_bands(data, window))
 
 def calculate_moving_averages(data, short_window=50, long_window=200):
-    data['ma_short'] = data['close'].rolling(window=short_window).mean()
-    data['ma_long'] = data['close'].rolling(window=long_window).mean()
-    return data
+    return data.assign(**moving_averages(data, short_window, long_window))
 
 def calculate_z_score(data, window=20):
-    data['mean'] = data['close'].rolling(window=window).mean()
-    data['std'] = data['close'].rolling(window=window).std()
-    data['z_score'] = (data['close'] - data['mean']) / data['std']
-    return data
+    return data.assign(**z_score(data, window))
 
 def calculate_atr(data, window=14):
-    high_low = data['high'] - data['low']
-    high_close = np.abs(data['high'] - data['close'].shift())
-    low_close = np.abs(data['low'] - data['close'].shift())
-    ranges = pd.concat([high_low, high_close, low_close], axis=1)
-    true_range = ranges.max(axis=1)
-    data['atr'] = true_range.rolling(window=window).mean()
-    return data
+    return data.assign(**atr(data, window))
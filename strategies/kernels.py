@@ -0,0 +1,334 @@
+# Array kernels behind strategies/indicators.py. Each backend is a dict of
+# functions on float64 NumPy arrays; outputs match the pandas implementations
+# (same NaN warm-up, min_periods equal to the window) up to float rounding.
+#
+# Running sums leave a rounding residue when values leave the window, so a
+# window of identical values would come out with a mean slightly off the
+# value and a std (or RSI average loss) slightly above zero, turning pandas'
+# 0 or NaN into +-inf. Like pandas, the kernels detect constant windows and
+# return the value itself as the mean and exactly 0 as the std.
+#
+#   'numba' - fused single-pass loops compiled with Numba (optional dependency)
+#   'numpy' - vectorized NumPy: blocked cumulative sums for rolling mean/std,
+#             the van Herk/Gil-Werman block algorithm for rolling max/min
+#   'pandas' - no kernels; indicators.py uses its pandas code paths
+#
+# Kernels assume finite inputs. Callers check for NaN and fall back to pandas,
+# whose NaN handling (skipna, min_periods) the kernels do not reproduce.
+#
+# The NumPy kernels also take 2-D (time, series) arrays and roll every column
+# along axis 0; strategies/panel.py uses them for (time, symbols) panels.
+
+import numpy as np
+from config.config import INDICATOR_BACKEND
+
+# Output rows per block for the cumulative-sum kernels. Sums are taken
+# relative to each block's mean so they stay small and precise.
+BLOCK_SIZE = 1 << 16
+
+
+# NumPy kernels
+
+def constant_windows(x, window):
+    # True where the window ending at each row is full and holds one value
+    changes = np.zeros(x.shape, dtype=np.int64)
+    changes[1:] = np.cumsum(x[1:] != x[:-1], axis=0)
+    out = np.zeros(x.shape, dtype=bool)
+    if len(x) < window:
+        return out
+    out[window - 1:] = changes[window - 1:] == changes[:len(x) - window + 1]
+    return out
+
+
+def rolling_mean_std_numpy(x, window, ddof=1, with_std=True):
+    n = len(x)
+    mean = np.full(x.shape, np.nan)
+    std = np.full(x.shape, np.nan) if with_std else None
+    zero = np.zeros((1,) + x.shape[1:])
+    for start in range(window - 1, n, BLOCK_SIZE):
+        end = min(start + BLOCK_SIZE, n)
+        segment = x[start - window + 1:end]
+        center = segment.mean(axis=0)
+        d = segment - center
+        s1 = np.concatenate([zero, np.cumsum(d, axis=0)])
+        sum1 = s1[window:] - s1[:-window]
+        block_mean = sum1 / window
+        mean[start:end] = block_mean + center
+        if with_std:
+            s2 = np.concatenate([zero, np.cumsum(d * d, axis=0)])
+            sum2 = s2[window:] - s2[:-window]
+            var = (sum2 - window * block_mean * block_mean) / (window - ddof)
+            std[start:end] = np.sqrt(np.maximum(var, 0.0))
+    constant = constant_windows(x, window)
+    mean[constant] = x[constant]
+    if with_std:
+        std[constant] = 0.0
+    return mean, std
+
+
+def rolling_mean_numpy(x, window):
+    return rolling_mean_std_numpy(x, window, with_std=False)[0]
+
+
+def rolling_extreme_numpy(x, window, reduce):
+    # Window [i - window + 1, i] = suffix of one block + prefix of the next,
+    # so two accumulates per block replace the window scan
+    n = len(x)
+    out = np.full(x.shape, np.nan)
+    if n < window:
+        return out
+    fill = -np.inf if reduce is np.maximum else np.inf
+    blocks = -(-n // window)
+    rows = (blocks * window,) + x.shape[1:]
+    padded = np.full(rows, fill)
+    padded[:n] = x
+    padded = padded.reshape((blocks, window) + x.shape[1:])
+    prefix = reduce.accumulate(padded, axis=1).reshape(rows)
+    suffix = reduce.accumulate(padded[:, ::-1], axis=1)[:, ::-1].reshape(rows)
+    out[window - 1:] = reduce(suffix[:n - window + 1], prefix[window - 1:n])
+    return out
+
+
+def rolling_max_numpy(x, window):
+    return rolling_extreme_numpy(x, window, np.maximum)
+
+
+def rolling_min_numpy(x, window):
+    return rolling_extreme_numpy(x, window, np.minimum)
+
+
+def true_range_numpy(high, low, close):
+    tr = high - low
+    previous = close[:-1]
+    tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(high[1:] - previous), np.abs(low[1:] - previous)))
+    return tr
+
+
+def atr_numpy(high, low, close, window):
+    return rolling_mean_numpy(true_range_numpy(high, low, close), window)
+
+
+def rsi_numpy(close, period):
+    out = np.full(close.shape, np.nan)
+    delta = np.diff(close, axis=0)
+    avg_gain = rolling_mean_numpy(np.maximum(delta, 0.0), period)
+    avg_loss = rolling_mean_numpy(np.maximum(-delta, 0.0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[1:] = 100 - 100 / (1 + avg_gain / avg_loss)
+    return out
+
+
+# Loop kernels, compiled by Numba when it is installed
+
+def rolling_mean_std_loop(x, window, ddof=1):
+    # Welford's update with removal of the value leaving the window
+    n = x.shape[0]
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    m = 0.0
+    m2 = 0.0
+    count = 0
+    same = 0  # length of the run of identical values ending at i
+    for i in range(n):
+        value = x[i]
+        same = same + 1 if i > 0 and value == x[i - 1] else 1
+        count += 1
+        delta = value - m
+        m += delta / count
+        m2 += delta * (value - m)
+        if i >= window:
+            old = x[i - window]
+            count -= 1
+            delta = old - m
+            m -= delta / count
+            m2 -= delta * (old - m)
+        if i >= window - 1:
+            if same >= window:
+                mean[i] = value
+                std[i] = 0.0
+            else:
+                mean[i] = m
+                std[i] = np.sqrt(max(m2, 0.0) / (window - ddof))
+    return mean, std
+
+
+def rolling_mean_loop(x, window):
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    total = 0.0
+    same = 0
+    for i in range(n):
+        same = same + 1 if i > 0 and x[i] == x[i - 1] else 1
+        total += x[i]
+        if i >= window:
+            total -= x[i - window]
+        if i >= window - 1:
+            out[i] = x[i] if same >= window else total / window
+    return out
+
+
+def rolling_extreme_loop(x, window, sign):
+    # Monotonic deque of indices (sign 1 for max, -1 for min), kept in an array
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    queue = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    for i in range(n):
+        value = x[i] * sign
+        while tail > head and x[queue[tail - 1]] * sign <= value:
+            tail -= 1
+        queue[tail] = i
+        tail += 1
+        if queue[head] <= i - window:
+            head += 1
+        if i >= window - 1:
+            out[i] = x[queue[head]]
+    return out
+
+
+def rolling_max_loop(x, window):
+    return rolling_extreme_loop(x, window, 1.0)
+
+
+def rolling_min_loop(x, window):
+    return rolling_extreme_loop(x, window, -1.0)
+
+
+def true_range_loop(high, low, close):
+    n = high.shape[0]
+    tr = np.empty(n)
+    for i in range(n):
+        tr[i] = high[i] - low[i]
+        if i > 0:
+            tr[i] = max(tr[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+    return tr
+
+
+def atr_loop(high, low, close, window):
+    # True range and its rolling mean in one pass
+    n = high.shape[0]
+    out = np.full(n, np.nan)
+    ranges = np.empty(n)
+    total = 0.0
+    same = 0
+    for i in range(n):
+        tr = high[i] - low[i]
+        if i > 0:
+            tr = max(tr, abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+        ranges[i] = tr
+        same = same + 1 if i > 0 and tr == ranges[i - 1] else 1
+        total += tr
+        if i >= window:
+            total -= ranges[i - window]
+        if i >= window - 1:
+            out[i] = tr if same >= window else total / window
+    return out
+
+
+def rsi_loop(close, period):
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    gains = 0.0
+    losses = 0.0
+    # Bars in the window with a gain / a loss; when there are none the sum
+    # is exactly 0 rather than the residue of the subtractions
+    gain_count = 0
+    loss_count = 0
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        gains += max(delta, 0.0)
+        losses += max(-delta, 0.0)
+        gain_count += delta > 0.0
+        loss_count += delta < 0.0
+        if i > period:
+            old = close[i - period] - close[i - period - 1]
+            gains -= max(old, 0.0)
+            losses -= max(-old, 0.0)
+            gain_count -= old > 0.0
+            loss_count -= old < 0.0
+        if gain_count == 0:
+            gains = 0.0
+        if loss_count == 0:
+            losses = 0.0
+        if i >= period:
+            if losses != 0.0:
+                out[i] = 100 - 100 / (1 + gains / losses)
+            elif gains != 0.0:
+                out[i] = 100.0
+    return out
+
+
+NUMPY_KERNELS = {
+    'rolling_mean': rolling_mean_numpy,
+    'rolling_mean_std': rolling_mean_std_numpy,
+    'rolling_max': rolling_max_numpy,
+    'rolling_min': rolling_min_numpy,
+    'true_range': true_range_numpy,
+    'atr': atr_numpy,
+    'rsi': rsi_numpy,
+}
+
+LOOP_KERNELS = {
+    'rolling_mean': rolling_mean_loop,
+    'rolling_mean_std': rolling_mean_std_loop,
+    'rolling_max': rolling_max_loop,
+    'rolling_min': rolling_min_loop,
+    'true_range': true_range_loop,
+    'atr': atr_loop,
+    'rsi': rsi_loop,
+}
+
+
+def numba_kernels():
+    try:
+        import numba
+    except ImportError:
+        return None
+    jit = numba.njit(cache=True)
+    kernels = {name: jit(function) for name, function in LOOP_KERNELS.items()
+               if name not in ('rolling_max', 'rolling_min')}
+    # Compiled functions cannot call the uncompiled max/min wrappers, so
+    # those stay in Python around the compiled deque
+    extreme = jit(rolling_extreme_loop)
+    kernels['rolling_max'] = lambda x, window: extreme(x, window, 1.0)
+    kernels['rolling_min'] = lambda x, window: extreme(x, window, -1.0)
+    return kernels
+
+
+_backends = {}
+_active = None
+
+
+def get_backend(name):
+    # Kernel dict for a backend name, or None for 'pandas'
+    if name == 'auto':
+        return get_backend('numba') or get_backend('numpy')
+    if name == 'pandas':
+        return None
+    if name not in _backends:
+        if name == 'numba':
+            _backends[name] = numba_kernels()
+        elif name == 'numpy':
+            _backends[name] = NUMPY_KERNELS
+        else:
+            raise ValueError(f"Unknown indicator backend: {name}")
+    return _backends[name]
+
+
+def set_backend(name):
+    global _active
+    if name == 'auto':
+        name = 'numba' if get_backend('numba') is not None else 'numpy'
+    _active = (name, get_backend(name))
+
+
+def active_kernels():
+    if _active is None:
+        set_backend(INDICATOR_BACKEND)
+    return _active[1]
+
+
+def backend_name():
+    active_kernels()
+    return _active[0]
@@ -0,0 +1,32 @@
+import pandas as pd
+from config.config import INDICATOR_CACHE_SIZE
+from .indicator_registry import LRUCache, unique_indicators
+
+BASE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+class MarketSnapshot:
+    # Candles for one symbol fetched once per tick. Every indicator is computed
+    # once per (name, params) key and memoized in an LRU cache, as are the
+    # intermediate series indicators share. Each strategy gets its own frame
+    # with the base columns plus the namespaced indicator columns it declared.
+    def __init__(self, symbol, data, cache_size=INDICATOR_CACHE_SIZE):
+        self.symbol = symbol
+        self.candles = data[[column for column in BASE_COLUMNS if column in data.columns]].copy()
+        self.indicators = LRUCache(cache_size)
+        self.intermediates = LRUCache(cache_size)
+
+    def compute(self, indicator):
+        if indicator.key not in self.indicators:
+            self.indicators[indicator.key] = indicator.compute(self.candles, self.intermediates)
+        return self.indicators[indicator.key]
+
+    def compute_all(self, strategies):
+        for indicator in unique_indicators(strategies):
+            self.compute(indicator)
+
+    def frame_for(self, strategy):
+        outputs = {}
+        for indicator in unique_indicators([strategy]):
+            outputs.update(self.compute(indicator))
+        return pd.concat([self.candles, pd.DataFrame(outputs, index=self.candles.index)], axis=1)
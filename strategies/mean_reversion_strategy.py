@@ -1,22 +1,45 @@
+import numpy as np
+import pandas as pd
 from .base_strategy import BaseStrategy
-from .indicators import calculate_z_score
+from .indicator_registry import Indicator
 
 class MeanReversionStrategy(BaseStrategy):
+    name = "Mean Reversion Strategy"
+
     def __init__(self, params):
         self.params = params
 
-    def apply_indicators(self, data):
-        data = calculate_z_score(data, window=self.params.get('z_score_window', 20))
-        return data
+    def z_score_indicator(self):
+        return Indicator('z_score', window=self.params.get('z_score_window', 20))
+
+    def required_indicators(self):
+        return [self.z_score_indicator()]
 
     def generate_signal(self, data):
-        latest = data.iloc[-1]
-        if latest['z_score'] <= self.params.get('buy_threshold', -2):
+        z_score = data[self.z_score_indicator().column('z_score')].iloc[-1]
+        if z_score <= self.params.get('buy_threshold', -2):
             return 'buy'
-        elif latest['z_score'] >= self.params.get('sell_threshold', 2):
+        elif z_score >= self.params.get('sell_threshold', 2):
             return 'sell'
         else:
             return 'hold'
 
-    def get_name(self):
-        return "Mean Reversion Strategy"
+    def signal_bars(self):
+        return 1
+
+    def generate_signals(self, data):
+        z_score = data[self.z_score_indicator().column('z_score')]
+        signals = np.select(
+            [z_score <= self.params.get('buy_threshold', -2), z_score >= self.params.get('sell_threshold', 2)],
+            ['buy', 'sell'],
+            default='hold'
+        )
+        return pd.Series(signals, index=data.index, dtype=object)
+
+    def generate_panel_signals(self, panel):
+        z_score = panel.compute(self.z_score_indicator())['z_score']
+        return np.select(
+            [z_score <= self.params.get('buy_threshold', -2), z_score >= self.params.get('sell_threshold', 2)],
+            ['buy', 'sell'],
+            default='hold'
+        )
@@ -1,27 +1,65 @@
+import numpy as np
+import pandas as pd
 from .base_strategy import BaseStrategy
-from .indicators import calculate_moving_averages
+from .indicator_registry import Indicator
 
 class MovingAverageStrategy(BaseStrategy):
+    name = "Moving Average Strategy"
+
     def __init__(self, params):
         self.params = params
 
-    def apply_indicators(self, data):
-        data = calculate_moving_averages(
-            data,
+    def moving_averages_indicator(self):
+        return Indicator(
+            'moving_averages',
             short_window=self.params.get('short_window', 50),
             long_window=self.params.get('long_window', 200)
         )
-        return data
+
+    def required_indicators(self):
+        return [self.moving_averages_indicator()]
 
     def generate_signal(self, data):
-        latest = data.iloc[-1]
-        previous = data.iloc[-2]
-        if previous['ma_short'] < previous['ma_long'] and latest['ma_short'] >= latest['ma_long']:
+        indicator = self.moving_averages_indicator()
+        ma_short = data[indicator.column('ma_short')]
+        ma_long = data[indicator.column('ma_long')]
+        if ma_short.iloc[-2] < ma_long.iloc[-2] and ma_short.iloc[-1] >= ma_long.iloc[-1]:
             return 'buy'
-        elif previous['ma_short'] > previous['ma_long'] and latest['ma_short'] <= latest['ma_long']:
+        elif ma_short.iloc[-2] > ma_long.iloc[-2] and ma_short.iloc[-1] <= ma_long.iloc[-1]:
             return 'sell'
         else:
             return 'hold'
 
-    def get_name(self):
-        return "Moving Average Strategy"
+    def signal_bars(self):
+        # The crossover compares the latest two bars
+        return 2
+
+    def generate_signals(self, data):
+        indicator = self.moving_averages_indicator()
+        ma_short = data[indicator.column('ma_short')]
+        ma_long = data[indicator.column('ma_long')]
+        prev_short = ma_short.shift()
+        prev_long = ma_long.shift()
+        # The first bar has no previous bar, so the shifted NaNs make it 'hold'
+        signals = np.select(
+            [
+                (prev_short < prev_long) & (ma_short >= ma_long),
+                (prev_short > prev_long) & (ma_short <= ma_long),
+            ],
+            ['buy', 'sell'],
+            default='hold'
+        )
+        return pd.Series(signals, index=data.index, dtype=object)
+
+    def generate_panel_signals(self, panel):
+        outputs = panel.compute(self.moving_averages_indicator())
+        ma_short, ma_long = outputs['ma_short'], outputs['ma_long']
+        prev_short, prev_long = panel.shift(ma_short), panel.shift(ma_long)
+        return np.select(
+            [
+                (prev_short < prev_long) & (ma_short >= ma_long),
+                (prev_short > prev_long) & (ma_short <= ma_long),
+            ],
+            ['buy', 'sell'],
+            default='hold'
+        )
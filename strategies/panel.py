@@ -0,0 +1,281 @@
+import numpy as np
+import pandas as pd
+from . import kernels
+
+# Cross-asset evaluation: OHLCV for many symbols as float64 arrays shaped
+# (time, symbols) on one shared time axis, with NaN where a symbol has no bar
+# (listed later, or a gap). The panel indicators below mirror
+# strategies.indicators and return the same output names, as (time, symbols)
+# arrays computed for every symbol in one pass: the 2-D NumPy kernels when
+# INDICATOR_BACKEND selects kernels (Numba's are 1-D), and column-wise
+# DataFrame rolling when it is 'pandas', as for the per-symbol path.
+#
+# Windows, shifts and EWMs run over each symbol's own bars, as on the
+# per-symbol frames: the indicators see a compacted panel with every symbol's
+# bars stacked from row 0 (Panel.bars) and their outputs are put back on the
+# shared time axis (Panel.align), NaN where the symbol has no bar. A missing
+# bar is skipped rather than breaking the windows around it, so panel and
+# per-symbol evaluation give the same signals.
+
+BASE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class Panel:
+    def __init__(self, timestamp, symbols, open, high, low, close, volume):
+        self.timestamp = timestamp
+        self.symbols = list(symbols)
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        # Indicator outputs by Indicator.key, and intermediates shared between
+        # them; a panel lives for one evaluation, so neither is bounded
+        self.indicators = {}
+        self.intermediates = {}
+        # Per column, the rows holding the symbol's bars first (in time
+        # order), then its missing rows (False without gaps), and the
+        # compacted panel
+        self.order = None
+        self.compacted = None
+
+    @classmethod
+    def from_candles(cls, universe):
+        # universe is {symbol: Candles}; rows are the union of open times
+        symbols = list(universe)
+        timestamp = np.unique(np.concatenate([universe[symbol].timestamp for symbol in symbols])) \
+            if symbols else np.empty(0, dtype=np.int64)
+        fields = {field: np.full((len(timestamp), len(symbols)), np.nan) for field in BASE_FIELDS}
+        for column, symbol in enumerate(symbols):
+            candles = universe[symbol]
+            rows = np.searchsorted(timestamp, candles.timestamp)
+            for field in BASE_FIELDS:
+                fields[field][rows, column] = getattr(candles, field)
+        return cls(timestamp, symbols, **fields)
+
+    @classmethod
+    def from_frames(cls, frames):
+        # frames is {symbol: OHLCV DataFrame on a DatetimeIndex}
+        index = pd.DatetimeIndex([])
+        for frame in frames.values():
+            index = index.union(frame.index)
+        fields = {field: pd.DataFrame({symbol: frame[field] for symbol, frame in frames.items()}, index=index)
+                  .to_numpy(dtype=np.float64) for field in BASE_FIELDS}
+        # Open times in ms whatever the index resolution
+        timestamp = index.values.astype('datetime64[ms]').astype(np.int64)
+        return cls(timestamp, frames, **fields)
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+    def frame(self, symbol):
+        # One symbol's bars as the per-symbol strategies see them, and the
+        # panel rows they came from
+        column = self.symbols.index(symbol)
+        rows = np.flatnonzero(~np.isnan(self.close[:, column]))
+        index = pd.DatetimeIndex(pd.to_datetime(self.timestamp[rows], unit='ms'), name='timestamp')
+        data = pd.DataFrame({field: getattr(self, field)[rows, column] for field in BASE_FIELDS}, index=index)
+        return data, rows
+
+    def latest_rows(self):
+        # Row of each symbol's latest bar, -1 for a symbol with no bars
+        valid = ~np.isnan(self.close)
+        last = len(self.close) - 1 - np.argmax(valid[::-1], axis=0)
+        return np.where(valid.any(axis=0), last, -1)
+
+    def latest(self, values):
+        # values (time, symbols) at each symbol's latest bar; use where
+        # latest_rows() >= 0
+        rows = self.latest_rows()
+        return values[np.maximum(rows, 0), np.arange(len(self.symbols))]
+
+    def latest_close(self):
+        # Last known close per symbol (NaN for a symbol with no bars)
+        return np.where(self.latest_rows() >= 0, self.latest(self.close), np.nan)
+
+    def has_gaps(self):
+        # True when some symbol has a missing bar between two of its bars.
+        # Without one, every symbol's bars are a single run of rows and the
+        # windows over the shared axis already are windows over its own bars.
+        if self.order is None:
+            valid = ~np.isnan(self.close)
+            count = valid.sum(axis=0)
+            first = np.argmax(valid, axis=0)
+            last = len(valid) - 1 - np.argmax(valid[::-1], axis=0)
+            gaps = (count > 0) & (last - first + 1 != count)
+            self.order = np.argsort(~valid, axis=0, kind='stable') if gaps.any() else False
+        return self.order is not False
+
+    def bars(self, x):
+        # x (time, symbols) with each symbol's bars moved up to rows
+        # 0..count-1, followed by NaN; x itself when there are no gaps
+        if not self.has_gaps():
+            return x
+        return np.take_along_axis(x, self.order, axis=0)
+
+    def align(self, x):
+        # Inverse of bars(): back on the shared time axis, NaN where the
+        # symbol has no bar
+        out = x
+        if self.has_gaps():
+            out = np.empty(x.shape)
+            np.put_along_axis(out, self.order, x, axis=0)
+        return np.where(np.isnan(self.close), np.nan, out)
+
+    def shift(self, x):
+        # Value at each symbol's previous bar, like Series.shift() per frame
+        return self.align(shift(self.bars(x)))
+
+    def rolling_extreme(self, x, window, stat):
+        return self.align(rolling_extreme(self.bars(x), window, stat))
+
+    def compute(self, indicator):
+        if indicator.key not in self.indicators:
+            if self.compacted is None:
+                # Its rows are bar counts, not times; only the indicators read it
+                self.compacted = Panel(self.timestamp, self.symbols,
+                                       *(self.bars(getattr(self, field)) for field in BASE_FIELDS)) \
+                    if self.has_gaps() else self
+            outputs = PANEL_INDICATORS[indicator.name](
+                self.compacted, cache=self.compacted.intermediates, **indicator.params)
+            self.indicators[indicator.key] = {output: self.align(values) for output, values in outputs.items()}
+        return self.indicators[indicator.key]
+
+
+def memoize(cache, key, compute):
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+def shift(x):
+    # Previous row, NaN for the first, like Series.shift() per column
+    out = np.full(x.shape, np.nan)
+    out[1:] = x[:-1]
+    return out
+
+def window_has_gap(missing, window):
+    # True where the window ending at each row is incomplete or has a missing value
+    counts = np.concatenate([np.zeros((1,) + missing.shape[1:], dtype=np.int64),
+                             np.cumsum(missing, axis=0, dtype=np.int64)])
+    out = np.ones(missing.shape, dtype=bool)
+    out[window - 1:] = counts[window:] - counts[:-window] > 0
+    return out
+
+def fill_missing(x, missing):
+    # Missing values replaced by the column mean, which keeps the kernels'
+    # running sums at the scale of the data
+    with np.errstate(invalid='ignore'):
+        means = np.nan_to_num(np.nanmean(np.where(missing, np.nan, x), axis=0)) if x.size else 0.0
+    return np.where(missing, means, x)
+
+def use_pandas():
+    return kernels.active_kernels() is None
+
+def rolling_stat(panel, field, window, stat, cache):
+    key = ('rolling', field, stat, window)
+    if key not in cache and use_pandas():
+        rolling = pd.DataFrame(getattr(panel, field)).rolling(window)
+        cache[('rolling', field, 'mean', window)] = rolling.mean().to_numpy()
+        if stat == 'std':
+            cache[key] = rolling.std().to_numpy()
+    elif key not in cache:
+        x = getattr(panel, field)
+        missing = np.isnan(x)
+        gap = window_has_gap(missing, window)
+        mean, std = kernels.rolling_mean_std_numpy(fill_missing(x, missing), window, with_std=stat == 'std')
+        # Mean and std come out of the same pass; keep both
+        cache[('rolling', field, 'mean', window)] = np.where(gap, np.nan, mean)
+        if stat == 'std':
+            cache[key] = np.where(gap, np.nan, std)
+    return cache[key]
+
+def rolling_extreme(x, window, stat):
+    if use_pandas():
+        rolling = pd.DataFrame(x).rolling(window)
+        return (rolling.max() if stat == 'max' else rolling.min()).to_numpy()
+    missing = np.isnan(x)
+    kernel = kernels.rolling_max_numpy if stat == 'max' else kernels.rolling_min_numpy
+    return np.where(window_has_gap(missing, window), np.nan, kernel(np.where(missing, 0.0, x), window))
+
+def rsi(panel, period=14, cache=None):
+    def compute_pandas():
+        delta = pd.DataFrame(panel.close).diff()
+        avg_gain = delta.clip(lower=0).rolling(window=period).mean()
+        avg_loss = (-1 * delta.clip(upper=0)).rolling(window=period).mean()
+        return (100 - (100 / (1 + avg_gain / avg_loss))).to_numpy()
+
+    def compute():
+        delta = np.diff(panel.close, axis=0)
+        missing = np.isnan(delta)
+        gain = np.where(missing, 0.0, np.clip(delta, 0, None))
+        loss = np.where(missing, 0.0, -np.clip(delta, None, 0))
+        gap = window_has_gap(missing, period)
+        avg_gain = kernels.rolling_mean_numpy(gain, period)
+        avg_loss = kernels.rolling_mean_numpy(loss, period)
+        out = np.full(panel.shape, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[1:] = np.where(gap, np.nan, 100 - 100 / (1 + avg_gain / avg_loss))
+        return out
+    return {'rsi': memoize(cache, ('rsi', period, use_pandas()), compute_pandas if use_pandas() else compute)}
+
+def macd(panel, cache=None):
+    # EWMs are recursive rather than windowed; pandas runs them per column in C
+    close = pd.DataFrame(panel.close)
+    exp1 = memoize(cache, ('ewm', 'close', 12), lambda: close.ewm(span=12, adjust=False).mean())
+    exp2 = memoize(cache, ('ewm', 'close', 26), lambda: close.ewm(span=26, adjust=False).mean())
+    macd_line = exp1 - exp2
+    return {'macd': macd_line.to_numpy(), 'macd_signal': macd_line.ewm(span=9, adjust=False).mean().to_numpy()}
+
+def bollinger_bands(panel, window=20, cache=None):
+    std = rolling_stat(panel, 'close', window, 'std', cache)
+    sma = rolling_stat(panel, 'close', window, 'mean', cache)
+    return {'sma': sma, 'std': std, 'upper_band': sma + (std * 2), 'lower_band': sma - (std * 2)}
+
+def moving_averages(panel, short_window=50, long_window=200, cache=None):
+    return {
+        'ma_short': rolling_stat(panel, 'close', short_window, 'mean', cache),
+        'ma_long': rolling_stat(panel, 'close', long_window, 'mean', cache),
+    }
+
+def z_score(panel, window=20, cache=None):
+    std = rolling_stat(panel, 'close', window, 'std', cache)
+    mean = rolling_stat(panel, 'close', window, 'mean', cache)
+    # A constant window has std 0 and the close at its mean: z-score 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(std == 0, 0.0, (panel.close - mean) / std)
+    return {'mean': mean, 'std': std, 'z_score': z}
+
+def true_range(panel, cache):
+    def compute():
+        missing = np.isnan(panel.high) | np.isnan(panel.low) | np.isnan(panel.close)
+        previous = np.zeros(missing.shape, dtype=bool)
+        previous[1:] = np.isnan(panel.close[:-1])
+        tr = kernels.true_range_numpy(*(np.where(missing, 0.0, x) for x in (panel.high, panel.low, panel.close)))
+        # The previous close only counts when there is one, as with pandas' max(axis=1)
+        tr = np.where(previous, panel.high - panel.low, tr)
+        return tr, missing
+    return memoize(cache, ('true_range',), compute)
+
+def atr(panel, window=14, cache=None):
+    if use_pandas():
+        # Largest of the three ranges that exist, like pandas' max(axis=1)
+        previous = shift(panel.close)
+        tr = np.fmax(panel.high - panel.low,
+                     np.fmax(np.abs(panel.high - previous), np.abs(panel.low - previous)))
+        tr = np.where(np.isnan(panel.high - panel.low), np.nan, tr)
+        return {'atr': pd.DataFrame(tr).rolling(window=window).mean().to_numpy()}
+    tr, missing = true_range(panel, cache)
+    atr_values = kernels.rolling_mean_numpy(np.where(missing, 0.0, tr), window)
+    return {'atr': np.where(window_has_gap(missing, window), np.nan, atr_values)}
+
+# Indicator name -> function(panel, cache=None, **params), keyed like
+# strategies.indicator_registry.INDICATORS
+PANEL_INDICATORS = {
+    'rsi': rsi,
+    'macd': macd,
+    'bollinger_bands': bollinger_bands,
+    'moving_averages': moving_averages,
+    'z_score': z_score,
+    'atr': atr,
+}
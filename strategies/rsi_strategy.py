@@ -1,22 +1,45 @@
+import numpy as np
+import pandas as pd
 from .base_strategy import BaseStrategy
-from .indicators import calculate_rsi
+from .indicator_registry import Indicator
 
 class RSIStrategy(BaseStrategy):
+    name = "RSI Strategy"
+
     def __init__(self, params):
         self.params = params
 
-    def apply_indicators(self, data):
-        data = calculate_rsi(data, period=self.params.get('rsi_period', 14))
-        return data
+    def rsi_indicator(self):
+        return Indicator('rsi', period=self.params.get('rsi_period', 14))
+
+    def required_indicators(self):
+        return [self.rsi_indicator()]
 
     def generate_signal(self, data):
-        latest = data.iloc[-1]
-        if latest['rsi'] < self.params.get('buy_threshold', 30):
+        rsi = data[self.rsi_indicator().column('rsi')].iloc[-1]
+        if rsi < self.params.get('buy_threshold', 30):
             return 'buy'
-        elif latest['rsi'] > self.params.get('sell_threshold', 70):
+        elif rsi > self.params.get('sell_threshold', 70):
             return 'sell'
         else:
             return 'hold'
 
-    def get_name(self):
-        return "RSI Strategy"
+    def signal_bars(self):
+        return 1
+
+    def generate_signals(self, data):
+        rsi = data[self.rsi_indicator().column('rsi')]
+        signals = np.select(
+            [rsi < self.params.get('buy_threshold', 30), rsi > self.params.get('sell_threshold', 70)],
+            ['buy', 'sell'],
+            default='hold'
+        )
+        return pd.Series(signals, index=data.index, dtype=object)
+
+    def generate_panel_signals(self, panel):
+        rsi = panel.compute(self.rsi_indicator())['rsi']
+        return np.select(
+            [rsi < self.params.get('buy_threshold', 30), rsi > self.params.get('sell_threshold', 70)],
+            ['buy', 'sell'],
+            default='hold'
+        )
@@ -0,0 +1,308 @@
+# Incremental versions of the indicators in strategies/indicators.py.
+# Each indicator keeps just enough state to update in O(1) per new candle and
+# produces the same values (and the same column names) as the batch function.
+# StreamingSnapshot keeps them per symbol and timeframe for the stream engine.
+
+from collections import deque
+import math
+import numpy as np
+from .indicator_registry import unique_indicators
+
+NAN = float('nan')
+
+
+class RollingWindow:
+    # Rolling mean and sample std over a fixed window, matching
+    # Series.rolling(window).mean() / .std() (NaN until the window is full).
+    # Welford's add/remove drifts, so the moments are recomputed from the
+    # window every `window` updates, and a window of identical values gives
+    # the value itself and a std of exactly 0, as the batch kernels do.
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.nan_count = 0
+        self.count = 0
+        self.same = 0  # run of identical values ending at the latest one
+        self.updates = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            self._remove(self.values.popleft())
+        self.same = self.same + 1 if self.values and value == self.values[-1] else 1
+        self.values.append(value)
+        if math.isnan(value):
+            self.nan_count += 1
+        else:
+            self.count += 1
+            delta = value - self._mean
+            self._mean += delta / self.count
+            self._m2 += delta * (value - self._mean)
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self._recompute()
+        return self.mean
+
+    def _recompute(self):
+        finite = [value for value in self.values if not math.isnan(value)]
+        self.count = len(finite)
+        self._mean = math.fsum(finite) / self.count if finite else 0.0
+        self._m2 = math.fsum((value - self._mean) ** 2 for value in finite)
+
+    def _remove(self, value):
+        if math.isnan(value):
+            self.nan_count -= 1
+            return
+        self.count -= 1
+        if self.count == 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = value - self._mean
+        self._mean -= delta / self.count
+        self._m2 -= delta * (value - self._mean)
+
+    def is_ready(self):
+        return self.count == self.window
+
+    def is_constant(self):
+        return self.same >= self.window
+
+    @property
+    def mean(self):
+        if not self.is_ready():
+            return NAN
+        return self.values[-1] if self.is_constant() else self._mean
+
+    @property
+    def std(self):
+        if not self.is_ready() or self.window < 2:
+            return NAN
+        if self.is_constant():
+            return 0.0
+        return math.sqrt(max(self._m2, 0.0) / (self.window - 1))
+
+
+class RollingExtreme:
+    # Rolling max (or min) using a monotonic deque of (index, value) pairs
+    def __init__(self, window, mode='max'):
+        self.window = window
+        self.is_max = mode == 'max'
+        self.candidates = deque()
+        self.index = -1
+
+    def update(self, value):
+        self.index += 1
+        while self.candidates and self.candidates[0][0] <= self.index - self.window:
+            self.candidates.popleft()
+        if self.is_max:
+            while self.candidates and self.candidates[-1][1] <= value:
+                self.candidates.pop()
+        else:
+            while self.candidates and self.candidates[-1][1] >= value:
+                self.candidates.pop()
+        self.candidates.append((self.index, value))
+        return self.value
+
+    @property
+    def value(self):
+        if self.index + 1 < self.window:
+            return NAN
+        return self.candidates[0][1]
+
+
+class EWM:
+    # Exponential moving average matching Series.ewm(span=span, adjust=False).mean()
+    def __init__(self, span):
+        self.alpha = 2 / (span + 1)
+        self.value = NAN
+
+    def update(self, value):
+        if math.isnan(self.value):
+            self.value = value
+        else:
+            self.value = self.alpha * value + (1 - self.alpha) * self.value
+        return self.value
+
+
+class StreamingRSI:
+    def __init__(self, period=14):
+        self.avg_gain = RollingWindow(period)
+        self.avg_loss = RollingWindow(period)
+        self.prev_close = None
+
+    def update(self, close):
+        if self.prev_close is None:
+            gain = loss = NAN
+        else:
+            delta = close - self.prev_close
+            gain = max(delta, 0.0)
+            loss = -min(delta, 0.0)
+        self.prev_close = close
+        # Means of non-negative values; a rounding residue must not go below 0
+        avg_gain = max(self.avg_gain.update(gain), 0.0)
+        avg_loss = max(self.avg_loss.update(loss), 0.0)
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            rsi = NAN
+        elif avg_loss == 0:
+            # rs is inf (or NaN when both are 0), as in the batch version
+            rsi = 100.0 if avg_gain > 0 else NAN
+        else:
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+        return {'rsi': rsi}
+
+
+class StreamingMACD:
+    def __init__(self):
+        self.exp1 = EWM(12)
+        self.exp2 = EWM(26)
+        self.signal = EWM(9)
+
+    def update(self, close):
+        macd = self.exp1.update(close) - self.exp2.update(close)
+        return {'macd': macd, 'macd_signal': self.signal.update(macd)}
+
+
+class StreamingBollingerBands:
+    def __init__(self, window=20):
+        self.rolling = RollingWindow(window)
+
+    def update(self, close):
+        self.rolling.update(close)
+        sma = self.rolling.mean
+        std = self.rolling.std
+        return {
+            'sma': sma,
+            'std': std,
+            'upper_band': sma + (std * 2),
+            'lower_band': sma - (std * 2),
+        }
+
+
+class StreamingMovingAverages:
+    def __init__(self, short_window=50, long_window=200):
+        self.short = RollingWindow(short_window)
+        self.long = RollingWindow(long_window)
+
+    def update(self, close):
+        return {'ma_short': self.short.update(close), 'ma_long': self.long.update(close)}
+
+
+class StreamingZScore:
+    def __init__(self, window=20):
+        self.rolling = RollingWindow(window)
+
+    def update(self, close):
+        self.rolling.update(close)
+        mean = self.rolling.mean
+        std = self.rolling.std
+        if math.isnan(std):
+            z_score = NAN
+        elif std == 0:
+            # A constant window: the close is at its mean
+            z_score = 0.0
+        else:
+            z_score = (close - mean) / std
+        return {'mean': mean, 'std': std, 'z_score': z_score}
+
+
+class StreamingATR:
+    def __init__(self, window=14):
+        self.rolling = RollingWindow(window)
+        self.prev_close = None
+
+    def update(self, high, low, close):
+        true_range = high - low
+        if self.prev_close is not None:
+            true_range = max(true_range, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        return {'atr': self.rolling.update(true_range)}
+
+
+# Indicator name -> streaming class, taking the Indicator's params
+STREAMING_INDICATORS = {
+    'rsi': StreamingRSI,
+    'macd': StreamingMACD,
+    'bollinger_bands': StreamingBollingerBands,
+    'moving_averages': StreamingMovingAverages,
+    'z_score': StreamingZScore,
+    'atr': StreamingATR,
+}
+
+
+def feed(indicator, high, low, close):
+    if isinstance(indicator, StreamingATR):
+        return indicator.update(high, low, close)
+    return indicator.update(close)
+
+
+def warm_up(indicator, data):
+    # Replay a batch frame through an indicator to seed its state
+    result = {}
+    for row in data.itertuples():
+        result = feed(indicator, row.high, row.low, row.close)
+    return result
+
+
+class StreamingSnapshot:
+    # Indicator state for one symbol and timeframe. advance() feeds the bars
+    # closed since the last call through every indicator, so each closed bar
+    # costs O(1) per indicator instead of a recompute over the whole buffer.
+    # The last max_bars outputs are kept; frame_for() hands a strategy only
+    # the latest rows its generate_signal reads (BaseStrategy.signal_bars).
+    #
+    # An indicator first seen (new strategy or new params) is warmed up on
+    # the candles at hand, and all state is rebuilt when the candles no
+    # longer continue the bars already fed (reseeded history). The MACD EWMs
+    # then carry on past the buffer, where the batch version restarts at its
+    # first row.
+    def __init__(self, max_bars):
+        self.max_bars = max_bars
+        self.states = {}
+        self.candles = None
+        self.last_open = None
+
+    def advance(self, candles, strategies):
+        # candles: the closed bars of the timeframe (utils.candles.Candles)
+        indicators = unique_indicators(strategies)
+        if self.last_open is not None and len(candles) and candles.timestamp[0] > self.last_open:
+            self.states.clear()
+        new = slice(None) if self.last_open is None else slice(
+            int(np.searchsorted(candles.timestamp, self.last_open, side='right')), None)
+        for key in [key for key in self.states if key not in {indicator.key for indicator in indicators}]:
+            del self.states[key]
+        bars = candles.slice(new.start, new.stop)
+        for key, (indicator, state, history) in self.states.items():
+            self._feed(state, history, bars)
+        for indicator in indicators:
+            if indicator.key not in self.states:
+                state = STREAMING_INDICATORS[indicator.name](**indicator.params)
+                history = {}
+                self._feed(state, history, candles)
+                self.states[indicator.key] = (indicator, state, history)
+        self.candles = candles
+        if len(candles):
+            self.last_open = int(candles.timestamp[-1])
+
+    def _feed(self, state, history, bars):
+        for high, low, close in zip(bars.high.tolist(), bars.low.tolist(), bars.close.tolist()):
+            for output, value in feed(state, high, low, close).items():
+                history.setdefault(output, deque(maxlen=self.max_bars)).append(value)
+
+    def frame_for(self, strategy):
+        # Base columns of the latest candles plus the namespaced columns of
+        # the strategy's indicators: signal_bars() rows, so the cost per bar
+        # does not grow with the buffer (all candles if it returns None)
+        bars = strategy.signal_bars()
+        data = (self.candles if bars is None else self.candles.tail(bars)).to_frame()
+        rows = len(data)
+        outputs = {}
+        for indicator in unique_indicators([strategy]):
+            for output, values in self.states[indicator.key][2].items():
+                column = np.full(rows, np.nan)
+                # Indexing a deque near its end is O(1)
+                tail = [values[i] for i in range(max(len(values) - rows, 0), len(values))]
+                column[rows - len(tail):] = tail
+                outputs[indicator.column(output)] = column
+        return data.assign(**outputs)
@@ -1,43 +1,99 @@
 import importlib
+import threading
 from config.config import ACTIVE_STRATEGIES, STRATEGY_PARAMETERS
+from utils.logger import log_info
 
 class StrategyManager:
+    # Live strategy objects by name. Control-plane updates (enable, params,
+    # schedule) take the lock and replace attributes on the live objects;
+    # runs evaluate snapshots taken under the same lock, so an evaluation in
+    # progress keeps the params it started with and never waits on an update.
     def __init__(self):
-        self.strategies = []
+        self.strategies = {}
+        self.lock = threading.Lock()
+        self.scheduler = None
 
     def load_strategies(self):
         for strategy_path in ACTIVE_STRATEGIES:
             module_name, class_name = strategy_path.rsplit('.', 1)
             module = importlib.import_module(module_name)
             strategy_class = getattr(module, class_name)
-            params = STRATEGY_PARAMETERS.get(strategy_class(None).get_name(), {})
-            strategy_instance = strategy_class(params)
-            self.strategies.append(strategy_instance)
+            params = STRATEGY_PARAMETERS.get(strategy_class.name, {})
+            self.strategies[strategy_class.name] = strategy_class(params)
+
+    def attach_scheduler(self, scheduler):
+        # Scheduler whose per-strategy jobs (id = strategy name) are rescheduled
+        self.scheduler = scheduler
+
+    def get_strategy(self, strategy_name):
+        return self.strategies.get(strategy_name)
 
     def get_strategies(self):
-        return self.strategies
+        return list(self.strategies.values())
+
+    def get_enabled_strategies(self):
+        with self.lock:
+            return [strategy.snapshot() for strategy in self.strategies.values() if strategy.enabled]
+
+    def snapshot(self, strategy_name):
+        # None when the strategy is unknown or disabled
+        with self.lock:
+            strategy = self.strategies.get(strategy_name)
+            return strategy.snapshot() if strategy is not None and strategy.enabled else None
 
     def enable_strategy(self, strategy_name):
-        for strategy in self.strategies:
-            if strategy.get_name() == strategy_name:
-                strategy.enable()
-                return True
-        return False
+        with self.lock:
+            strategy = self.strategies.get(strategy_name)
+            if strategy is None:
+                return False
+            strategy.enable()
+        log_info(f"Strategy {strategy_name} enabled.")
+        return True
 
     def disable_strategy(self, strategy_name):
-        for strategy in self.strategies:
-            if strategy.get_name() == strategy_name:
-                strategy.disable()
-                return True
-        return False
+        with self.lock:
+            strategy = self.strategies.get(strategy_name)
+            if strategy is None:
+                return False
+            strategy.disable()
+        log_info(f"Strategy {strategy_name} disabled.")
+        return True
 
     def update_strategy_params(self, strategy_name, new_params):
-        for strategy in self.strategies:
-            if strategy.get_name() == strategy_name:
-                strategy.update_params(new_params)
-                return True
-        return False
+        # Raises ValueError for params the strategy rejects; the live
+        # strategy is only changed when the whole update is valid. The dry
+        # run goes on a snapshot outside the lock, so runs taking snapshots
+        # don't wait on it; the lock only covers the swap, which starts over
+        # if another update changed the params in the meantime.
+        while True:
+            with self.lock:
+                strategy = self.strategies.get(strategy_name)
+                if strategy is None:
+                    return False
+                current = strategy.snapshot()
+            updated = current.try_params(new_params)
+            with self.lock:
+                if strategy.params is current.params:
+                    stale = strategy.swap_params(updated)
+                    break
+        log_info(f"Parameters updated for {strategy_name}; indicators no longer used: {stale}")
+        return True
+
+    def update_strategy_schedule(self, strategy_name, schedule):
+        # Only per-strategy jobs have their own schedule; returns False when
+        # the strategy or its job does not exist
+        if strategy_name not in self.strategies or self.scheduler is None:
+            return False
+        try:
+            self.scheduler.reschedule_job(strategy_name, trigger='cron', **schedule)
+        except KeyError:
+            return False
+        with self.lock:
+            strategy = self.strategies[strategy_name]
+            strategy.params = {**strategy.params, 'schedule': schedule}
+        log_info(f"Schedule updated for {strategy_name}: {schedule}")
+        return True
 
     def run_strategies(self):
-        for strategy in self.strategies:
+        for strategy in self.strategies.values():
             strategy.execute_strategy()
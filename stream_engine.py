@@ -0,0 +1,89 @@
+import asyncio
+import numpy as np
+from strategies.base_strategy import group_by_timeframe
+from strategies.streaming_indicators import StreamingSnapshot
+from utils.candles import Candles
+from utils.timeframes import CandleStore, closes_at
+from utils.logger import log_info, log_error
+
+
+class StreamingEngine:
+    # Consumes kline events from a source (live websocket or disk replay) and
+    # keeps a bounded candle store per symbol at the source's interval. Each
+    # closed bar is folded into every higher timeframe, and strategies are
+    # evaluated when a bar of their timeframe closes, on indicators updated
+    # incrementally with that bar (one StreamingSnapshot per symbol and
+    # timeframe). Signals are handed to
+    # on_signal(strategy, symbol, signal, price), which runs in a worker thread
+    # so order placement never stalls the event loop.
+    def __init__(self, strategy_manager, source, on_signal=None, buffer_bars=500, min_bars=2):
+        self.strategy_manager = strategy_manager
+        self.source = source
+        self.on_signal = on_signal
+        self.buffer_bars = buffer_bars
+        self.min_bars = min_bars
+        self.store = CandleStore(source.interval, buffer_bars)
+        self.snapshots = {}
+        self.bars_processed = 0
+
+    def warm_up(self, symbol, candles):
+        # Seed a symbol's base candles with history so strategies can evaluate on the first bar
+        self.store.update(symbol, candles.tail(self.buffer_bars))
+
+    def append(self, event):
+        # False for a duplicate or out-of-order bar
+        symbol = event['symbol']
+        if event['open_time'] < self.store.closed_until(symbol):
+            return False
+        bar = Candles(np.array([event['open_time']], dtype=np.int64),
+                      *(np.array([event[field]]) for field in ('open', 'high', 'low', 'close', 'volume')))
+        self.store.update(symbol, bar, now_ms=event['close_time'] + 1)
+        return True
+
+    def evaluate(self, symbol, bar_end_ms=None):
+        # Strategies whose timeframe has a bar ending at bar_end_ms (all of
+        # them when it is None), each on the closed bars of its timeframe
+        signals = []
+        groups = group_by_timeframe(self.strategy_manager.get_enabled_strategies())
+        for timeframe, strategies in groups.items():
+            if bar_end_ms is not None and not closes_at(timeframe, bar_end_ms):
+                continue
+            try:
+                candles = self.store.get(symbol, timeframe, include_partial=False)
+            except ValueError as e:
+                log_error(f"Cannot evaluate {timeframe} strategies on {symbol}: {e}")
+                continue
+            if len(candles) < self.min_bars:
+                continue
+            snapshot = self.snapshots.get((symbol, timeframe))
+            if snapshot is None:
+                snapshot = self.snapshots[(symbol, timeframe)] = StreamingSnapshot(self.buffer_bars)
+            snapshot.advance(candles, strategies)
+            price = candles.close[-1]
+
+            for strategy in strategies:
+                try:
+                    signals.append((strategy, symbol, strategy.generate_signal(snapshot.frame_for(strategy)), price))
+                except Exception as e:
+                    log_error(f"An error occurred in {strategy.get_name()} for {symbol}: {e}")
+        return signals
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        pending = set()
+        log_info("Streaming engine started.")
+        async for event in self.source:
+            if not event['closed']:
+                continue
+            if not self.append(event):
+                continue
+            self.bars_processed += 1
+            for strategy, symbol, signal, price in self.evaluate(event['symbol'], event['close_time'] + 1):
+                if self.on_signal is None or signal == 'hold':
+                    continue
+                task = loop.run_in_executor(None, self.on_signal, strategy, symbol, signal, price)
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        log_info(f"Streaming engine stopped after {self.bars_processed} bars.")
@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The bot is run from the repository root rather than installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Log to a scratch file rather than the bot's logs/ (set before config loads)
+os.environ['LOG_FILE'] = os.path.join(tempfile.mkdtemp(prefix='trading_bot_tests_'), 'trading_bot.log')
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    # historical_data/BTCUSDT_daily.csv, as the backtester reads it, under a
+    # scratch working directory (which spawned workers inherit)
+    from tests.helpers import ohlcv, random_walk
+
+    (tmp_path / 'historical_data').mkdir()
+    data = ohlcv(random_walk(300))
+    data.index.name = 'timestamp'
+    data.to_csv(tmp_path / 'historical_data' / 'BTCUSDT_daily.csv')
+    monkeypatch.chdir(tmp_path)
@@ -0,0 +1,35 @@
+# Synthetic market data shared by the test modules
+import numpy as np
+import pandas as pd
+
+from utils.candles import Candles
+
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+
+def flat_stretch(n=3000, start=1000, length=100, seed=0):
+    close = random_walk(n, seed)
+    close[start:start + length] = close[start - 1]
+    return close
+
+
+def ohlcv(close, seed=0):
+    rng = np.random.default_rng(seed + 1)
+    flat = np.r_[False, close[1:] == close[:-1]]
+    spread = np.where(flat, 0.0, rng.random(len(close)) * 0.02)
+    index = pd.date_range('2020-01-01', periods=len(close), freq='D')
+    return pd.DataFrame({
+        'open': close,
+        'high': close * (1 + spread),
+        'low': close * (1 - spread),
+        'close': close,
+        'volume': rng.random(len(close)),
+    }, index=index)
+
+
+def candles(frame):
+    timestamp = frame.index.values.astype('datetime64[ms]').astype(np.int64)
+    return Candles(timestamp, *(frame[field].to_numpy() for field in ('open', 'high', 'low', 'close', 'volume')))
@@ -0,0 +1,16 @@
+import pytest
+
+from backtesting.runner import run_backtests
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_bad_jobs_become_error_rows(history, max_workers):
+    jobs = [
+        ('BTCUSDT', 'strategies.rsi_strategy.RSIStrategy', {}),
+        ('BTCUSDT', 'strategies.no_such_module.Strategy', {}),
+        ('BTCUSDT', 'strategies.rsi_strategy.RSIStrategy', None),
+    ]
+    results = run_backtests(jobs, max_workers=max_workers)
+    assert results['error'].isna().tolist() == [True, False, False]
+    assert results.loc[1, 'strategy'] == 'strategies.no_such_module.Strategy'
+    assert 'total_return' in results
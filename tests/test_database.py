@@ -0,0 +1,105 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from utils import database
+from utils.database import Database, TradeWriter, get_pool
+
+
+def trade(action='buy', symbol='BTCUSDT', profit=None, day=1):
+    return (datetime(2024, 1, day, 12), action, symbol, 0.5, 100.0, 100.0, 95.0, 110.0, profit)
+
+
+@pytest.fixture
+def db():
+    # The process-wide in-memory SQLite database, emptied per test
+    db = Database('sqlite')
+    db.cursor.execute("DELETE FROM trades;")
+    db.cursor.execute("DELETE FROM trade_daily_summary;")
+    db.conn.commit()
+    yield db
+    db.close()
+
+
+def stored(db):
+    db.cursor.execute("SELECT action, symbol, profit FROM trades ORDER BY id;")
+    return db.cursor.fetchall()
+
+
+def test_pool_is_shared_and_hands_out_one_connection_at_a_time():
+    pool = get_pool('sqlite')
+    assert get_pool('sqlite') is pool
+    conn = pool.getconn()
+    acquired = threading.Event()
+
+    def other():
+        pool.putconn(pool.getconn())
+        acquired.set()
+    thread = threading.Thread(target=other)
+    thread.start()
+    assert not acquired.wait(0.1)
+    pool.putconn(conn)
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_insert_trades_updates_daily_summary(db):
+    db.insert_trades([trade(), trade('sell', profit=5.0), trade('sell', profit=-2.0, day=2)])
+    assert len(stored(db)) == 3
+    assert db.get_trades_summary() == {'total_trades': 3, 'total_buys': 1, 'total_sells': 2, 'net_profit': 3.0}
+    summary = db.get_trades_summary(start_date=datetime(2024, 1, 2).date())
+    assert (summary['total_sells'], summary['net_profit']) == (1, -2.0)
+
+
+def test_failed_insert_raises_and_rolls_back(db):
+    with pytest.raises(Exception):
+        db.insert_trades([trade(), ('not', 'a', 'trade')])
+    assert stored(db) == []
+    assert db.get_trades_summary()['total_trades'] == 0
+
+
+def test_insert_without_connection_raises(monkeypatch):
+    def unavailable(backend):
+        raise OSError("connection refused")
+    monkeypatch.setattr(database, 'get_pool', unavailable)
+    db = Database('sqlite')
+    assert db.cursor is None
+    with pytest.raises(ConnectionError):
+        db.insert_trades([trade()])
+
+
+def test_writer_batches_by_size(db):
+    writer = TradeWriter(flush_size=3, flush_seconds=3600, backend='sqlite')
+    writer.write(trade())
+    writer.write(trade())
+    assert stored(db) == []
+    writer.write(trade('sell', profit=1.0))
+    assert len(stored(db)) == 3
+    assert writer.pending() == 0
+
+
+def test_writer_flushes_by_age(db):
+    writer = TradeWriter(flush_size=100, flush_seconds=0, backend='sqlite')
+    writer.write(trade())
+    assert len(stored(db)) == 1
+
+
+def test_failed_flush_keeps_rows_in_order(db, monkeypatch):
+    writer = TradeWriter(flush_size=100, flush_seconds=3600, backend='sqlite')
+    writer.write(trade(profit=1.0))
+    writer.write(trade(profit=2.0))
+    insert_trades = Database.insert_trades
+
+    def failing(self, rows):
+        raise ConnectionError("database unavailable")
+    monkeypatch.setattr(Database, 'insert_trades', failing)
+    assert writer.flush() is False
+    assert writer.pending() == 2
+    writer.write(trade(profit=3.0))
+
+    monkeypatch.setattr(Database, 'insert_trades', insert_trades)
+    assert writer.flush() is True
+    assert [row[2] for row in stored(db)] == [1.0, 2.0, 3.0]
+    assert writer.pending() == 0
+
@@ -0,0 +1,173 @@
+import socketserver
+import threading
+import time
+from email.mime.text import MIMEText
+
+import pytest
+
+from backtesting.backtest import load_historical_data
+from config.config import STRATEGY_PARAMETERS
+from strategies.combined_strategy import CombinedStrategy
+from strategies.rsi_strategy import RSIStrategy
+from utils import email_reporter
+from utils.email_reporter import ReportCache, ReportMailer, build_backtest_sections, report_key
+
+PARAMS = STRATEGY_PARAMETERS['Combined Strategy']
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    # Local SMTP server that rejects the first `failures` messages with a
+    # transient error and keeps the subjects of the ones it accepts
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, failures=0):
+        super().__init__(('127.0.0.1', 0), SMTPSession)
+        self.failures = failures
+        self.attempts = 0
+        self.received = []
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class SMTPSession(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 stand-in")
+        for line in self.rfile:
+            command = line.decode().strip().upper()
+            if command.startswith('MAIL'):
+                with self.server.lock:
+                    self.server.attempts += 1
+                    rejected = self.server.attempts <= self.server.failures
+                self.reply("451 try again later" if rejected else "250 ok")
+            elif command == 'DATA':
+                self.reply("354 end with .")
+                body = []
+                for data in self.rfile:
+                    if data == b'.\r\n':
+                        break
+                    body.append(data.decode())
+                subject = next(line for line in body if line.startswith('Subject:'))
+                with self.server.lock:
+                    self.server.received.append(subject.split(':', 1)[1].strip())
+                self.reply("250 queued")
+            elif command == 'QUIT':
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+@pytest.fixture
+def smtp():
+    servers = []
+
+    def start(failures=0):
+        servers.append(SMTPStandIn(failures))
+        return servers[-1]
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def mailer(server, max_retries=3, retry_seconds=0.01):
+    return ReportMailer(host='127.0.0.1', port=server.port, user=None, use_tls=False,
+                        max_retries=max_retries, retry_seconds=retry_seconds)
+
+
+def message(subject):
+    message = MIMEText('report')
+    message['From'] = 'bot@example.com'
+    message['To'] = 'owner@example.com'
+    message['Subject'] = subject
+    return message
+
+
+def test_mailer_delivers(smtp):
+    server = smtp()
+    sender = mailer(server)
+    sender.send(message('week 1'))
+    sender.join()
+    assert server.received == ['week 1']
+    assert sender.stop(timeout=5)
+
+
+def test_mailer_retries_failed_sends(smtp):
+    server = smtp(failures=2)
+    sender = mailer(server)
+    sender.send(message('week 1'))
+    sender.join()
+    assert (server.attempts, server.received) == (3, ['week 1'])
+
+
+def test_mailer_gives_up_after_max_retries(smtp):
+    server = smtp(failures=5)
+    sender = mailer(server, max_retries=2)
+    sender.send(message('week 1'))
+    sender.send(message('week 2'))
+    sender.join()
+    assert server.attempts == 4
+    assert server.received == []
+
+
+def test_stop_drains_the_queue(smtp):
+    server = smtp(failures=1)
+    sender = mailer(server, retry_seconds=3600)
+    for week in range(1, 4):
+        sender.send(message(f'week {week}'))
+    # The first send failed and waits out a long backoff, with more queued
+    deadline = time.monotonic() + 5
+    while server.attempts < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sender.stop(timeout=5)
+    assert server.received == ['week 1', 'week 2', 'week 3']
+    assert not sender.thread.is_alive()
+
+
+def test_stop_without_messages():
+    assert ReportMailer().stop(timeout=1)
+
+
+def test_report_key(history):
+    data = load_historical_data('BTCUSDT')
+    key = report_key('BTCUSDT', data, CombinedStrategy, PARAMS)
+    assert key == report_key('BTCUSDT', data.copy(), CombinedStrategy, dict(PARAMS))
+    changed = data.copy()
+    changed.iloc[-1, changed.columns.get_loc('close')] += 1
+    assert key != report_key('BTCUSDT', changed, CombinedStrategy, PARAMS)
+    assert key != report_key('ETHUSDT', data, CombinedStrategy, PARAMS)
+    assert key != report_key('BTCUSDT', data, RSIStrategy, PARAMS)
+    assert key != report_key('BTCUSDT', data, CombinedStrategy, {**PARAMS, 'timeframe': '4h'})
+
+
+def test_sections_are_served_from_the_cache(history, tmp_path, monkeypatch):
+    rendered = []
+
+    def render_sections(results, max_workers=None):
+        rendered.extend(results['symbol'])
+        return [symbol.encode() for symbol in results['symbol']]
+    monkeypatch.setattr(email_reporter, 'render_sections', render_sections)
+    cache = ReportCache(str(tmp_path / 'report_cache'))
+
+    sections = build_backtest_sections(['BTCUSDT'], CombinedStrategy, PARAMS, cache, max_workers=1)
+    assert [(symbol, png) for symbol, _, png in sections] == [('BTCUSDT', b'BTCUSDT')]
+    key = report_key('BTCUSDT', load_historical_data('BTCUSDT'), CombinedStrategy, PARAMS)
+    assert cache.get(key)['png'] == b'BTCUSDT'
+
+    # Hit: nothing is backtested or rendered again
+    assert build_backtest_sections(['BTCUSDT'], CombinedStrategy, PARAMS, cache, max_workers=1) == sections
+    assert rendered == ['BTCUSDT']
+
+    # Miss on new params; the entry of the old ones is pruned
+    rsi = {**PARAMS, 'RSI Strategy': {**PARAMS['RSI Strategy'], 'rsi_period': 10}}
+    build_backtest_sections(['BTCUSDT'], CombinedStrategy, rsi, cache, max_workers=1)
+    assert rendered == ['BTCUSDT', 'BTCUSDT']
+    assert cache.get(key) is None
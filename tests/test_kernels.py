@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies import kernels
+from strategies.mean_reversion_strategy import MeanReversionStrategy
+from strategies.rsi_strategy import RSIStrategy
+from tests.helpers import flat_stretch, ohlcv, random_walk
+
+WINDOW = 20
+PERIOD = 14
+
+
+def backends():
+    # The uncompiled loop kernels are what Numba compiles, so they are tested
+    # even where Numba is not installed
+    found = [('numpy', kernels.NUMPY_KERNELS), ('loop', kernels.LOOP_KERNELS)]
+    compiled = kernels.get_backend('numba')
+    if compiled is not None:
+        found.append(('numba', compiled))
+    return found
+
+
+BACKENDS = backends()
+
+
+INPUTS = {
+    'random_walk': random_walk(3000),
+    'flat_stretch': flat_stretch(),
+    'constant': np.full(500, 42.5),
+    'short': random_walk(WINDOW - 1),
+    'tiny': random_walk(3),
+}
+
+
+def pandas_rsi(close, period):
+    delta = pd.Series(close).diff()
+    avg_gain = delta.clip(lower=0).rolling(period).mean()
+    avg_loss = (-delta.clip(upper=0)).rolling(period).mean()
+    return (100 - 100 / (1 + avg_gain / avg_loss)).to_numpy()
+
+
+def pandas_true_range(data):
+    ranges = pd.concat([
+        data['high'] - data['low'],
+        (data['high'] - data['close'].shift()).abs(),
+        (data['low'] - data['close'].shift()).abs(),
+    ], axis=1)
+    return ranges.max(axis=1)
+
+
+def assert_matches(actual, expected, rtol=1e-9, atol=1e-9):
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True)
+
+
+@pytest.mark.parametrize('name,backend', BACKENDS)
+@pytest.mark.parametrize('data', INPUTS)
+def test_rolling_mean_std(name, backend, data):
+    x = INPUTS[data]
+    mean, std = backend['rolling_mean_std'](x, WINDOW)
+    rolling = pd.Series(x).rolling(WINDOW)
+    assert_matches(mean, rolling.mean().to_numpy())
+    # pandas' own std keeps a small residue on long flat runs
+    assert_matches(std, rolling.std().to_numpy(), atol=1e-5)
+    assert_matches(backend['rolling_mean'](x, WINDOW), rolling.mean().to_numpy())
+
+
+@pytest.mark.parametrize('name,backend', BACKENDS)
+@pytest.mark.parametrize('data', INPUTS)
+def test_constant_windows_are_exact(name, backend, data):
+    x = INPUTS[data]
+    constant = kernels.constant_windows(x, WINDOW)
+    mean, std = backend['rolling_mean_std'](x, WINDOW)
+    assert (mean[constant] == x[constant]).all()
+    assert (std[constant] == 0).all()
+
+
+@pytest.mark.parametrize('name,backend', BACKENDS)
+@pytest.mark.parametrize('data', INPUTS)
+def test_rolling_extremes(name, backend, data):
+    x = INPUTS[data]
+    rolling = pd.Series(x).rolling(WINDOW)
+    assert_matches(backend['rolling_max'](x, WINDOW), rolling.max().to_numpy(), rtol=0, atol=0)
+    assert_matches(backend['rolling_min'](x, WINDOW), rolling.min().to_numpy(), rtol=0, atol=0)
+
+
+@pytest.mark.parametrize('name,backend', BACKENDS)
+@pytest.mark.parametrize('data', INPUTS)
+def test_rsi(name, backend, data):
+    x = INPUTS[data]
+    assert_matches(backend['rsi'](x, PERIOD), pandas_rsi(x, PERIOD), rtol=1e-7, atol=1e-7)
+
+
+@pytest.mark.parametrize('name,backend', BACKENDS)
+@pytest.mark.parametrize('data', INPUTS)
+def test_true_range_and_atr(name, backend, data):
+    frame = ohlcv(INPUTS[data])
+    high, low, close = (frame[column].to_numpy() for column in ('high', 'low', 'close'))
+    true_range = pandas_true_range(frame)
+    assert_matches(backend['true_range'](high.copy(), low, close), true_range.to_numpy())
+    assert_matches(backend['atr'](high, low, close, PERIOD), true_range.rolling(PERIOD).mean().to_numpy())
+
+
+@pytest.fixture
+def backend_name():
+    previous = kernels.backend_name()
+    yield
+    kernels.set_backend(previous)
+
+
+@pytest.mark.parametrize('name', ['numpy', 'numba'])
+@pytest.mark.parametrize('strategy', [RSIStrategy({}), MeanReversionStrategy({})], ids=lambda s: s.get_name())
+def test_signals_match_pandas_on_flat_stretch(backend_name, name, strategy):
+    if kernels.get_backend(name) is None:
+        pytest.skip(f"{name} is not installed")
+    data = ohlcv(flat_stretch())
+    kernels.set_backend('pandas')
+    expected = strategy.generate_signals(strategy.apply_indicators(data))
+    kernels.set_backend(name)
+    actual = strategy.generate_signals(strategy.apply_indicators(data))
+    pd.testing.assert_series_equal(actual, expected)
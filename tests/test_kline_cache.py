@@ -0,0 +1,112 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from utils.kline_cache import CLOSE_TIME, DAY_MS, OPEN_TIME, KlineCache, month_of
+
+HOUR_MS = 60 * 60 * 1000
+
+
+class StubClient:
+    # Hourly klines from first_open up to the current (in-progress) bar, as
+    # the exchange returns them: lists of strings
+    def __init__(self, first_open):
+        self.first_open = first_open
+        self.calls = []
+
+    def get_historical_klines(self, symbol, interval, start_str):
+        self.calls.append(start_str)
+        now_ms = int(time.time() * 1000)
+        opens = np.arange(self.first_open, now_ms + 1, HOUR_MS)
+        opens = opens[opens + HOUR_MS - 1 >= start_str]
+        return [[str(v) for v in (t, 1, 2, 0.5, 1.5, 10, t + HOUR_MS - 1, 15, 3, 5, 7, 0)] for t in opens]
+
+
+@pytest.fixture
+def client():
+    now_ms = int(time.time() * 1000)
+    return StubClient(now_ms - now_ms % HOUR_MS - 120 * DAY_MS)
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    # Paths of the shard files written
+    paths = []
+    original = KlineCache.write
+
+    def write(self, path, klines):
+        paths.append(os.path.basename(path))
+        original(self, path, klines)
+    monkeypatch.setattr(KlineCache, 'write', write)
+    return paths
+
+
+def test_construction_creates_nothing(tmp_path):
+    KlineCache(str(tmp_path / 'klines'))
+    assert not (tmp_path / 'klines').exists()
+
+
+def test_cold_then_delta_fetch(tmp_path, client, writes):
+    cache = KlineCache(str(tmp_path))
+    cold = cache.get_klines(client, 'BTCUSDT', '1h', 90)
+    assert len(cold) >= 90 * 24
+    months = cache.shards('BTCUSDT', '1h')
+    assert len(months) >= 3
+    # Only closed bars are stored
+    stored = cache.load('BTCUSDT', '1h')
+    assert (stored[:, CLOSE_TIME] < time.time() * 1000).all()
+    assert np.array_equal(stored[:, OPEN_TIME], np.unique(stored[:, OPEN_TIME]))
+
+    writes.clear()
+    delta = cache.get_klines(client, 'BTCUSDT', '1h', 90)
+    # The delta starts after the last cached close and rewrites at most the
+    # latest month's shard
+    assert client.calls[-1] == int(stored[-1, CLOSE_TIME]) + 1
+    assert set(writes) <= {f"{months[-1]}.npy", f"{month_of(time.time() * 1000)}.npy"}
+    # Cached and fetched bars join up without gaps or repeats
+    assert (np.diff(delta[:, OPEN_TIME]) == HOUR_MS).all()
+    assert delta[-1, OPEN_TIME] >= cold[-1, OPEN_TIME]
+
+
+def test_longer_lookback_refetches(tmp_path, client):
+    cache = KlineCache(str(tmp_path))
+    cache.get_klines(client, 'BTCUSDT', '1h', 10)
+    klines = cache.get_klines(client, 'BTCUSDT', '1h', 60)
+    start_ms = time.time() * 1000 - 60 * DAY_MS
+    assert client.calls[-1] < start_ms + HOUR_MS
+    assert klines[0, OPEN_TIME] < start_ms + HOUR_MS
+    stored = cache.load('BTCUSDT', '1h')
+    assert np.array_equal(stored[:, OPEN_TIME], np.unique(stored[:, OPEN_TIME]))
+
+
+def test_compact_drops_old_months_and_trims_the_boundary(tmp_path, client, writes):
+    cache = KlineCache(str(tmp_path))
+    cache.get_klines(client, 'BTCUSDT', '1h', 120)
+    months = cache.shards('BTCUSDT', '1h')
+    cutoff_ms = time.time() * 1000 - 45 * DAY_MS
+    writes.clear()
+    cache.compact('BTCUSDT', '1h', 45)
+    stored = cache.load('BTCUSDT', '1h')
+    assert stored[0, OPEN_TIME] >= cutoff_ms - HOUR_MS
+    assert cache.shards('BTCUSDT', '1h') == [month for month in months if month >= str(month_of(cutoff_ms))]
+    # Only the shard the cutoff falls in is rewritten
+    assert writes == [f"{month_of(cutoff_ms)}.npy"]
+
+
+def test_legacy_file_is_split_into_shards(tmp_path, client):
+    cache = KlineCache(str(tmp_path))
+    klines = np.asarray(client.get_historical_klines('BTCUSDT', '1h', 0), dtype=np.float64)[:-1]
+    np.save(tmp_path / 'BTCUSDT_1h.npy', klines)
+    np.testing.assert_array_equal(cache.load('BTCUSDT', '1h'), klines)
+    assert not (tmp_path / 'BTCUSDT_1h.npy').exists()
+
+
+def test_evict(tmp_path, client):
+    cache = KlineCache(str(tmp_path))
+    cache.get_klines(client, 'BTCUSDT', '1h', 5)
+    cache.get_klines(client, 'ETHUSDT', '1h', 5)
+    np.save(tmp_path / 'XRPUSDT_1h.npy', np.empty((0, 12)))
+    cache.evict(['BTCUSDT'])
+    assert sorted(os.listdir(tmp_path)) == ['BTCUSDT_1h']
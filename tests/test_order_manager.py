@@ -0,0 +1,47 @@
+from utils.order_manager import OrderManager
+
+
+class FakeClient:
+    # Open orders and final statuses as the exchange would report them
+    def __init__(self, open_orders, statuses):
+        self.open_orders = open_orders
+        self.statuses = statuses
+        self.lookups = []
+
+    def get_open_orders(self, **kwargs):
+        return self.open_orders
+
+    def get_order(self, symbol, orderId):
+        self.lookups.append((symbol, orderId))
+        return {'symbol': symbol, 'orderId': orderId, 'status': self.statuses[(symbol, orderId)]}
+
+    def cancel_order(self, symbol, orderId):
+        self.open_orders = [o for o in self.open_orders if (o['symbol'], o['orderId']) != (symbol, orderId)]
+
+
+def test_same_order_id_on_two_symbols_is_tracked_separately():
+    # ETHUSDT order 7 is still open; BTCUSDT order 7 has filled
+    client = FakeClient([{'symbol': 'ETHUSDT', 'orderId': 7}], {('BTCUSDT', 7): 'FILLED'})
+    manager = OrderManager(client)
+    filled = []
+    manager.track('BTCUSDT', 7, on_fill=lambda status: filled.append('BTCUSDT'))
+    manager.track('ETHUSDT', 7, on_fill=lambda status: filled.append('ETHUSDT'))
+    assert len(manager.pending()) == 2
+
+    manager.poll()
+    assert filled == ['BTCUSDT']
+    assert client.lookups == [('BTCUSDT', 7)]
+    assert [(order.symbol, order.order_id) for order in manager.pending()] == [('ETHUSDT', 7)]
+
+
+def test_timed_out_order_is_canceled_on_its_own_symbol():
+    now = [0.0]
+    client = FakeClient([{'symbol': 'BTCUSDT', 'orderId': 1}, {'symbol': 'ETHUSDT', 'orderId': 1}], {})
+    manager = OrderManager(client, timeout=10, clock=lambda: now[0])
+    timed_out = []
+    manager.track('BTCUSDT', 1, on_timeout=lambda status: timed_out.append('BTCUSDT'))
+    now[0] = 11
+    manager.poll()
+    assert timed_out == ['BTCUSDT']
+    assert client.open_orders == [{'symbol': 'ETHUSDT', 'orderId': 1}]
+    assert manager.pending() == []
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from strategies import kernels
+from strategies.breakout_strategy import BreakoutStrategy
+from strategies.combined_strategy import CombinedStrategy
+from strategies.mean_reversion_strategy import MeanReversionStrategy
+from strategies.moving_average_strategy import MovingAverageStrategy
+from strategies.panel import Panel
+from strategies.rsi_strategy import RSIStrategy
+from tests.helpers import candles, flat_stretch, ohlcv
+
+BARS = 600
+
+STRATEGIES = [
+    RSIStrategy({}),
+    MovingAverageStrategy({}),
+    MeanReversionStrategy({}),
+    BreakoutStrategy({}),
+    CombinedStrategy({}),
+]
+
+
+def universe():
+    # Every symbol has a flat stretch; 'LATE' lists later, 'STALE' misses the
+    # newest bars and 'GAP' misses bars in the middle
+    frames = {}
+    for seed, (symbol, start, stop) in enumerate([('FULL', 0, BARS), ('LATE', 150, BARS), ('STALE', 0, BARS - 3),
+                                                  ('GAP', 0, BARS)]):
+        frames[symbol] = ohlcv(flat_stretch(BARS, start=300, length=60, seed=seed), seed=seed).iloc[start:stop]
+    frames['GAP'] = frames['GAP'].drop(frames['GAP'].index[400:410])
+    return frames
+
+
+@pytest.fixture
+def backend_name():
+    previous = kernels.backend_name()
+    yield
+    kernels.set_backend(previous)
+
+
+@pytest.mark.parametrize('name', ['pandas', 'numpy', 'numba'])
+@pytest.mark.parametrize('strategy', STRATEGIES, ids=lambda s: s.get_name())
+def test_panel_signals_match_per_symbol(backend_name, name, strategy):
+    if name != 'pandas' and kernels.get_backend(name) is None:
+        pytest.skip(f"{name} is not installed")
+    kernels.set_backend(name)
+    frames = universe()
+    panel = Panel.from_candles({symbol: candles(frame) for symbol, frame in frames.items()})
+    signals = strategy.generate_panel_signals(panel)
+    for column, (symbol, frame) in enumerate(frames.items()):
+        data, rows = panel.frame(symbol)
+        expected = strategy.generate_signals(strategy.apply_indicators(frame)).to_numpy()
+        assert list(signals[rows, column]) == list(expected)
+        assert (np.delete(signals[:, column], rows) == 'hold').all()
+
+
+@pytest.mark.parametrize('name', ['pandas', 'numpy'])
+@pytest.mark.parametrize('strategy', STRATEGIES, ids=lambda s: s.get_name())
+def test_panel_indicators_match_per_symbol(backend_name, name, strategy):
+    # Values, not just signals: on the flat stretch the pandas std keeps a
+    # rounding residue that the kernels snap to 0, so the panel has to follow
+    # the same backend as the per-symbol path
+    kernels.set_backend(name)
+    frames = universe()
+    panel = Panel.from_frames(frames)
+    for column, (symbol, frame) in enumerate(frames.items()):
+        data = strategy.apply_indicators(frame)
+        rows = panel.frame(symbol)[1]
+        for indicator in strategy.required_indicators():
+            for output, values in panel.compute(indicator).items():
+                np.testing.assert_allclose(values[rows, column], data[indicator.column(output)].to_numpy(),
+                                           rtol=1e-9, atol=1e-12)
+
+
+def test_signals_resume_right_after_a_gap():
+    # Windows skip the missing bars, so the first bar after the gap already
+    # has indicators, as on the symbol's own frame
+    panel = Panel.from_frames(universe())
+    column = panel.symbols.index('GAP')
+    assert np.isnan(panel.close[400:410, column]).all()
+    rsi = panel.compute(RSIStrategy({}).rsi_indicator())['rsi'][:, column]
+    assert np.isnan(rsi[400:410]).all()
+    assert not np.isnan(rsi[410])
+    np.testing.assert_array_equal(panel.shift(panel.close)[410, column], panel.close[399, column])
+
+
+def test_from_frames_matches_from_candles():
+    frames = universe()
+    expected = Panel.from_candles({symbol: candles(frame) for symbol, frame in frames.items()})
+    panel = Panel.from_frames(frames)
+    assert panel.symbols == expected.symbols
+    np.testing.assert_array_equal(panel.timestamp, expected.timestamp)
+    for field in ('open', 'high', 'low', 'close', 'volume'):
+        np.testing.assert_array_equal(getattr(panel, field), getattr(expected, field))
+
+
+def test_latest_is_each_symbols_last_bar():
+    frames = universe()
+    frames['EMPTY'] = frames['FULL'].iloc[:0]
+    panel = Panel.from_frames(frames)
+    assert list(panel.latest_rows()) == [BARS - 1, BARS - 1, BARS - 4, BARS - 1, -1]
+    np.testing.assert_array_equal(panel.latest_close()[:4], [frame['close'].iloc[-1] for frame in list(frames.values())[:4]])
+    assert np.isnan(panel.latest_close()[4])
+    strategy = RSIStrategy({})
+    latest = panel.latest(strategy.generate_panel_signals(panel))
+    stale = strategy.apply_indicators(frames['STALE'])
+    assert latest[2] == strategy.generate_signal(stale)
@@ -0,0 +1,144 @@
+import pytest
+
+from config.config import MAX_CONCURRENT_TRADES
+from utils.database import Database
+from utils.position_book import EXISTS, EXTERNAL, LIMIT_REACHED, RESERVED, PositionBook
+
+
+class StubClient:
+    # Balances and open orders of an exchange account
+    def __init__(self, balances=None, orders=None):
+        self.balances = balances or {}
+        self.orders = orders or []
+        self.canceled = []
+
+    def get_account(self):
+        return {'balances': [{'asset': asset, 'free': str(free), 'locked': '0'}
+                             for asset, free in self.balances.items()]}
+
+    def get_open_orders(self, symbol=None):
+        return [order for order in self.orders if symbol is None or order['symbol'] == symbol]
+
+    def cancel_order(self, symbol, orderId):
+        # Canceling a leg of an OCO cancels the whole list
+        order = next(order for order in self.orders if order['orderId'] == orderId)
+        self.canceled.append(orderId)
+        self.orders = [o for o in self.orders if o is not order
+                       and (order['orderListId'] == -1 or o['orderListId'] != order['orderListId'])]
+
+
+def order(symbol, order_id, side='SELL', order_list_id=-1):
+    return {'symbol': symbol, 'orderId': order_id, 'side': side, 'orderListId': order_list_id}
+
+
+@pytest.fixture
+def book():
+    db = Database('sqlite')
+    db.cursor.execute("DELETE FROM positions;")
+    db.conn.commit()
+    db.close()
+    return PositionBook('sqlite')
+
+
+def stored(book):
+    reloaded = PositionBook('sqlite')
+    reloaded.load()
+    return reloaded.positions
+
+
+def open_position(book, strategy, symbol, quantity=1.0, oco_order_list_id=None):
+    status, position = book.reserve(strategy, symbol)
+    assert status == RESERVED
+    book.fill(position, quantity, 100.0, 95.0, 110.0)
+    if oco_order_list_id is not None:
+        book.set_exit(position, oco_order_list_id)
+    return position
+
+
+def test_reserve_fill_close(book):
+    status, position = book.reserve('RSI Strategy', 'BTCUSDT')
+    assert status == RESERVED and not position.is_open
+    assert book.reserve('RSI Strategy', 'BTCUSDT') == (EXISTS, None)
+    assert stored(book) == {}
+
+    book.fill(position, 0.5, 100.0, 95.0, 110.0)
+    book.set_exit(position, 42)
+    loaded = stored(book)[('RSI Strategy', 'BTCUSDT')]
+    assert (loaded.quantity, loaded.entry_price, loaded.oco_order_list_id) == (0.5, 100.0, 42)
+
+    book.close(position)
+    assert book.get('RSI Strategy', 'BTCUSDT') is None
+    assert stored(book) == {}
+
+
+def test_release_frees_the_slot(book):
+    _, position = book.reserve('RSI Strategy', 'BTCUSDT')
+    book.release(position)
+    assert book.reserve('RSI Strategy', 'BTCUSDT')[0] == RESERVED
+
+
+def test_concurrent_trade_limit(book):
+    for i in range(MAX_CONCURRENT_TRADES):
+        assert book.reserve('RSI Strategy', f'SYM{i}USDT')[0] == RESERVED
+    assert book.reserve('RSI Strategy', 'BTCUSDT') == (LIMIT_REACHED, None)
+
+
+def test_reconcile_keeps_positions_within_balance_tolerance(book):
+    open_position(book, 'RSI Strategy', 'BTCUSDT', 1.0)
+    open_position(book, 'RSI Strategy', 'ETHUSDT', 1.0)
+    # Commission taken in the base asset leaves slightly less than bought
+    book.reconcile(StubClient({'BTC': 0.995, 'ETH': 0.98}))
+    assert book.get('RSI Strategy', 'BTCUSDT') is not None
+    assert book.get('RSI Strategy', 'ETHUSDT') is None
+    assert list(stored(book)) == [('RSI Strategy', 'BTCUSDT')]
+
+
+def test_reconcile_matches_oldest_positions_first(book):
+    open_position(book, 'RSI Strategy', 'BTCUSDT', 1.0)
+    open_position(book, 'Breakout Strategy', 'BTCUSDT', 1.0)
+    book.reconcile(StubClient({'BTC': 1.0}))
+    assert book.get('RSI Strategy', 'BTCUSDT') is not None
+    assert book.get('Breakout Strategy', 'BTCUSDT') is None
+
+
+def test_startup_load_and_reconcile_adopts_external_buys(book):
+    open_position(book, 'RSI Strategy', 'BTCUSDT', 1.0)
+    restarted = PositionBook('sqlite')
+    restarted.load()
+    client = StubClient({'BTC': 1.0}, [order('BTCUSDT', 1, 'BUY'), order('ETHUSDT', 2, 'BUY')])
+    restarted.reconcile(client)
+    # BTCUSDT is already tracked; the ETHUSDT buy holds a slot until it is gone
+    assert set(restarted.positions) == {('RSI Strategy', 'BTCUSDT'), (EXTERNAL, 'ETHUSDT')}
+    assert not restarted.get(EXTERNAL, 'ETHUSDT').is_open
+    assert restarted.reserve('RSI Strategy', 'ETHUSDT')[0] == RESERVED
+
+    client.orders = []
+    restarted.reconcile(client)
+    assert restarted.get(EXTERNAL, 'ETHUSDT') is None
+    assert stored(restarted).keys() == {('RSI Strategy', 'BTCUSDT')}
+
+
+def test_cancel_exit_cancels_the_oco(book):
+    position = open_position(book, 'RSI Strategy', 'BTCUSDT', oco_order_list_id=7)
+    client = StubClient(orders=[order('BTCUSDT', 10, order_list_id=7), order('BTCUSDT', 11, order_list_id=7),
+                                order('BTCUSDT', 12, order_list_id=8)])
+    assert book.cancel_exit(client, position)
+    assert client.canceled == [10]
+    assert [o['orderId'] for o in client.orders] == [12]
+    assert position.oco_order_list_id is None
+    assert stored(book)[('RSI Strategy', 'BTCUSDT')].oco_order_list_id is None
+
+
+def test_cancel_exit_reports_a_filled_oco(book):
+    position = open_position(book, 'RSI Strategy', 'BTCUSDT', oco_order_list_id=7)
+    client = StubClient(orders=[order('BTCUSDT', 12, order_list_id=8)])
+    assert not book.cancel_exit(client, position)
+    assert client.canceled == []
+    # A leg sold the coins: reconciling closes the position instead of selling
+    book.reconcile(StubClient({'BTC': 0.0}))
+    assert book.get('RSI Strategy', 'BTCUSDT') is None
+
+
+def test_cancel_exit_without_oco(book):
+    position = open_position(book, 'RSI Strategy', 'BTCUSDT')
+    assert book.cancel_exit(StubClient(), position)
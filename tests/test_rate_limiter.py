@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from utils.rate_limiter import DeadlineExceeded, RateLimitedClient, TokenBucket, request_deadline
+
+
+class SlowClient:
+    # Stand-in for binance.Client whose reads take `delay` seconds
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def get_klines(self, **kwargs):
+        self.calls.append(('get_klines', kwargs))
+        time.sleep(self.delay)
+        return []
+
+    def order_market_sell(self, **kwargs):
+        self.calls.append(('order_market_sell', kwargs))
+        return {'orderId': 1}
+
+
+def test_acquire_gives_up_at_deadline():
+    bucket = TokenBucket(60)
+    bucket.acquire(60)
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        bucket.acquire(30, deadline=start + 0.2)
+    assert time.monotonic() - start < 1
+
+
+def test_reads_past_deadline_raise_but_orders_go_out():
+    client = RateLimitedClient(SlowClient(), weight_per_minute=60, order_reserve=0)
+    client.bucket.acquire(60)
+    with request_deadline(time.monotonic() + 0.1):
+        with pytest.raises(DeadlineExceeded):
+            client.get_klines(symbol='BTCUSDT')
+        client.bucket.tokens = 60
+        assert client.order_market_sell(symbol='BTCUSDT', quantity=1) == {'orderId': 1}
+
+
+def test_coalesced_caller_stops_waiting_at_deadline():
+    client = RateLimitedClient(SlowClient(delay=1.0))
+    leader = threading.Thread(target=client.get_klines, kwargs={'symbol': 'BTCUSDT'})
+    leader.start()
+    time.sleep(0.1)
+    start = time.monotonic()
+    with request_deadline(start + 0.2):
+        with pytest.raises(DeadlineExceeded):
+            client.get_klines(symbol='BTCUSDT')
+    assert time.monotonic() - start < 0.8
+    leader.join()
+
+
+def test_nested_deadlines_keep_the_earliest():
+    client = RateLimitedClient(SlowClient(), weight_per_minute=60, order_reserve=0)
+    client.bucket.acquire(60)
+    with request_deadline(time.monotonic() + 0.1):
+        with request_deadline(time.monotonic() + 60):
+            with pytest.raises(DeadlineExceeded):
+                client.get_klines(symbol='BTCUSDT')
+
+
+def test_request_weight_depends_on_arguments():
+    from utils.rate_limiter import request_weight
+
+    now = int(time.time() * 1000)
+    minute, day = 60 * 1000, 24 * 60 * 60 * 1000
+    assert request_weight('get_open_orders', (), {'symbol': 'BTCUSDT'}) == 6
+    assert request_weight('get_open_orders', (), {}) == 80
+    assert request_weight('get_symbol_ticker', (), {}) == 4
+    assert request_weight('get_order', (), {'symbol': 'BTCUSDT', 'orderId': 1}) == 4
+    # One earliest-timestamp lookup plus one get_klines per 1000 bars
+    assert request_weight('get_historical_klines', ('BTCUSDT', '1d', now - 500 * day), {}) == 4
+    assert request_weight('get_historical_klines', ('BTCUSDT', '1m', now - 5000 * minute), {}) == 12
+    assert request_weight('get_historical_klines', ('BTCUSDT', '1m', now - 5000 * minute, now - 2500 * minute),
+                          {'limit': 500}) == 12
+    assert request_weight('get_historical_klines', ('BTCUSDT', '1h', '1 Jan, 2020'), {}) == 4
+
+
+def test_client_charges_the_computed_weight():
+    class Client:
+        def get_open_orders(self, **kwargs):
+            return []
+
+    client = RateLimitedClient(Client(), weight_per_minute=1200)
+    client.get_open_orders()
+    assert client.bucket.tokens == pytest.approx(1200 - 80, abs=1)
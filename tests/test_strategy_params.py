@@ -0,0 +1,114 @@
+import pytest
+
+from config.config import STRATEGY_PARAMETERS
+from strategies.base_strategy import coerce_params, dry_run_frame
+from strategies.combined_strategy import CombinedStrategy
+from strategies.indicator_registry import Indicator
+from strategies.rsi_strategy import RSIStrategy
+from strategy_manager import StrategyManager
+
+
+def rsi_strategy():
+    return RSIStrategy(dict(STRATEGY_PARAMETERS['RSI Strategy']))
+
+
+def test_rejected_update_leaves_strategy_unchanged():
+    strategy = rsi_strategy()
+    before = dict(strategy.params)
+    with pytest.raises(ValueError):
+        strategy.update_params({'rsi_period': 'abc', 'buy_threshold': None})
+    assert strategy.params == before
+    strategy.generate_signal(strategy.apply_indicators(dry_run_frame()))
+
+
+@pytest.mark.parametrize('new_params', [
+    {'rsi_period': 0},
+    {'rsi_period': 14.5},
+    {'rsi_period': True},
+    {'sell_threshold': float('nan')},
+    {'timeframe': 5},
+    {'timeframe': '3x'},
+    {'schedule': 'daily'},
+])
+def test_invalid_values_are_rejected(new_params):
+    with pytest.raises(ValueError):
+        rsi_strategy().update_params(new_params)
+
+
+def test_values_are_coerced_to_current_types():
+    strategy = rsi_strategy()
+    stale = strategy.update_params({'rsi_period': '21', 'buy_threshold': 27.5})
+    assert strategy.params['rsi_period'] == 21
+    assert strategy.params['buy_threshold'] == 27.5
+    assert stale == [Indicator('rsi', period=14)]
+
+
+def test_schedule_is_not_a_param():
+    strategy = rsi_strategy()
+    before = dict(strategy.params)
+    with pytest.raises(ValueError, match='update_strategy_schedule'):
+        strategy.update_params({'rsi_period': 21, 'schedule': {'hour': 7}})
+    assert strategy.params == before
+
+
+def test_unknown_keys_are_checked_by_the_dry_run():
+    strategy = RSIStrategy({})
+    with pytest.raises(ValueError):
+        strategy.update_params({'buy_threshold': 'low'})
+    strategy.update_params({'buy_threshold': 25})
+    assert strategy.params == {'buy_threshold': 25}
+
+
+def test_nested_params_of_combined_strategy():
+    strategy = CombinedStrategy(STRATEGY_PARAMETERS['Combined Strategy'])
+    with pytest.raises(ValueError):
+        strategy.update_params({'Moving Average Strategy': {'long_window': -5}})
+    strategy.update_params({'Moving Average Strategy': {'long_window': '100'}})
+    assert strategy.strategies[1].params == {'short_window': 50, 'long_window': 100}
+
+
+def test_coerce_params_names_the_offending_key():
+    with pytest.raises(ValueError, match='RSI Strategy.rsi_period'):
+        coerce_params(STRATEGY_PARAMETERS['Combined Strategy'], {'RSI Strategy': {'rsi_period': 'x'}})
+
+
+def test_manager_raises_and_keeps_live_strategy():
+    manager = StrategyManager()
+    manager.load_strategies()
+    live = manager.get_strategy('RSI Strategy')
+    before = dict(live.params)
+    with pytest.raises(ValueError):
+        manager.update_strategy_params('RSI Strategy', {'rsi_period': 'abc', 'buy_threshold': None})
+    assert live.params == before
+    assert manager.update_strategy_params('RSI Strategy', {'rsi_period': 10})
+    assert manager.snapshot('RSI Strategy').params['rsi_period'] == 10
+
+
+def test_manager_dry_run_runs_outside_the_lock(monkeypatch):
+    manager = StrategyManager()
+    manager.load_strategies()
+    try_params = RSIStrategy.try_params
+    locked = []
+
+    def checking(self, new_params):
+        locked.append(manager.lock.locked())
+        return try_params(self, new_params)
+    monkeypatch.setattr(RSIStrategy, 'try_params', checking)
+    assert manager.update_strategy_params('RSI Strategy', {'rsi_period': 10})
+    assert locked == [False]
+
+
+def test_manager_retries_on_a_concurrent_update(monkeypatch):
+    manager = StrategyManager()
+    manager.load_strategies()
+    try_params = RSIStrategy.try_params
+
+    def interleaved(self, new_params):
+        # Another update lands while this one is being tried
+        if 'buy_threshold' in new_params and manager.snapshot('RSI Strategy').params['rsi_period'] != 10:
+            manager.update_strategy_params('RSI Strategy', {'rsi_period': 10})
+        return try_params(self, new_params)
+    monkeypatch.setattr(RSIStrategy, 'try_params', interleaved)
+    manager.update_strategy_params('RSI Strategy', {'buy_threshold': 25})
+    params = manager.snapshot('RSI Strategy').params
+    assert (params['rsi_period'], params['buy_threshold']) == (10, 25)
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies import indicators, kernels
+from strategies.breakout_strategy import BreakoutStrategy
+from strategies.combined_strategy import CombinedStrategy
+from strategies.moving_average_strategy import MovingAverageStrategy
+from strategies.rsi_strategy import RSIStrategy
+from strategies.streaming_indicators import (
+    STREAMING_INDICATORS, RollingWindow, StreamingRSI, StreamingSnapshot, feed, warm_up,
+)
+from tests.helpers import candles, flat_stretch, ohlcv, random_walk
+
+BATCH = {
+    'rsi': (indicators.rsi, {'period': 14}),
+    'macd': (indicators.macd, {}),
+    'bollinger_bands': (indicators.bollinger_bands, {'window': 20}),
+    'moving_averages': (indicators.moving_averages, {'short_window': 10, 'long_window': 30}),
+    'z_score': (indicators.z_score, {'window': 20}),
+    'atr': (indicators.atr, {'window': 14}),
+}
+
+INPUTS = {
+    'random_walk': random_walk(2000),
+    'flat_stretch': flat_stretch(2000),
+    'constant': np.full(300, 42.5),
+}
+
+
+@pytest.fixture(params=['pandas', 'numpy'])
+def backend(request):
+    previous = kernels.backend_name()
+    kernels.set_backend(request.param)
+    yield request.param
+    kernels.set_backend(previous)
+
+
+def replay(indicator, data):
+    rows = [feed(indicator, row.high, row.low, row.close) for row in data.itertuples()]
+    return pd.DataFrame(rows, index=data.index)
+
+
+@pytest.mark.parametrize('data', INPUTS)
+@pytest.mark.parametrize('name', BATCH)
+def test_streaming_matches_batch(backend, data, name):
+    frame = ohlcv(INPUTS[data])
+    batch, params = BATCH[name]
+    expected = batch(frame, **params)
+    streamed = replay(STREAMING_INDICATORS[name](**params), frame)
+    for output, series in expected.items():
+        np.testing.assert_allclose(streamed[output].to_numpy(), series.to_numpy(),
+                                   rtol=1e-7, atol=1e-5, equal_nan=True, err_msg=output)
+        np.testing.assert_array_equal(streamed[output].isna().to_numpy(), series.isna().to_numpy())
+
+
+def test_warm_up_returns_latest_values():
+    frame = ohlcv(random_walk(100))
+    assert warm_up(STREAMING_INDICATORS['rsi'](14), frame)['rsi'] == pytest.approx(
+        indicators.rsi(frame, 14)['rsi'].iloc[-1])
+
+
+def test_rsi_stays_in_range_on_flat_stretch():
+    rsi = StreamingRSI(14)
+    values = np.array([rsi.update(close)['rsi'] for close in flat_stretch(3000)])
+    batch = indicators.rsi(ohlcv(flat_stretch(3000)), 14)['rsi'].to_numpy()
+    np.testing.assert_array_equal(np.isnan(values), np.isnan(batch))
+    assert ((values[~np.isnan(values)] >= 0) & (values[~np.isnan(values)] <= 100)).all()
+
+
+def test_rolling_window_does_not_drift():
+    rng = np.random.default_rng(3)
+    values = 1e6 + np.cumsum(rng.normal(0, 1e3, 50000))
+    window = RollingWindow(20)
+    for value in values:
+        window.update(value)
+    tail = pd.Series(values[-20:])
+    assert window.mean == pytest.approx(tail.mean(), rel=1e-12)
+    assert window.std == pytest.approx(tail.std(), rel=1e-6)
+
+
+class WholeFrameRSI(RSIStrategy):
+    # A strategy that does not say how many rows it reads
+    name = "Whole Frame RSI"
+
+    def signal_bars(self):
+        return None
+
+
+@pytest.mark.parametrize('strategy', [CombinedStrategy({}), BreakoutStrategy({}), MovingAverageStrategy({}),
+                                      WholeFrameRSI({})], ids=lambda s: s.get_name())
+def test_snapshot_advances_like_batch(backend, strategy):
+    frame = ohlcv(flat_stretch(800, start=300, length=60))
+    bars = candles(frame)
+    snapshot = StreamingSnapshot(max_bars=250)
+    for end in list(range(250, 260)) + [400, 401, 800]:
+        window = bars.slice(max(0, end - 250), end)
+        snapshot.advance(window, [strategy])
+        data = snapshot.frame_for(strategy)
+        expected = strategy.apply_indicators(frame.iloc[:end])
+        # Only the rows generate_signal reads. The streaming state has seen
+        # every bar since the first advance; compare the rows whose windows
+        # the buffer fully covers
+        assert len(data) == (strategy.signal_bars() or len(window))
+        rows = min(len(data), 20)
+        for column in data.columns:
+            np.testing.assert_allclose(data[column].to_numpy()[-rows:], expected[column].to_numpy()[-rows:],
+                                       rtol=1e-7, atol=1e-5, equal_nan=True, err_msg=column)
+        assert strategy.generate_signal(data) == strategy.generate_signal(expected)
+
+
+def test_snapshot_rebuilds_on_new_params_and_reseeded_history():
+    frame = ohlcv(random_walk(600))
+    bars = candles(frame)
+    snapshot = StreamingSnapshot(max_bars=300)
+    strategy = CombinedStrategy({})
+    snapshot.advance(bars.slice(0, 300), [strategy])
+    updated = strategy.with_params({'RSI Strategy': {'rsi_period': 7}})
+    snapshot.advance(bars.slice(1, 301), [updated])
+    assert {key for key in snapshot.states} == {indicator.key for indicator in updated.required_indicators()}
+    # A window that does not continue the fed bars rebuilds everything
+    snapshot.advance(bars.slice(500, 600), [updated])
+    expected = updated.apply_indicators(frame.iloc[500:600])
+    data = snapshot.frame_for(updated)
+    for column in data.columns:
+        np.testing.assert_allclose(data[column].to_numpy(), expected[column].to_numpy()[-len(data):],
+                                   rtol=1e-7, atol=1e-5, equal_nan=True, err_msg=column)
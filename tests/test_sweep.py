@@ -0,0 +1,45 @@
+from backtesting import sweep as sweep_module
+from backtesting.sweep import METRICS, grid_search, random_search, sweep
+
+RSI = 'strategies.rsi_strategy.RSIStrategy'
+
+
+def test_random_search_samples_the_grid_without_building_it(monkeypatch):
+    param_space = {'rsi_period': [7, 14, 21], 'buy_threshold': [20, 25, 30, 35], 'sell_threshold': [65, 70]}
+    grid = grid_search(param_space)
+
+    def no_grid(param_space):
+        raise AssertionError("random search built the grid")
+    monkeypatch.setattr(sweep_module, 'grid_search', no_grid)
+    sample = random_search(param_space, 10, seed=1)
+    assert len(sample) == 10
+    assert all(combination in grid for combination in sample)
+    assert len({tuple(combination.values()) for combination in sample}) == 10
+    assert sample == random_search(param_space, 10, seed=1)
+    assert sorted(map(str, random_search(param_space, 100))) == sorted(map(str, grid))
+
+
+def test_random_search_over_a_huge_space():
+    param_space = {f'p{i}': list(range(100)) for i in range(8)}
+    assert len(random_search(param_space, 5, seed=0)) == 5
+
+
+def test_sweep_ranks_combinations(history):
+    results = sweep(RSI, 'BTCUSDT', {'rsi_period': [7, 14], 'buy_threshold': [25, 30]}, max_workers=1)
+    assert len(results) == 4
+    assert results['total_return'].is_monotonic_decreasing
+
+
+def test_empty_grid_returns_the_expected_columns(history):
+    results = sweep(RSI, 'BTCUSDT', {'rsi_period': []}, max_workers=1)
+    assert results.empty
+    assert list(results.columns) == ['rsi_period', *METRICS]
+
+
+def test_failed_tasks_become_error_rows(tmp_path, monkeypatch):
+    # No history for the symbol, so every task fails
+    monkeypatch.chdir(tmp_path)
+    results = sweep(RSI, 'UNLISTEDUSDT', {'rsi_period': [7, 14]}, max_workers=1)
+    assert sorted(results['rsi_period']) == [7, 14]
+    assert results['total_return'].isna().all()
+    assert results['error'].notna().all()
@@ -0,0 +1,71 @@
+# candles.py
+
+import numpy as np
+import pandas as pd
+
+# Positions of the fields we keep in a Binance kline row
+OPEN_TIME, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+class Candles:
+    # Compact columnar OHLCV: int64 open times in ms and one float array per
+    # price/volume field. The other kline fields are dropped at parse time.
+    __slots__ = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, timestamp, open, high, low, close, volume):
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_klines(cls, klines, dtype=np.float64):
+        # klines is either the raw payload (list of kline rows with string
+        # prices) or an (n, 12) numeric array such as the kline cache returns.
+        # Each column is parsed straight into its typed array.
+        if isinstance(klines, np.ndarray):
+            return cls(
+                klines[:, OPEN_TIME].astype(np.int64),
+                *(klines[:, column].astype(dtype) for column in (OPEN, HIGH, LOW, CLOSE, VOLUME))
+            )
+        count = len(klines)
+        return cls(
+            np.fromiter((kline[OPEN_TIME] for kline in klines), dtype=np.int64, count=count),
+            *(np.fromiter((kline[column] for kline in klines), dtype=dtype, count=count)
+              for column in (OPEN, HIGH, LOW, CLOSE, VOLUME))
+        )
+
+    @classmethod
+    def empty(cls, dtype=np.float64):
+        return cls(np.empty(0, dtype=np.int64), *(np.empty(0, dtype=dtype) for _ in range(5)))
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, field).nbytes for field in self.__slots__)
+
+    def append(self, other):
+        return Candles(*(np.concatenate([getattr(self, field), getattr(other, field)]) for field in self.__slots__))
+
+    def tail(self, count):
+        return Candles(*(getattr(self, field)[-count:] for field in self.__slots__))
+
+    def slice(self, start=None, stop=None):
+        # Views, not copies
+        return Candles(*(getattr(self, field)[start:stop] for field in self.__slots__))
+
+    def to_frame(self):
+        # DataFrame view for the strategy/indicator layer: OHLCV float columns
+        # on a DatetimeIndex, with no object columns
+        index = pd.DatetimeIndex(pd.to_datetime(self.timestamp, unit='ms'), name='timestamp')
+        return pd.DataFrame({
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+        }, index=index, copy=False)
@@ -1,64 +1,248 @@
 # database.py
 
-import psycopg2
-from psycopg2.extras import execute_values
-from config.config import DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD
-from utils.logger import log_error
+import sqlite3
+import threading
+import time
+from config.config import (
+    DB_BACKEND, DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD, DB_POOL_SIZE, SQLITE_PATH,
+    TRADE_WRITER_FLUSH_SIZE, TRADE_WRITER_FLUSH_SECONDS
+)
+from utils.logger import log_error, log_info
+from utils.metrics import timed
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class SQLitePool:
+    # Same getconn/putconn interface as psycopg2's pools, backed by a single
+    # connection (so ':memory:' is one database shared by the whole process).
+    # SQLite allows one writer at a time, so a connection is handed to one
+    # thread at a time.
+    def __init__(self, path):
+        # Declared TIMESTAMP/DATE columns come back as datetime/date, as with psycopg2
+        self.conn = sqlite3.connect(path, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        self.lock = threading.RLock()
+
+    def getconn(self):
+        self.lock.acquire()
+        return self.conn
+
+    def putconn(self, conn):
+        self.lock.release()
+
+    def closeall(self):
+        self.conn.close()
+
+
+def get_pool(backend):
+    # One pool per backend per process; the schema is created when it is built
+    with _pools_lock:
+        if backend not in _pools:
+            if backend == 'sqlite':
+                pool = SQLitePool(SQLITE_PATH)
+            else:
+                # psycopg2 is only imported when the postgres backend is used
+                from psycopg2.pool import ThreadedConnectionPool
+
+                pool = ThreadedConnectionPool(
+                    1, DB_POOL_SIZE,
+                    host=DB_HOST,
+                    port=DB_PORT,
+                    dbname=DB_NAME,
+                    user=DB_USER,
+                    password=DB_PASSWORD
+                )
+            conn = pool.getconn()
+            try:
+                create_tables(conn, backend)
+            finally:
+                pool.putconn(conn)
+            _pools[backend] = pool
+            log_info(f"Database connection pool ready ({backend}).")
+        return _pools[backend]
+
+
+def create_tables(conn, backend):
+    id_column = 'INTEGER PRIMARY KEY AUTOINCREMENT' if backend == 'sqlite' else 'SERIAL PRIMARY KEY'
+    create_trades_table = f"""
+    CREATE TABLE IF NOT EXISTS trades (
+        id {id_column},
+        timestamp TIMESTAMP,
+        action VARCHAR(10),
+        symbol VARCHAR(10),
+        quantity NUMERIC,
+        price NUMERIC,
+        entry_price NUMERIC,
+        stop_loss NUMERIC,
+        take_profit NUMERIC,
+        profit NUMERIC
+    );
+    """
+    create_summary_table = """
+    CREATE TABLE IF NOT EXISTS trade_daily_summary (
+        symbol VARCHAR(10),
+        day DATE,
+        total_buys INTEGER,
+        total_sells INTEGER,
+        net_profit NUMERIC,
+        PRIMARY KEY (symbol, day)
+    );
+    """
+    # One row per open position, written on fill and deleted on sell, with
+    # the orderListId of its OCO exit
+    create_positions_table = """
+    CREATE TABLE IF NOT EXISTS positions (
+        strategy VARCHAR(64),
+        symbol VARCHAR(10),
+        quantity NUMERIC,
+        entry_price NUMERIC,
+        stop_loss NUMERIC,
+        take_profit NUMERIC,
+        opened_at TIMESTAMP,
+        oco_order_list_id BIGINT,
+        PRIMARY KEY (strategy, symbol)
+    );
+    """
+    create_indexes = [
+        "CREATE INDEX IF NOT EXISTS idx_trades_symbol_timestamp ON trades (symbol, timestamp);",
+        "CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades (timestamp);",
+        "CREATE INDEX IF NOT EXISTS idx_trade_daily_summary_day ON trade_daily_summary (day);",
+    ]
+    cursor = conn.cursor()
+    cursor.execute(create_trades_table)
+    cursor.execute(create_summary_table)
+    cursor.execute(create_positions_table)
+    add_missing_columns(cursor, 'positions', {'oco_order_list_id': 'BIGINT'})
+    for create_index in create_indexes:
+        cursor.execute(create_index)
+    backfill_daily_summary(cursor, backend)
+    conn.commit()
+    cursor.close()
+
+
+def add_missing_columns(cursor, table, columns):
+    # Columns added to a table after it was first created
+    cursor.execute(f"SELECT * FROM {table} LIMIT 0;")
+    existing = {column[0] for column in cursor.description}
+    for name, column_type in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type};")
+
+
+def backfill_daily_summary(cursor, backend):
+    # Build the aggregates from existing trades the first time the table exists
+    cursor.execute("SELECT COUNT(*) FROM trade_daily_summary;")
+    if cursor.fetchone()[0]:
+        return
+    day = 'date(timestamp)' if backend == 'sqlite' else 'CAST(timestamp AS DATE)'
+    cursor.execute(f"""
+    INSERT INTO trade_daily_summary (symbol, day, total_buys, total_sells, net_profit)
+    SELECT
+        symbol,
+        {day},
+        SUM(CASE WHEN action = 'buy' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN action = 'sell' THEN 1 ELSE 0 END),
+        COALESCE(SUM(profit), 0)
+    FROM trades
+    GROUP BY symbol, {day};
+    """)
+
+
+def summarize_trades(rows):
+    # Per (symbol, day) totals for a batch of trade rows
+    totals = {}
+    for row in rows:
+        timestamp, action, symbol, profit = row[0], row[1], row[2], row[8]
+        key = (symbol, timestamp.date())
+        buys, sells, net_profit = totals.get(key, (0, 0, 0.0))
+        totals[key] = (
+            buys + (action == 'buy'),
+            sells + (action == 'sell'),
+            net_profit + float(profit or 0)
+        )
+    return [key + value for key, value in totals.items()]
+
 
 class Database:
-    def __init__(self):
+    def __init__(self, backend=DB_BACKEND):
+        self.backend = backend
+        self.placeholder = '?' if backend == 'sqlite' else '%s'
+        self.pool = None
+        self.conn = None
+        self.cursor = None
         try:
-            self.conn = psycopg2.connect(
-                host=DB_HOST,
-                port=DB_PORT,
-                dbname=DB_NAME,
-                user=DB_USER,
-                password=DB_PASSWORD
-            )
+            self.pool = get_pool(backend)
+            self.conn = self.pool.getconn()
             self.cursor = self.conn.cursor()
-            self.create_tables()
         except Exception as e:
             log_error(f"Database connection failed: {e}")
 
-    def create_tables(self):
-        create_trades_table = """
-        CREATE TABLE IF NOT EXISTS trades (
-            id SERIAL PRIMARY KEY,
-            timestamp TIMESTAMP,
-            action VARCHAR(10),
-            symbol VARCHAR(10),
-            quantity NUMERIC,
-            price NUMERIC,
-            entry_price NUMERIC,
-            stop_loss NUMERIC,
-            take_profit NUMERIC,
-            profit NUMERIC
-        );
-        """
-        self.cursor.execute(create_trades_table)
-        self.conn.commit()
-
     def insert_trade(self, trade_data):
+        self.insert_trades([trade_data])
+
+    @timed('db_insert_trades')
+    def insert_trades(self, rows):
+        # Raises when the rows could not be written, so callers can keep them
         insert_query = """
         INSERT INTO trades (timestamp, action, symbol, quantity, price, entry_price, stop_loss, take_profit, profit)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s);
+        VALUES {values};
+        """
+        # The daily aggregates are updated in the same transaction as the trades
+        upsert_summary_query = """
+        INSERT INTO trade_daily_summary (symbol, day, total_buys, total_sells, net_profit)
+        VALUES {values}
+        ON CONFLICT (symbol, day) DO UPDATE SET
+            total_buys = trade_daily_summary.total_buys + EXCLUDED.total_buys,
+            total_sells = trade_daily_summary.total_sells + EXCLUDED.total_sells,
+            net_profit = trade_daily_summary.net_profit + EXCLUDED.net_profit;
         """
+        if self.conn is None:
+            raise ConnectionError("No database connection")
         try:
-            self.cursor.execute(insert_query, trade_data)
+            self.execute_batch(insert_query, rows, 9)
+            self.execute_batch(upsert_summary_query, summarize_trades(rows), 5)
             self.conn.commit()
         except Exception as e:
+            self.conn.rollback()
             log_error(f"Failed to insert trade data: {e}")
+            raise
 
-    def get_trades_summary(self):
-        query = """
+    def execute_batch(self, query, rows, columns):
+        if self.backend == 'sqlite':
+            placeholders = ', '.join([self.placeholder] * columns)
+            self.cursor.executemany(query.format(values=f"({placeholders})"), rows)
+        else:
+            from psycopg2.extras import execute_values
+
+            execute_values(self.cursor, query.format(values='%s'), rows)
+
+    @timed('db_trades_summary')
+    def get_trades_summary(self, start_date=None, end_date=None, symbol=None):
+        # Served from the per-symbol/per-day aggregates; start_date and
+        # end_date are inclusive dates
+        conditions = []
+        params = []
+        if start_date is not None:
+            conditions.append(f"day >= {self.placeholder}")
+            params.append(start_date)
+        if end_date is not None:
+            conditions.append(f"day <= {self.placeholder}")
+            params.append(end_date)
+        if symbol is not None:
+            conditions.append(f"symbol = {self.placeholder}")
+            params.append(symbol)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
         SELECT
-            COUNT(*) FILTER (WHERE action = 'buy') AS total_buys,
-            COUNT(*) FILTER (WHERE action = 'sell') AS total_sells,
-            SUM(profit) AS net_profit
-        FROM trades;
+            SUM(total_buys) AS total_buys,
+            SUM(total_sells) AS total_sells,
+            SUM(net_profit) AS net_profit
+        FROM trade_daily_summary
+        {where};
         """
         try:
-            self.cursor.execute(query)
+            self.cursor.execute(query, params)
             result = self.cursor.fetchone()
             total_buys = result[0] or 0
             total_sells = result[1] or 0
@@ -74,7 +258,108 @@ class Database:
         except Exception as e:
             log_error(f"Failed to get trades summary: {e}")
             return {}
-    
+
+    def save_position(self, position):
+        query = f"""
+        INSERT INTO positions (strategy, symbol, quantity, entry_price, stop_loss, take_profit, opened_at,
+                               oco_order_list_id)
+        VALUES ({', '.join([self.placeholder] * 8)})
+        ON CONFLICT (strategy, symbol) DO UPDATE SET
+            quantity = EXCLUDED.quantity,
+            entry_price = EXCLUDED.entry_price,
+            stop_loss = EXCLUDED.stop_loss,
+            take_profit = EXCLUDED.take_profit,
+            opened_at = EXCLUDED.opened_at,
+            oco_order_list_id = EXCLUDED.oco_order_list_id;
+        """
+        try:
+            self.cursor.execute(query, (
+                position.strategy, position.symbol, position.quantity, position.entry_price,
+                position.stop_loss, position.take_profit, position.opened_at, position.oco_order_list_id
+            ))
+            self.conn.commit()
+        except Exception as e:
+            if self.conn is not None:
+                self.conn.rollback()
+            log_error(f"Failed to save position: {e}")
+
+    def delete_position(self, strategy, symbol):
+        query = f"DELETE FROM positions WHERE strategy = {self.placeholder} AND symbol = {self.placeholder};"
+        try:
+            self.cursor.execute(query, (strategy, symbol))
+            self.conn.commit()
+        except Exception as e:
+            if self.conn is not None:
+                self.conn.rollback()
+            log_error(f"Failed to delete position: {e}")
+
+    def get_positions(self):
+        query = """
+        SELECT strategy, symbol, quantity, entry_price, stop_loss, take_profit, opened_at, oco_order_list_id
+        FROM positions;
+        """
+        try:
+            self.cursor.execute(query)
+            return self.cursor.fetchall()
+        except Exception as e:
+            log_error(f"Failed to get positions: {e}")
+            return []
+
     def close(self):
-        self.cursor.close()
-        self.conn.close()
+        # Return the connection to the pool instead of closing it
+        if self.cursor is not None:
+            self.cursor.close()
+        if self.conn is not None:
+            self.pool.putconn(self.conn)
+        self.cursor = None
+        self.conn = None
+
+
+class TradeWriter:
+    # Buffers trade rows and writes them in one batch when flush_size rows are
+    # pending, flush_seconds have passed since the last flush, or on flush().
+    # flush() is also called on a timer and at shutdown (main.py), so the rows
+    # of a last trade are not left waiting for another write. A batch that
+    # fails to insert goes back to the front of the buffer for the next flush.
+    def __init__(self, flush_size=TRADE_WRITER_FLUSH_SIZE, flush_seconds=TRADE_WRITER_FLUSH_SECONDS,
+                 backend=DB_BACKEND):
+        self.flush_size = flush_size
+        self.flush_seconds = flush_seconds
+        self.backend = backend
+        self.rows = []
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def write(self, trade_data):
+        with self.lock:
+            self.rows.append(trade_data)
+            due = (len(self.rows) >= self.flush_size
+                   or time.monotonic() - self.last_flush >= self.flush_seconds)
+        if due:
+            self.flush()
+
+    def flush(self):
+        # True when the buffer was written (or empty)
+        with self.lock:
+            rows, self.rows = self.rows, []
+            self.last_flush = time.monotonic()
+        if not rows:
+            return True
+        db = Database(self.backend)
+        try:
+            db.insert_trades(rows)
+            return True
+        except Exception as e:
+            with self.lock:
+                self.rows[:0] = rows
+            log_error(f"Kept {len(rows)} trades to retry on the next flush: {e}")
+            return False
+        finally:
+            db.close()
+
+    def pending(self):
+        with self.lock:
+            return len(self.rows)
+
+
+trade_writer = TradeWriter()
@@ -1,79 +1,275 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import queue
 import smtplib
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
+import pandas as pd
 from utils.database import Database
 from utils.logger import log_info, log_error
+from utils.metrics import metrics
 from config.config import (
     EMAIL_HOST, EMAIL_PORT, EMAIL_HOST_USER, EMAIL_HOST_PASSWORD,
-    EMAIL_USE_TLS, EMAIL_RECEIVER, TRADING_PAIRS
+    EMAIL_USE_TLS, EMAIL_RECEIVER, TRADING_PAIRS, STRATEGY_PARAMETERS,
+    REPORT_CACHE_DIR, REPORT_RENDER_WORKERS, EMAIL_MAX_RETRIES, EMAIL_RETRY_SECONDS
 )
-from backtesting.backtest import backtest  # Adjust the import path as needed
-import os
+from backtesting.backtest import load_historical_data, render_backtest_png
+from backtesting.runner import run_backtests
+from strategies.combined_strategy import CombinedStrategy
+
+# Bump when the backtest or the plot changes so cached sections are rebuilt
+REPORT_CACHE_VERSION = 1
+
+# The weekly report is built in stages: trade summary from the database,
+# backtest sections (served from a disk cache keyed by a hash of the data and
+# params, so unchanged symbols are neither re-run nor re-plotted), PNGs
+# rendered in memory by a process pool, then delivery through a queue that
+# retries failed SMTP sends on a background thread.
+
+
+class ReportCache:
+    # One pickle per section: {'total_return': float, 'png': bytes}
+    def __init__(self, cache_dir=REPORT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        try:
+            with open(self.path(key), 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log_error(f"Discarding unreadable report cache entry {key}: {e}")
+            return None
+
+    def put(self, key, entry):
+        # Written to a temporary file and renamed so readers never see a partial entry
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f)
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def prune(self, keep_keys):
+        # Drop sections that no current symbol/params combination refers to
+        if not os.path.isdir(self.cache_dir):
+            return
+        keep = {f"{key}.pkl" for key in keep_keys}
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.pkl') and filename not in keep:
+                os.remove(os.path.join(self.cache_dir, filename))
+
+
+def report_key(symbol, data, strategy_class, params):
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    digest.update(json.dumps([REPORT_CACHE_VERSION, symbol, strategy_class.__name__, params],
+                             sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def render_sections(results, max_workers=None):
+    # PNG bytes for each backtest result, rendered in worker processes
+    symbols = list(results['symbol'])
+    curves = list(results['cumulative_returns'])
+    if max_workers == 1 or len(symbols) <= 1:
+        return [render_backtest_png(symbol, curve) for symbol, curve in zip(symbols, curves)]
+    # Spawned, not forked: this runs on a scheduler thread of the bot process,
+    # whose other threads' locks a forked child could inherit held
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return list(executor.map(render_backtest_png, symbols, curves))
+
+
+def build_backtest_sections(symbols, strategy_class, params, cache, max_workers=None):
+    # Returns [(symbol, total_return, png)] in symbol order. Only symbols
+    # whose data or params changed since the last report are backtested and
+    # rendered again.
+    keys = {}
+    sections = {}
+    for symbol in symbols:
+        try:
+            keys[symbol] = report_key(symbol, load_historical_data(symbol), strategy_class, params)
+        except Exception as e:
+            log_error(f"Backtest failed for {symbol}: {e}")
+            continue
+        entry = cache.get(keys[symbol])
+        if entry is not None:
+            sections[symbol] = entry
+
+    stale = [symbol for symbol in keys if symbol not in sections]
+    log_info(f"Report sections: {len(sections)} cached, {len(stale)} to rebuild.")
+    if stale:
+        with metrics.span('report_backtest'):
+            jobs = [(symbol, strategy_class, params) for symbol in stale]
+            results = run_backtests(jobs, max_workers=max_workers, keep_curves=True)
+        if 'error' in results:
+            for _, row in results[results['error'].notna()].iterrows():
+                log_error(f"Backtest failed for {row['symbol']}: {row['error']}")
+            results = results[results['error'].isna()]
+        with metrics.span('report_render'):
+            images = render_sections(results, max_workers)
+        for symbol, total_return, png in zip(results['symbol'], results['total_return'], images):
+            entry = {'total_return': float(total_return), 'png': png}
+            cache.put(keys[symbol], entry)
+            sections[symbol] = entry
+
+    cache.prune(keys.values())
+    return [(symbol, sections[symbol]['total_return'], sections[symbol]['png'])
+            for symbol in symbols if symbol in sections]
+
+
+def build_message(summary, sections):
+    total_trades = summary.get('total_trades', 0)
+    total_buys = summary.get('total_buys', 0)
+    total_sells = summary.get('total_sells', 0)
+    net_profit = summary.get('net_profit', 0.0)
 
-def send_email_report():
+    # Compose email
+    subject = "Weekly Trading Bot Report"
+    body = f"""
+    <html>
+    <body>
+    <h2>Weekly Trading Bot Report</h2>
+    <p>Total Trades: {total_trades}</p>
+    <p>Total Buys: {total_buys}</p>
+    <p>Total Sells: {total_sells}</p>
+    <p>Net Profit: {net_profit:.2f} USDT</p>
+    """
+
+    message = MIMEMultipart('related')
+    message['From'] = EMAIL_HOST_USER
+    message['To'] = EMAIL_RECEIVER
+    message['Subject'] = subject
+
+    message_alternative = MIMEMultipart('alternative')
+    message.attach(message_alternative)
+
+    for idx, (symbol, total_return, png) in enumerate(sections):
+        body += f"""
+        <h3>Backtest Performance for {symbol}</h3>
+        <p>Total Return: {total_return * 100:.2f}%</p>
+        <img src="cid:backtest_plot_{idx}" alt="Backtest Plot for {symbol}" />
+        """
+        image = MIMEImage(png, 'png')
+        image.add_header('Content-ID', f'<backtest_plot_{idx}>')
+        message.attach(image)
+
+    body += "</body></html>"
+    message_alternative.attach(MIMEText(body, 'html'))
+    return message
+
+
+class ReportMailer:
+    # Sends queued messages on a background thread. A failed send is retried
+    # after retry_seconds, doubling each time, up to max_retries attempts.
+    # stop() lets the thread send what is already queued, without further
+    # backoff, before it exits. Point host/port at a local SMTP stand-in
+    # (use_tls=False, no user) to exercise delivery without a real server.
+    def __init__(self, host=EMAIL_HOST, port=EMAIL_PORT, user=EMAIL_HOST_USER, password=EMAIL_HOST_PASSWORD,
+                 use_tls=EMAIL_USE_TLS, max_retries=EMAIL_MAX_RETRIES, retry_seconds=EMAIL_RETRY_SECONDS):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.max_retries = max_retries
+        self.retry_seconds = retry_seconds
+        self.queue = queue.Queue()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def send(self, message):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.stop_event.clear()
+                self.thread = threading.Thread(target=self.run, name='report-mailer', daemon=True)
+                self.thread.start()
+        self.queue.put(message)
+
+    def deliver(self, message):
+        with smtplib.SMTP(self.host, self.port, timeout=60) as server:
+            if self.use_tls:
+                server.starttls()
+            if self.user:
+                server.login(self.user, self.password)
+            server.send_message(message)
+
+    def run(self):
+        while True:
+            message = self.queue.get()
+            try:
+                if message is None:
+                    return
+                for attempt in range(self.max_retries):
+                    try:
+                        with metrics.span('report_smtp'):
+                            self.deliver(message)
+                        log_info("Email report sent successfully.")
+                        break
+                    except Exception as e:
+                        if attempt + 1 == self.max_retries or self.stop_event.is_set():
+                            log_error(f"Giving up on email report after {attempt + 1} attempts: {e}")
+                            break
+                        delay = self.retry_seconds * 2 ** attempt
+                        log_error(f"Failed to send email report ({e}), retrying in {delay}s.")
+                        # Cut short by stop(), which gives the send one last try
+                        self.stop_event.wait(delay)
+            finally:
+                self.queue.task_done()
+
+    def join(self):
+        # Block until every queued message was sent or given up on
+        self.queue.join()
+
+    def stop(self, timeout=None):
+        # Send the queued messages, then end the thread. Returns False when
+        # some were still unsent after timeout seconds.
+        self.stop_event.set()
+        with self.lock:
+            thread = self.thread
+            if thread is None or not thread.is_alive():
+                return self.queue.empty()
+            self.queue.put(None)
+        thread.join(timeout)
+        return not thread.is_alive()
+
+
+report_cache = ReportCache()
+report_mailer = ReportMailer()
+
+
+def send_email_report(cache=None, mailer=None):
     log_info("Preparing to send email report...")
+    cache = cache or report_cache
+    mailer = mailer or report_mailer
     db = Database()
     try:
         # Fetch data from database
         summary = db.get_trades_summary()
-        total_trades = summary.get('total_trades', 0)
-        total_buys = summary.get('total_buys', 0)
-        total_sells = summary.get('total_sells', 0)
-        net_profit = summary.get('net_profit', 0.0)
-
-        # Compose email
-        subject = "Weekly Trading Bot Report"
-        body = f"""
-        <html>
-        <body>
-        <h2>Weekly Trading Bot Report</h2>
-        <p>Total Trades: {total_trades}</p>
-        <p>Total Buys: {total_buys}</p>
-        <p>Total Sells: {total_sells}</p>
-        <p>Net Profit: {net_profit:.2f} USDT</p>
-        """
+    finally:
+        db.close()
 
-        message = MIMEMultipart('related')
-        message['From'] = EMAIL_HOST_USER
-        message['To'] = EMAIL_RECEIVER
-        message['Subject'] = subject
-
-        message_alternative = MIMEMultipart('alternative')
-        message.attach(message_alternative)
-
-        # Backtest and attach plots for each symbol
-        for idx, symbol in enumerate(TRADING_PAIRS):
-            total_return, plot_filename = backtest(symbol)
-            body += f"""
-            <h3>Backtest Performance for {symbol}</h3>
-            <p>Total Return: {total_return * 100:.2f}%</p>
-            <img src="cid:backtest_plot_{idx}" alt="Backtest Plot for {symbol}" />
-            """
-            with open(plot_filename, 'rb') as f:
-                img_data = f.read()
-            image = MIMEImage(img_data)
-            image.add_header('Content-ID', f'<backtest_plot_{idx}>')
-            message.attach(image)
-
-        body += "</body></html>"
-        message_alternative.attach(MIMEText(body, 'html'))
-
-        # Connect to SMTP server and send email
-        server = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT)
-        if EMAIL_USE_TLS:
-            server.starttls()
-        server.login(EMAIL_HOST_USER, EMAIL_HOST_PASSWORD)
-        server.send_message(message)
-        server.quit()
-        log_info("Email report sent successfully.")
-
-        # Clean up plot images
-        for idx, symbol in enumerate(TRADING_PAIRS):
-            plot_filename = f'backtest_{symbol}.png'
-            if os.path.exists(plot_filename):
-                os.remove(plot_filename)
+    try:
+        sections = build_backtest_sections(
+            TRADING_PAIRS, CombinedStrategy, STRATEGY_PARAMETERS['Combined Strategy'], cache,
+            REPORT_RENDER_WORKERS
+        )
+        mailer.send(build_message(summary, sections))
+        log_info("Email report queued for delivery.")
     except Exception as e:
-        log_error(f"An error occurred while sending email report: {e}")
-    finally:
-        db.close()
\ No newline at end of file
+        log_error(f"An error occurred while building email report: {e}")
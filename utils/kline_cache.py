@@ -0,0 +1,157 @@
+# kline_cache.py
+
+import os
+import shutil
+import threading
+import time
+import numpy as np
+from utils.logger import log_info
+
+OPEN_TIME = 0
+CLOSE_TIME = 6
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+def month_of(open_ms):
+    # 'YYYY-MM' of open times (ms): the shard a kline is stored in
+    return np.datetime_as_string(np.asarray(open_ms, dtype=np.int64).astype('datetime64[ms]'), unit='M')
+
+
+class KlineCache:
+    # Persistent per-symbol/interval candle store. Closed klines are kept as
+    # float64 (n, 12) arrays, one .npy file per calendar month of open time,
+    # memory-mapped on read. Each run only downloads the bars after the last
+    # cached close_time and only rewrites the month(s) those bars fall in, so
+    # a delta fetch costs disk I/O in proportion to a month, not the history.
+    def __init__(self, cache_dir):
+        # Directories are created on first write
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self.file_locks = {}
+
+    def path(self, symbol, interval):
+        # Directory holding the symbol/interval's monthly shards
+        return os.path.join(self.cache_dir, f"{symbol}_{interval}")
+
+    def shard_path(self, symbol, interval, month):
+        return os.path.join(self.path(symbol, interval), f"{month}.npy")
+
+    def shards(self, symbol, interval):
+        # Months with a shard on disk, oldest first
+        path = self.path(symbol, interval)
+        legacy = f"{path}.npy"
+        if os.path.exists(legacy):
+            # Single-file cache from before the monthly shards
+            klines = np.load(legacy)
+            if len(klines):
+                self.save(symbol, interval, klines)
+            os.remove(legacy)
+        if not os.path.isdir(path):
+            return []
+        return sorted(filename[:-len('.npy')] for filename in os.listdir(path) if filename.endswith('.npy'))
+
+    def load(self, symbol, interval, start_ms=None):
+        # Cached klines, from the month of start_ms on when given; None when
+        # there are none
+        months = self.shards(symbol, interval)
+        if start_ms is not None:
+            first = str(month_of(start_ms))
+            months = [month for month in months if month >= first]
+        if not months:
+            return None
+        parts = [np.load(self.shard_path(symbol, interval, month), mmap_mode='r') for month in months]
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def save(self, symbol, interval, klines):
+        # Merge klines (sorted by open time) into their monthly shards: a
+        # shard keeps its rows before the first new open time and the rest is
+        # replaced, which appends a delta fetch and overwrites a refetch
+        os.makedirs(self.path(symbol, interval), exist_ok=True)
+        months = month_of(klines[:, OPEN_TIME])
+        for month in np.unique(months):
+            rows = klines[months == month]
+            path = self.shard_path(symbol, interval, month)
+            if os.path.exists(path):
+                shard = np.load(path, mmap_mode='r')
+                rows = np.concatenate([shard[shard[:, OPEN_TIME] < rows[0, OPEN_TIME]], rows])
+                del shard
+            self.write(path, rows)
+
+    def write(self, path, klines):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, klines)
+        # Atomic swap so concurrent readers never see a partial file
+        os.replace(tmp_path, path)
+
+    def file_lock(self, symbol, interval):
+        # One lock per symbol/interval so different symbols can be fetched concurrently
+        with self.lock:
+            return self.file_locks.setdefault((symbol, interval), threading.Lock())
+
+    def get_klines(self, client, symbol, interval, lookback_days):
+        now_ms = int(time.time() * 1000)
+        start_ms = now_ms - int(lookback_days * DAY_MS)
+
+        with self.file_lock(symbol, interval):
+            cached = self.load(symbol, interval, start_ms)
+            if cached is not None and len(cached) and self._covers(cached, start_ms):
+                fetch_from = int(cached[-1, CLOSE_TIME]) + 1
+            else:
+                # Nothing cached, or the cache doesn't reach back far enough
+                cached = None
+                fetch_from = start_ms
+
+            fetched = client.get_historical_klines(symbol, interval, fetch_from)
+            fetched = np.asarray(fetched, dtype=np.float64).reshape(-1, 12)
+            log_info(f"Fetched {len(fetched)} new {interval} klines for {symbol}")
+
+            # Only persist closed candles; the in-progress one is refetched next run
+            closed = fetched[fetched[:, CLOSE_TIME] < now_ms]
+            if len(closed):
+                self.save(symbol, interval, closed)
+
+        klines = fetched if cached is None else np.concatenate([cached, fetched])
+        return klines[klines[:, OPEN_TIME] >= start_ms]
+
+    def _covers(self, cached, start_ms):
+        # The first cached bar must start within one bar of the requested window
+        bar_ms = cached[0, CLOSE_TIME] - cached[0, OPEN_TIME] + 1
+        return cached[0, OPEN_TIME] < start_ms + bar_ms
+
+    def compact(self, symbol, interval, retention_days):
+        # Drop cached candles older than the retention window: whole shards
+        # before its first month, and the older rows of that month's shard
+        cutoff_ms = int(time.time() * 1000) - retention_days * DAY_MS
+        cutoff_month = str(month_of(cutoff_ms))
+        with self.file_lock(symbol, interval):
+            for month in self.shards(symbol, interval):
+                path = self.shard_path(symbol, interval, month)
+                if month < cutoff_month:
+                    os.remove(path)
+                elif month == cutoff_month:
+                    shard = np.load(path, mmap_mode='r')
+                    kept = np.array(shard[shard[:, OPEN_TIME] >= cutoff_ms])
+                    del shard
+                    self.write(path, kept)
+
+    def evict(self, keep_symbols):
+        # Remove cached klines of symbols that are no longer traded
+        if not os.path.isdir(self.cache_dir):
+            return
+        with self.lock:
+            for filename in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, filename)
+                if os.path.isdir(path):
+                    name = filename
+                elif filename.endswith('.npy'):
+                    name = filename[:-len('.npy')]
+                else:
+                    continue
+                symbol = name.rsplit('_', 1)[0]
+                if symbol not in keep_symbols:
+                    if os.path.isdir(path):
+                        shutil.rmtree(path)
+                    else:
+                        os.remove(path)
+                    log_info(f"Evicted cached klines {filename}")
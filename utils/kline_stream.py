@@ -0,0 +1,82 @@
+# kline_stream.py
+
+import asyncio
+import numpy as np
+from utils.kline_cache import OPEN_TIME, CLOSE_TIME
+from utils.logger import log_info
+
+
+def kline_event(symbol, open_time, open, high, low, close, volume, close_time, closed):
+    return {
+        'symbol': symbol,
+        'open_time': int(open_time),
+        'open': float(open),
+        'high': float(high),
+        'low': float(low),
+        'close': float(close),
+        'volume': float(volume),
+        'close_time': int(close_time),
+        'closed': closed,
+    }
+
+
+class BinanceKlineSource:
+    # Live kline events from Binance's combined websocket streams
+    def __init__(self, symbols, interval, api_key=None, api_secret=None):
+        self.symbols = symbols
+        self.interval = interval
+        self.api_key = api_key
+        self.api_secret = api_secret
+
+    async def __aiter__(self):
+        from binance import AsyncClient, BinanceSocketManager
+
+        client = await AsyncClient.create(self.api_key, self.api_secret)
+        try:
+            manager = BinanceSocketManager(client)
+            streams = [f"{symbol.lower()}@kline_{self.interval}" for symbol in self.symbols]
+            async with manager.multiplex_socket(streams) as socket:
+                log_info(f"Subscribed to {len(streams)} kline streams.")
+                while True:
+                    message = await socket.recv()
+                    data = message.get('data', {})
+                    if data.get('e') != 'kline':
+                        continue
+                    k = data['k']
+                    yield kline_event(data['s'], k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['T'], k['x'])
+        finally:
+            await client.close_connection()
+
+
+class ReplaySource:
+    # Replays closed klines recorded on disk by KlineCache, interleaved across
+    # symbols in open-time order. delay (seconds) paces the replay; 0 replays
+    # as fast as the consumer can take it.
+    def __init__(self, kline_cache, symbols, interval, start_ms=None, delay=0):
+        self.kline_cache = kline_cache
+        self.symbols = symbols
+        self.interval = interval
+        self.start_ms = start_ms
+        self.delay = delay
+
+    def load(self):
+        frames = []
+        for s, symbol in enumerate(self.symbols):
+            klines = self.kline_cache.load(symbol, self.interval)
+            if klines is None:
+                continue
+            klines = np.asarray(klines)
+            if self.start_ms is not None:
+                klines = klines[klines[:, OPEN_TIME] >= self.start_ms]
+            frames.append(np.column_stack([klines, np.full(len(klines), s)]))
+        if not frames:
+            return np.empty((0, 13))
+        rows = np.concatenate(frames)
+        return rows[np.lexsort((rows[:, -1], rows[:, OPEN_TIME]))]
+
+    async def __aiter__(self):
+        for row in self.load():
+            yield kline_event(self.symbols[int(row[-1])], row[OPEN_TIME], row[1], row[2], row[3], row[4],
+                              row[5], row[CLOSE_TIME], True)
+            await asyncio.sleep(self.delay)
+
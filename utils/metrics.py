@@ -0,0 +1,152 @@
+# utils/metrics.py
+
+from bisect import bisect_left
+from contextlib import nullcontext
+from functools import wraps
+import threading
+import time
+from config.config import METRICS_ENABLED
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+STAGE_METRIC = 'trading_bot_stage_seconds'
+WEIGHT_METRIC = 'trading_bot_exchange_used_weight_1m'
+
+NULL_SPAN = nullcontext()
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Span:
+    # Times one stage and records it on exit, whether or not it raised
+    __slots__ = ('registry', 'labels', 'start')
+
+    def __init__(self, registry, labels):
+        self.registry = registry
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(STAGE_METRIC, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    # In-process histograms, counters and gauges keyed by (name, labels),
+    # rendered in the Prometheus text format. When disabled, span() returns a
+    # shared no-op context manager and nothing is recorded.
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+
+    def span(self, stage, **labels):
+        if not self.enabled:
+            return NULL_SPAN
+        labels['stage'] = stage
+        return Span(self, labels)
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+    def render(self):
+        with self.lock:
+            histograms = {key: (list(h.counts), h.sum, h.count, h.buckets) for key, h in self.histograms.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+
+        lines = []
+        for kind, samples in (('counter', counters), ('gauge', gauges)):
+            for name in sorted({name for name, _ in samples}):
+                lines.append(f"# TYPE {name} {kind}")
+                for (sample_name, labels), value in sorted(samples.items()):
+                    if sample_name == name:
+                        lines.append(f"{name}{format_labels(labels)} {value}")
+
+        for name in sorted({name for name, _ in histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (sample_name, labels), (counts, total, count, buckets) in sorted(histograms.items()):
+                if sample_name != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {total}")
+                lines.append(f"{name}_count{format_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels) + '}'
+
+
+metrics = MetricsRegistry()
+
+
+def timed(stage):
+    # Decorator form of metrics.span for whole functions
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_request_weight(client):
+    # Binance reports the request weight used in the current minute on every
+    # response; keep the latest value as a gauge
+    if not metrics.enabled:
+        return
+    response = getattr(client, 'response', None)
+    used = getattr(response, 'headers', {}).get('x-mbx-used-weight-1m')
+    if used is not None:
+        metrics.set(WEIGHT_METRIC, float(used))
+        metrics.inc('trading_bot_exchange_weight_samples_total')
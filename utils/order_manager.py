@@ -0,0 +1,114 @@
+# order_manager.py
+
+import threading
+import time
+from utils.logger import log_info, log_error
+from utils.metrics import metrics, record_request_weight
+
+FINAL_STATUSES = ['FILLED', 'CANCELED', 'REJECTED', 'EXPIRED']
+
+
+class TrackedOrder:
+    def __init__(self, symbol, order_id, deadline, on_fill, on_cancel, on_timeout):
+        self.symbol = symbol
+        self.order_id = order_id
+        self.deadline = deadline
+        self.on_fill = on_fill
+        self.on_cancel = on_cancel
+        self.on_timeout = on_timeout
+
+    @property
+    def key(self):
+        # Exchange order IDs are only unique within a symbol
+        return (self.symbol, self.order_id)
+
+
+class OrderManager:
+    # Tracks every outstanding order in one place. A single background thread
+    # polls them in batch (one get_open_orders call per pass, plus one get_order
+    # per order that has left the open list) and fires the order's callbacks on
+    # fill, cancel/reject/expire or timeout.
+    def __init__(self, client, poll_interval=30, timeout=300, clock=time.monotonic):
+        self.client = client
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.clock = clock
+        self.orders = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def track(self, symbol, order_id, on_fill=None, on_cancel=None, on_timeout=None):
+        order = TrackedOrder(symbol, order_id, self.clock() + self.timeout, on_fill, on_cancel, on_timeout)
+        with self.lock:
+            self.orders[order.key] = order
+        log_info(f"Tracking order {order_id} for {symbol}.")
+
+    def pending(self):
+        with self.lock:
+            return list(self.orders.values())
+
+    def poll(self):
+        orders = self.pending()
+        if not orders:
+            return
+        with metrics.span('order_poll'):
+            open_keys = {(order['symbol'], order['orderId']) for order in self.client.get_open_orders()}
+        record_request_weight(self.client)
+        now = self.clock()
+
+        for order in orders:
+            if order.key in open_keys:
+                if now >= order.deadline:
+                    self._cancel(order)
+                continue
+
+            # No longer open: look up how it ended
+            with metrics.span('order_status', symbol=order.symbol):
+                order_status = self.client.get_order(symbol=order.symbol, orderId=order.order_id)
+            status = order_status['status']
+            if status == 'FILLED':
+                log_info(f"Order {order.order_id} for {order.symbol} filled.")
+                self._resolve(order, order.on_fill, order_status)
+            elif status in FINAL_STATUSES:
+                log_error(f"Order {order.order_id} for {order.symbol} not filled. Status: {status}")
+                self._resolve(order, order.on_cancel, order_status)
+
+    def _cancel(self, order):
+        try:
+            self.client.cancel_order(symbol=order.symbol, orderId=order.order_id)
+        except Exception as e:
+            # Most likely filled in the meantime; the next poll will find out
+            log_error(f"Failed to cancel order {order.order_id} for {order.symbol}: {e}")
+            return
+        log_info(f"Order {order.order_id} for {order.symbol} canceled after timeout.")
+        self._resolve(order, order.on_timeout, None)
+
+    def _resolve(self, order, callback, order_status):
+        with self.lock:
+            self.orders.pop(order.key, None)
+        if callback is None:
+            return
+        try:
+            callback(order_status)
+        except Exception as e:
+            log_error(f"Order callback failed for {order.order_id} ({order.symbol}): {e}")
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                log_error(f"Order polling failed: {e}")
+            self.stopped.wait(self.poll_interval)
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.run, name='order-manager', daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
@@ -0,0 +1,177 @@
+# position_book.py
+
+from datetime import datetime
+import threading
+from config.config import DB_BACKEND
+from utils.database import Database
+from utils.logger import log_info, log_error
+from utils.risk_management import can_enter_new_trade
+
+QUOTE_ASSET = 'USDT'
+# Buy orders found open on the exchange that this process did not place
+EXTERNAL = 'external'
+# Relative shortfall of the exchange balance still accepted as the same
+# position (commission is charged in the base asset)
+BALANCE_TOLERANCE = 0.01
+
+RESERVED, EXISTS, LIMIT_REACHED = 'reserved', 'exists', 'limit_reached'
+
+
+class Position:
+    def __init__(self, strategy, symbol, quantity=None, entry_price=None, stop_loss=None,
+                 take_profit=None, opened_at=None, oco_order_list_id=None):
+        self.strategy = strategy
+        self.symbol = symbol
+        self.quantity = quantity
+        self.entry_price = entry_price
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.opened_at = opened_at
+        # orderListId of the OCO exit placed after the fill; its legs lock
+        # the position's coins until it is canceled
+        self.oco_order_list_id = oco_order_list_id
+
+    @property
+    def is_open(self):
+        # False while the buy order is still pending
+        return self.quantity is not None
+
+
+class PositionBook:
+    # Open positions and pending buys keyed by (strategy, symbol), shared by
+    # every strategy job in the process. Loaded once from the positions table
+    # at startup and reconciled against the exchange; after that it is only
+    # updated incrementally on fills, cancels and sells, so the per-signal
+    # checks are dictionary lookups. MAX_CONCURRENT_TRADES counts pending and
+    # open positions across all strategies.
+    def __init__(self, backend=DB_BACKEND):
+        self.backend = backend
+        self.positions = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.positions)
+
+    def get(self, strategy, symbol):
+        return self.positions.get((strategy, symbol))
+
+    def reserve(self, strategy, symbol):
+        # Claim a slot for a buy before the order is placed. Returns
+        # (status, position); position is only set when status is RESERVED.
+        with self.lock:
+            if (strategy, symbol) in self.positions:
+                return EXISTS, None
+            if not can_enter_new_trade(self.positions):
+                return LIMIT_REACHED, None
+            position = self.positions[(strategy, symbol)] = Position(strategy, symbol)
+            return RESERVED, position
+
+    def release(self, position):
+        # The buy was canceled, rejected or timed out
+        with self.lock:
+            if self.positions.get((position.strategy, position.symbol)) is position:
+                del self.positions[(position.strategy, position.symbol)]
+
+    def fill(self, position, quantity, entry_price, stop_loss, take_profit):
+        with self.lock:
+            position.quantity = quantity
+            position.entry_price = entry_price
+            position.stop_loss = stop_loss
+            position.take_profit = take_profit
+            position.opened_at = datetime.utcnow()
+        self.save(position)
+
+    def set_exit(self, position, oco_order_list_id):
+        with self.lock:
+            position.oco_order_list_id = oco_order_list_id
+        self.save(position)
+
+    def cancel_exit(self, client, position):
+        # Cancel the position's OCO so its coins can be sold. Returns False
+        # when the OCO is no longer open (a leg filled, or it was canceled on
+        # the exchange), in which case the caller should reconcile.
+        if position.oco_order_list_id is None:
+            return True
+        legs = [order for order in client.get_open_orders(symbol=position.symbol)
+                if order.get('orderListId') == position.oco_order_list_id]
+        if not legs:
+            return False
+        # Canceling one leg cancels the whole order list
+        client.cancel_order(symbol=position.symbol, orderId=legs[0]['orderId'])
+        log_info(f"Canceled OCO {position.oco_order_list_id} of the {position.strategy} position in {position.symbol}.")
+        self.set_exit(position, None)
+        return True
+
+    def save(self, position):
+        db = Database(self.backend)
+        try:
+            db.save_position(position)
+        finally:
+            db.close()
+
+    def close(self, position):
+        self.release(position)
+        db = Database(self.backend)
+        try:
+            db.delete_position(position.strategy, position.symbol)
+        finally:
+            db.close()
+
+    def load(self):
+        db = Database(self.backend)
+        try:
+            rows = db.get_positions()
+        finally:
+            db.close()
+        with self.lock:
+            for strategy, symbol, quantity, entry_price, stop_loss, take_profit, opened_at, oco_id in rows:
+                self.positions[(strategy, symbol)] = Position(
+                    strategy, symbol, float(quantity), float(entry_price),
+                    float(stop_loss) if stop_loss is not None else None,
+                    float(take_profit) if take_profit is not None else None,
+                    opened_at,
+                    int(oco_id) if oco_id is not None else None
+                )
+        log_info(f"Loaded {len(rows)} open positions.")
+
+    def reconcile(self, client):
+        # Drop positions whose coins are no longer on the exchange (the OCO
+        # exit or a manual sell closed them), and hold a slot for each symbol
+        # with a buy order this process did not place
+        account = client.get_account()
+        held = {balance['asset']: float(balance['free']) + float(balance['locked'])
+                for balance in account['balances']}
+        open_buys = {order['symbol'] for order in client.get_open_orders() if order['side'] == 'BUY'}
+
+        with self.lock:
+            positions = list(self.positions.values())
+
+        by_symbol = {}
+        for position in positions:
+            if position.is_open and position.strategy != EXTERNAL:
+                by_symbol.setdefault(position.symbol, []).append(position)
+        closed = 0
+        for symbol, symbol_positions in by_symbol.items():
+            available = held.get(base_asset(symbol), 0.0)
+            # Oldest positions are matched to the balance first
+            for position in sorted(symbol_positions, key=lambda p: p.opened_at or datetime.min):
+                if position.quantity * (1 - BALANCE_TOLERANCE) <= available:
+                    available -= min(position.quantity, available)
+                else:
+                    log_info(f"{position.strategy} position in {symbol} is no longer held on the exchange.")
+                    self.close(position)
+                    closed += 1
+
+        with self.lock:
+            for (strategy, symbol), position in list(self.positions.items()):
+                if strategy == EXTERNAL and symbol not in open_buys:
+                    del self.positions[(strategy, symbol)]
+            for symbol in open_buys:
+                if not any(s == symbol for _, s in self.positions):
+                    log_error(f"Open buy order for {symbol} is not tracked by any strategy.")
+                    self.positions[(EXTERNAL, symbol)] = Position(EXTERNAL, symbol)
+        log_info(f"Reconciled positions with the exchange: {closed} closed, {len(self)} tracked.")
+
+
+def base_asset(symbol):
+    return symbol[:-len(QUOTE_ASSET)] if symbol.endswith(QUOTE_ASSET) else symbol
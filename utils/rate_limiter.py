@@ -0,0 +1,263 @@
+# rate_limiter.py
+
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+import heapq
+import itertools
+import math
+import threading
+import time
+from config.config import EXCHANGE_WEIGHT_PER_MINUTE, EXCHANGE_ORDER_WEIGHT_RESERVE
+from utils.timeframes import interval_to_ms
+from utils.logger import log_error
+from utils.metrics import metrics
+
+# Request weight charged per client method call with a symbol;
+# request_weight() adjusts it for the arguments. get_asset_balance is an
+# account request.
+ENDPOINT_WEIGHTS = {
+    'get_klines': 2,
+    'get_account': 20,
+    'get_asset_balance': 20,
+    'get_open_orders': 6,
+    'get_order': 4,
+    'get_symbol_ticker': 2,
+}
+# The same endpoints called without a symbol cover every symbol
+ALL_SYMBOLS_WEIGHTS = {
+    'get_open_orders': 80,
+    'get_symbol_ticker': 4,
+}
+# get_historical_klines pages through get_klines, after one get_klines call
+# for the earliest valid timestamp
+HISTORICAL_KLINES_PAGE = 1000
+
+
+def request_weight(method, args, kwargs):
+    if method == 'get_historical_klines':
+        return historical_klines_weight(*args, **kwargs)
+    if method in ALL_SYMBOLS_WEIGHTS and kwargs.get('symbol') is None and not args:
+        return ALL_SYMBOLS_WEIGHTS[method]
+    return ENDPOINT_WEIGHTS.get(method, 1)
+
+
+def historical_klines_weight(symbol, interval, start_str=None, end_str=None, limit=HISTORICAL_KLINES_PAGE,
+                             **kwargs):
+    # Pages are only counted for millisecond bounds and m/h/d/w intervals;
+    # anything else counts as one page
+    start, end = timestamp_ms(start_str), timestamp_ms(end_str)
+    pages = 1
+    if start is not None and interval[-1:] in 'mhdw':
+        end = end if end is not None else int(time.time() * 1000)
+        bars = max(0, end - start) / interval_to_ms(interval)
+        pages = max(1, math.ceil(bars / (limit or HISTORICAL_KLINES_PAGE)))
+    return ENDPOINT_WEIGHTS['get_klines'] * (pages + 1)
+
+
+def timestamp_ms(value):
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+# Lower runs first: orders, then order/account state, then market data
+ORDER_PRIORITY, ACCOUNT_PRIORITY, DATA_PRIORITY = range(3)
+ORDER_METHODS = {
+    'create_order', 'order_limit_buy', 'order_limit_sell', 'order_market_buy', 'order_market_sell',
+    'create_oco_order', 'cancel_order',
+}
+ACCOUNT_METHODS = {'get_account', 'get_asset_balance', 'get_open_orders', 'get_order'}
+
+# Read-only methods whose identical in-flight calls share one request
+COALESCED_METHODS = {
+    'get_historical_klines', 'get_klines', 'get_account', 'get_asset_balance', 'get_open_orders',
+    'get_order', 'get_symbol_ticker',
+}
+
+RATE_LIMIT_STATUS_CODES = (418, 429)
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+_deadline = threading.local()
+
+
+@contextmanager
+def request_deadline(deadline):
+    # Requests made by this thread inside the block, other than order
+    # placement, raise DeadlineExceeded instead of waiting for budget (or for
+    # a coalesced request) past deadline, a time.monotonic() value. Orders are
+    # exempt so a sell or cancel is never cut off halfway.
+    previous = getattr(_deadline, 'value', None)
+    _deadline.value = deadline if previous is None else min(previous, deadline)
+    try:
+        yield
+    finally:
+        _deadline.value = previous
+
+
+def current_deadline():
+    return getattr(_deadline, 'value', None)
+
+
+def remaining(deadline, method):
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded(f"Deadline passed before {method} could be sent")
+    return left
+
+
+def request_priority(method):
+    if method in ORDER_METHODS:
+        return ORDER_PRIORITY
+    if method in ACCOUNT_METHODS:
+        return ACCOUNT_PRIORITY
+    return DATA_PRIORITY
+
+
+class TokenBucket:
+    # Request-weight budget refilled continuously at capacity per minute.
+    # Waiters are served in priority order, and only order placement may dip
+    # into the last `reserve` tokens, so data pulls can never starve orders.
+    def __init__(self, capacity, reserve=0, clock=time.monotonic):
+        self.capacity = capacity
+        self.rate = capacity / 60
+        self.reserve = reserve
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self.blocked_until = 0
+        self.waiting = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return now
+
+    def acquire(self, weight, priority=DATA_PRIORITY, deadline=None):
+        # deadline (time.monotonic()) bounds the wait; DeadlineExceeded past it
+        floor = 0 if priority == ORDER_PRIORITY else self.reserve
+        weight = min(weight, self.capacity - floor)
+        ticket = (priority, next(self.sequence))
+        with self.condition:
+            heapq.heappush(self.waiting, ticket)
+            try:
+                while True:
+                    now = self._refill()
+                    if now < self.blocked_until:
+                        wait = self.blocked_until - now
+                    elif self.waiting[0] != ticket:
+                        wait = None  # Woken when the queue moves
+                    elif self.tokens - weight >= floor:
+                        self.tokens -= weight
+                        return
+                    else:
+                        wait = (weight + floor - self.tokens) / self.rate
+                    if deadline is not None:
+                        left = remaining(deadline, 'the request')
+                        wait = left if wait is None else min(wait, left)
+                    self.condition.wait(wait)
+            finally:
+                self.waiting.remove(ticket)
+                heapq.heapify(self.waiting)
+                self.condition.notify_all()
+
+    def sync(self, used):
+        # The exchange's count of weight used this minute wins over our estimate
+        with self.condition:
+            self._refill()
+            self.tokens = min(self.tokens, self.capacity - used)
+
+    def pause(self, seconds):
+        # Back off entirely after a 429/418
+        with self.condition:
+            self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+            self.tokens = 0
+            self.condition.notify_all()
+
+
+class RateLimitedClient:
+    # Wraps a binance Client: every method call is charged against a shared
+    # TokenBucket, and identical read-only calls already in flight (the same
+    # balance or klines requested by several strategies) wait for the one
+    # request instead of sending their own. Coalesced callers receive the same
+    # result object and must not mutate it. Other attributes pass through.
+    def __init__(self, client, weight_per_minute=EXCHANGE_WEIGHT_PER_MINUTE,
+                 order_reserve=EXCHANGE_ORDER_WEIGHT_RESERVE):
+        self.client = client
+        self.bucket = TokenBucket(weight_per_minute, order_reserve)
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attribute = getattr(self.client, name)
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+
+        def method(*args, **kwargs):
+            return self.request(name, *args, **kwargs)
+        return method
+
+    def request(self, method, *args, **kwargs):
+        if method not in COALESCED_METHODS:
+            return self._send(method, args, kwargs)
+        try:
+            key = (method, args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            return self._send(method, args, kwargs)
+
+        with self.lock:
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self.in_flight[key] = Future()
+        if not leader:
+            metrics.inc('trading_bot_exchange_coalesced_total', method=method)
+            deadline = current_deadline()
+            try:
+                return future.result(None if deadline is None else remaining(deadline, method))
+            except FutureTimeoutError:
+                raise DeadlineExceeded(f"Deadline passed waiting for a shared {method} request")
+
+        try:
+            result = self._send(method, args, kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+
+    def _send(self, method, args, kwargs):
+        priority = request_priority(method)
+        deadline = None if priority == ORDER_PRIORITY else current_deadline()
+        self.bucket.acquire(request_weight(method, args, kwargs), priority, deadline)
+        metrics.inc('trading_bot_exchange_requests_total', method=method)
+        try:
+            return getattr(self.client, method)(*args, **kwargs)
+        except Exception as e:
+            status_code = getattr(e, 'status_code', None)
+            if status_code in RATE_LIMIT_STATUS_CODES:
+                retry_after = self._header(getattr(e, 'response', None), 'Retry-After')
+                retry_after = float(retry_after) if retry_after is not None else 60
+                log_error(f"Exchange rate limit hit ({status_code}) on {method}, pausing {retry_after}s.")
+                self.bucket.pause(retry_after)
+            raise
+        finally:
+            used = self._header(getattr(self.client, 'response', None), 'x-mbx-used-weight-1m')
+            if used is not None:
+                self.bucket.sync(float(used))
+
+    @staticmethod
+    def _header(response, name):
+        headers = getattr(response, 'headers', None)
+        return headers.get(name) if headers is not None else None
@@ -14,7 +14,7 @@ def can_enter_new_trade(open_trades):
     return len(open_trades) < MAX_CONCURRENT_TRADES
 
 
-def calculate_position_size(account_balance, entry_price, stop_loss_price, atr):
+def calculate_atr_position_size(account_balance, atr):
     risk_amount = account_balance * RISK_PER_TRADE
     stop_loss_amount = atr  # Use ATR instead of fixed stop loss
     quantity = risk_amount / stop_loss_amount
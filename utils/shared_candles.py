@@ -0,0 +1,67 @@
+# shared_candles.py
+
+from multiprocessing import shared_memory
+import numpy as np
+from utils.candles import Candles
+
+FIELDS = Candles.__slots__  # timestamp, open, high, low, close, volume
+
+
+class SharedCandles:
+    # Candles for many symbols packed into one shared memory block, so worker
+    # processes read market data in place instead of unpickling DataFrames.
+    # Layout: one (6, total_bars) 8-byte array, row 0 the int64 open times
+    # and rows 1-5 the float64 OHLCV fields, symbols concatenated along the
+    # bar axis at the given offsets.
+    def __init__(self, shm, symbols, offsets, owner=False):
+        self.shm = shm
+        self.symbols = list(symbols)
+        self.offsets = list(offsets)
+        self.owner = owner
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        total = self.offsets[-1]
+        self.timestamp = np.ndarray((total,), dtype=np.int64, buffer=shm.buf)
+        self.values = np.ndarray((len(FIELDS) - 1, total), dtype=np.float64, buffer=shm.buf, offset=total * 8)
+
+    @classmethod
+    def create(cls, universe):
+        # universe maps symbol -> Candles
+        symbols = list(universe)
+        offsets = np.concatenate([[0], np.cumsum([len(universe[symbol]) for symbol in symbols])]).tolist()
+        shm = shared_memory.SharedMemory(create=True, size=max(1, offsets[-1] * 8 * len(FIELDS)))
+        shared = cls(shm, symbols, offsets, owner=True)
+        for symbol, start, end in zip(symbols, offsets, offsets[1:]):
+            candles = universe[symbol]
+            shared.timestamp[start:end] = candles.timestamp
+            for row, field in enumerate(FIELDS[1:]):
+                shared.values[row, start:end] = getattr(candles, field)
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        name, symbols, offsets = spec
+        return cls(shared_memory.SharedMemory(name=name), symbols, offsets)
+
+    def spec(self):
+        # Picklable handle for attach() in another process
+        return self.shm.name, self.symbols, self.offsets
+
+    def candles(self, symbol):
+        # Zero-copy views into the shared block
+        i = self.index[symbol]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return Candles(self.timestamp[start:end], *self.values[:, start:end])
+
+    def close(self):
+        # Views must be dropped before the block can be closed
+        self.timestamp = self.values = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,205 @@
+# timeframes.py
+
+import threading
+import time
+import numpy as np
+from utils.candles import Candles
+
+INTERVAL_MS = {'m': 60 * 1000, 'h': 60 * 60 * 1000, 'd': 24 * 60 * 60 * 1000, 'w': 7 * 24 * 60 * 60 * 1000}
+
+# Binance weekly candles open on Monday; the Unix epoch was a Thursday
+WEEK_OFFSET_MS = 4 * 24 * 60 * 60 * 1000
+
+
+def interval_to_ms(interval):
+    # '1m', '5m', '1h', '1d', ... -> milliseconds
+    return int(interval[:-1]) * INTERVAL_MS[interval[-1]]
+
+
+def bucket_offset(interval):
+    return WEEK_OFFSET_MS if interval.endswith('w') else 0
+
+
+def closes_at(interval, end_ms):
+    # True when a bar of interval ends at end_ms
+    return (end_ms - bucket_offset(interval)) % interval_to_ms(interval) == 0
+
+
+def aggregate(candles, interval_ms, offset=0):
+    # Fold base bars into interval_ms buckets aligned to the epoch (shifted by
+    # offset). Buckets without any base bar are skipped, as on the exchange.
+    if not len(candles):
+        return Candles.empty()
+    buckets = (candles.timestamp - offset) // interval_ms * interval_ms + offset
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+    return Candles(
+        buckets[starts],
+        candles.open[starts],
+        np.maximum.reduceat(candles.high, starts),
+        np.minimum.reduceat(candles.low, starts),
+        candles.close[ends],
+        np.add.reduceat(candles.volume, starts),
+    )
+
+
+class TimeframeView:
+    # Bars of one higher timeframe derived from the base series. Closed bars
+    # are aggregated once and appended; only the trailing bar that is still
+    # open is rebuilt, from the base bars it covers, on each update.
+    def __init__(self, interval, max_bars=None):
+        self.interval = interval
+        self.interval_ms = interval_to_ms(interval)
+        self.offset = bucket_offset(interval)
+        self.max_bars = max_bars
+        self.closed = Candles.empty()
+        self.partial = Candles.empty()
+        # Open time of the first bar not closed yet; base bars before it are
+        # already folded into self.closed
+        self.next_open_ms = None
+
+    def seed(self, candles, closed_until_ms):
+        # Closed history from the exchange's own klines for this interval, so
+        # the base series only has to cover the bars after it
+        candles = candles.slice(0, int(np.searchsorted(candles.timestamp + self.interval_ms,
+                                                        closed_until_ms, side='right')))
+        if len(candles):
+            self.closed = candles if self.max_bars is None else candles.tail(self.max_bars)
+            self.next_open_ms = int(candles.timestamp[-1]) + self.interval_ms
+
+    def update(self, base, closed_until_ms):
+        if self.next_open_ms is None:
+            if not len(base):
+                return
+            # The base history may start mid-bar; skip that incomplete bar
+            first = int(base.timestamp[0])
+            bucket = (first - self.offset) // self.interval_ms * self.interval_ms + self.offset
+            self.next_open_ms = bucket if bucket == first else bucket + self.interval_ms
+        start = int(np.searchsorted(base.timestamp, self.next_open_ms))
+        bars = aggregate(base.slice(start), self.interval_ms, self.offset)
+        n_closed = int(np.searchsorted(bars.timestamp + self.interval_ms, closed_until_ms, side='right'))
+        if n_closed:
+            self.closed = self.closed.append(bars.slice(0, n_closed))
+            if self.max_bars is not None:
+                self.closed = self.closed.tail(self.max_bars)
+            self.next_open_ms = int(bars.timestamp[n_closed - 1]) + self.interval_ms
+        self.partial = bars.slice(n_closed)
+
+    def candles(self, include_partial=True):
+        if include_partial and len(self.partial):
+            bars = self.closed.append(self.partial)
+            return bars if self.max_bars is None else bars.tail(self.max_bars)
+        return self.closed
+
+
+class SymbolCandles:
+    # Base-resolution candles for one symbol and the views derived from them.
+    # Base bars before closed_until_ms are final; later ones (the open bar)
+    # are replaced by each update.
+    def __init__(self, base_interval, max_bars=None):
+        self.base_interval = base_interval
+        self.base_ms = interval_to_ms(base_interval)
+        self.max_bars = max_bars
+        self.base = Candles.empty()
+        self.closed_until_ms = 0
+        self.views = {}
+        # Bumped on every update; views catch up lazily when read
+        self.version = 0
+        self.view_versions = {}
+        self.lock = threading.Lock()
+
+    def view(self, interval):
+        if interval not in self.views:
+            if interval_to_ms(interval) % self.base_ms:
+                raise ValueError(f"Timeframe {interval} is not a multiple of the base interval {self.base_interval}")
+            self.views[interval] = TimeframeView(interval, self.max_bars)
+            self.view_versions[interval] = -1
+        return self.views[interval]
+
+    def seed(self, interval, candles, now_ms=None):
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        with self.lock:
+            self.view(interval).seed(candles, now_ms)
+            self.view_versions[interval] = -1
+
+    def update(self, candles, now_ms=None):
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        with self.lock:
+            # Only bars from the first one not closed yet are taken; anything
+            # older is already part of the series
+            new = candles.slice(int(np.searchsorted(candles.timestamp, self.closed_until_ms)))
+            keep = int(np.searchsorted(self.base.timestamp, self.closed_until_ms))
+            self.base = self.base.slice(0, keep).append(new) if keep else new
+            n_closed = int(np.searchsorted(self.base.timestamp + self.base_ms, now_ms, side='right'))
+            if n_closed:
+                self.closed_until_ms = max(self.closed_until_ms, int(self.base.timestamp[n_closed - 1]) + self.base_ms)
+            self.trim()
+            self.version += 1
+
+    def trim(self):
+        # Keep max_bars base bars, and every base bar a view's open bar still needs
+        if self.max_bars is None or len(self.base) <= self.max_bars:
+            return
+        cutoff = int(self.base.timestamp[-self.max_bars])
+        for view in self.views.values():
+            if view.next_open_ms is None:
+                return
+            cutoff = min(cutoff, view.next_open_ms)
+        self.base = self.base.slice(int(np.searchsorted(self.base.timestamp, cutoff)))
+
+    def get(self, interval, include_partial=True):
+        with self.lock:
+            if interval == self.base_interval:
+                if include_partial:
+                    return self.base.tail(self.max_bars) if self.max_bars else self.base
+                closed = self.base.slice(0, int(np.searchsorted(self.base.timestamp, self.closed_until_ms)))
+                return closed.tail(self.max_bars) if self.max_bars else closed
+            view = self.view(interval)
+            if self.view_versions[interval] != self.version:
+                view.update(self.base, self.closed_until_ms)
+                self.view_versions[interval] = self.version
+            return view.candles(include_partial)
+
+
+class CandleStore:
+    # One base-resolution candle series per symbol; every higher timeframe
+    # (5m, 1h, 1d, ... multiples of the base interval) is aggregated from it
+    # instead of being downloaded separately. max_bars caps every series.
+    def __init__(self, base_interval, max_bars=None):
+        self.base_interval = base_interval
+        self.max_bars = max_bars
+        self.symbols = {}
+        self.lock = threading.Lock()
+
+    def symbol(self, symbol):
+        with self.lock:
+            if symbol not in self.symbols:
+                self.symbols[symbol] = SymbolCandles(self.base_interval, self.max_bars)
+            return self.symbols[symbol]
+
+    def __contains__(self, symbol):
+        return symbol in self.symbols
+
+    def closed_until(self, symbol):
+        # End of the closed base bars held for symbol (0 if none): callers
+        # only need to fetch base bars from here on
+        return self.symbol(symbol).closed_until_ms
+
+    def has_timeframe(self, symbol, interval):
+        return symbol in self.symbols and (interval == self.base_interval
+                                           or interval in self.symbols[symbol].views)
+
+    def next_open(self, symbol, interval):
+        # Open time of the first bar of interval that is not closed yet, or
+        # None before the view was built or seeded
+        view = self.symbol(symbol).views.get(interval)
+        return view.next_open_ms if view is not None else None
+
+    def seed(self, symbol, interval, candles, now_ms=None):
+        self.symbol(symbol).seed(interval, candles, now_ms)
+
+    def update(self, symbol, candles, now_ms=None):
+        self.symbol(symbol).update(candles, now_ms)
+
+    def get(self, symbol, interval, include_partial=True):
+        return self.symbol(symbol).get(interval, include_partial)